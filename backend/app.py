@@ -1,4 +1,7 @@
-from flask import Flask
+import click
+from flask import Flask, jsonify
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
+from werkzeug.middleware.proxy_fix import ProxyFix
 from config import DevelopmentConfig
 from flask_cors import CORS  # If you installed this
 from src import bcrypt, mongo, jwt
@@ -10,18 +13,56 @@ def create_app(config_class=DevelopmentConfig):
     app = Flask(__name__)
     app.config.from_object(config_class)
 
+    # Stream uploaded documents straight to UPLOAD_FOLDER (see file_handler)
+    from src.utils.file_handler import UploadRequest, discard_uncommitted_uploads
+
+    app.request_class = UploadRequest
+    app.teardown_request(discard_uncommitted_uploads)
+
+    # Client address and scheme as seen by the trusted reverse proxies
+    proxy_count = app.config["TRUSTED_PROXY_COUNT"]
+    if proxy_count:
+        app.wsgi_app = ProxyFix(app.wsgi_app, x_for=proxy_count, x_proto=proxy_count)
+
     # Initialize CORS here, before other extensions or blueprints are registered
     # The 'origins' key specifies the exact frontend URL allowed to access the API.
     CORS(app, resources={r"/api/*": {"origins": "http://localhost:3000"}})
 
-    # Initialize extensions with the app
-    mongo.init_app(app)
+    # Initialize extensions with the app (Mongo pool/timeouts from MONGO_*)
+    from src.utils.db import mongo_client_options
+
+    mongo.init_app(app, **mongo_client_options(app.config))
     bcrypt.init_app(app)
     jwt.init_app(app)
 
+    # Serialize ObjectIds, datetimes and Decimal128 straight from documents.
+    # Set after mongo.init_app, which installs an extended JSON ({"$oid": ...})
+    # provider.
+    from src.utils.json_provider import MongoJSONProvider
+
+    app.json = MongoJSONProvider(app)
+
     # Create the uploads folder if it doesn't exist
     os.makedirs(app.config["UPLOAD_FOLDER"], exist_ok=True)
 
+    # Indexes are declared by a deploy step (`flask ensure-indexes`, run by the
+    # Docker image before gunicorn), not here: every process would wait on
+    # it, and for a long time if MongoDB is down
+    from src.utils.indexes import ensure_indexes, rebuild_indexes
+
+    @app.cli.command("ensure-indexes")
+    @click.option(
+        "--rebuild",
+        is_flag=True,
+        help="Also replace indexes whose definition changed (unique ones only "
+        "if no documents violate them).",
+    )
+    def ensure_indexes_command(rebuild):
+        """Creates all MongoDB indexes (exits 1 if any is missing)."""
+        if not (rebuild_indexes() if rebuild else ensure_indexes()):
+            raise SystemExit(1)
+        print("Indexes are up to date.")
+
     # --- Register Blueprints ---
     from src.auth.controllers import auth_bp
 
@@ -35,8 +76,40 @@ def create_app(config_class=DevelopmentConfig):
     from src.tasks.controllers import tasks_bp
 
     app.register_blueprint(tasks_bp, url_prefix="/api/tasks")
+
+    from src.jobs.controllers import jobs_bp
+
+    app.register_blueprint(jobs_bp, url_prefix="/api/jobs")
+
+    # --- CLI Commands ---
+    from src.tasks.commands import tasks_cli
+
+    app.cli.add_command(tasks_cli)
+
+    # --- Background Jobs ---
+    from src.jobs import handlers  # noqa: F401  (registers the job handlers)
+    from src.jobs.commands import jobs_cli
+
+    # With JOBS_RUN_IN_APP, worker threads are started by the serving process
+    # (gunicorn post_fork, python app.py), never by CLI commands
+    app.cli.add_command(jobs_cli)
     # ...
 
+    # Shed password-hashing load instead of queueing it without bound
+    from src.auth.services import PasswordHasherBusy
+
+    @app.errorhandler(PasswordHasherBusy)
+    def handle_password_hasher_busy(e):
+        response = jsonify({"msg": "Server is busy, please retry shortly"})
+        response.headers["Retry-After"] = "1"
+        return response, 503
+
+    # Upload limits enforced while the body is streamed
+    @app.errorhandler(RequestEntityTooLarge)
+    @app.errorhandler(UnsupportedMediaType)
+    def handle_rejected_upload(e):
+        return jsonify({"msg": e.description}), e.code
+
     # Basic route for testing
     @app.route("/")
     def index():
@@ -49,4 +122,15 @@ if __name__ == "__main__":
     load_dotenv(os.path.join(os.path.dirname(__file__), "..", ".env"))
 
     app = create_app()
+    # Development server: declare the indexes here, there is no deploy step
+    from src.utils.indexes import ensure_indexes, has_unique_email_index
+
+    with app.app_context():
+        ensure_indexes()
+        if not has_unique_email_index():
+            raise SystemExit("users.email has no unique index, see the log above")
+    if app.config["JOBS_RUN_IN_APP"]:
+        from src.jobs.runner import JobWorker
+
+        app.extensions["job_worker"] = JobWorker(app).start()
     app.run(host="0.0.0.0", port=5000)
@@ -0,0 +1,119 @@
+"""
+Serialization throughput of task list responses, before and after the app's
+MongoJSONProvider.
+
+    before          serialize_task on every document, then Flask-PyMongo's
+                    extended JSON provider (the previous code path)
+    after (json)    MongoJSONProvider with the standard library encoder
+    after (orjson)  MongoJSONProvider with orjson (skipped if not installed)
+
+No database is needed: documents are generated in the shape PyMongo returns.
+
+Usage (from backend/):
+    python benchmarks/bench_json.py [--docs 100] [--rounds 200]
+"""
+
+import argparse
+import os
+import sys
+import timeit
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from bson.objectid import ObjectId  # noqa: E402
+from flask import Flask  # noqa: E402
+from flask_pymongo.helpers import BSONProvider  # noqa: E402
+from src.utils import json_provider  # noqa: E402
+from src.utils.json_provider import MongoJSONProvider  # noqa: E402
+from src.utils.date_utils import format_datetime  # noqa: E402
+
+
+def serialize_task(task):
+    """The per-document conversion list_tasks/get_task used to run."""
+    for field in ("_id", "assigned_to", "created_by"):
+        if task.get(field) is not None:
+            task[field] = str(task[field])
+    if isinstance(task.get("due_date"), datetime):
+        task["due_date"] = format_datetime(task["due_date"])
+    return task
+
+
+def make_tasks(count):
+    user_ids = [ObjectId() for _ in range(10)]
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "_id": ObjectId(),
+            "title": f"Task {i}",
+            "description": "Lorem ipsum dolor sit amet, " * 4,
+            "status": "In Progress",
+            "priority": "High",
+            "due_date": start + timedelta(hours=i),
+            "assigned_to": user_ids[i % 10],
+            "created_by": user_ids[(i + 1) % 10],
+            "version": 3,
+            "attached_documents": [
+                {
+                    "original_name": "spec.pdf",
+                    "stored_name": f"{i:032x}_spec.pdf",
+                    "mime_type": "application/pdf",
+                    "size_bytes": 52_311,
+                }
+            ],
+        }
+        for i in range(count)
+    ]
+
+
+def fresh_page(tasks):
+    # PyMongo returns new documents on every query; serialize_task mutates them
+    return [dict(task) for task in tasks]
+
+
+def run(label, fn, docs, rounds):
+    seconds = min(timeit.repeat(fn, number=rounds, repeat=3))
+    rate = docs * rounds / seconds
+    print(f"{label:<16} {rate:>12,.0f} docs/s  {seconds / rounds * 1e3:8.3f} ms/page")
+    return rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--docs", type=int, default=100, help="Tasks per page")
+    parser.add_argument("--rounds", type=int, default=200, help="Pages per timing")
+    args = parser.parse_args()
+
+    tasks = make_tasks(args.docs)
+    app = Flask(__name__)
+    before_provider = BSONProvider(app)
+    after_provider = MongoJSONProvider(app)
+
+    def before():
+        page = [serialize_task(task) for task in fresh_page(tasks)]
+        before_provider.response({"tasks": page})
+
+    def after():
+        after_provider.response({"tasks": fresh_page(tasks)})
+
+    print(f"{args.docs} tasks per page, {args.rounds} pages per timing\n")
+    with app.app_context():
+        baseline = run("before", before, args.docs, args.rounds)
+
+        orjson = json_provider.orjson
+        json_provider.orjson = None
+        try:
+            rate = run("after (json)", after, args.docs, args.rounds)
+        finally:
+            json_provider.orjson = orjson
+        print(f"{'':<16} {rate / baseline:>12.1f}x")
+
+        if orjson is None:
+            print("after (orjson)   skipped: orjson is not installed")
+            return
+        rate = run("after (orjson)", after, args.docs, args.rounds)
+        print(f"{'':<16} {rate / baseline:>12.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -36,13 +36,94 @@ class Config:
     # for localhost
     MONGO_URI = f"mongodb://{DEFAULT_DB_HOST}:{DEFAULT_DB_PORT}/{DEFAULT_MONGO_DB}"
 
+    # MongoDB client (per process; see src/utils/db.py). Size the pool for the
+    # threads of one worker process: gunicorn threads plus job threads.
+    MONGO_MAX_POOL_SIZE = 20  # Connections per process (driver default: 100)
+    MONGO_MIN_POOL_SIZE = 0  # Connections kept open while idle
+    MONGO_MAX_IDLE_TIME_MS = 60_000  # Idle connections are closed after this
+    MONGO_WAIT_QUEUE_TIMEOUT_MS = 5_000  # Wait for a free pooled connection
+    MONGO_SERVER_SELECTION_TIMEOUT_MS = 5_000  # Fail fast when no server is up
+    MONGO_CONNECT_TIMEOUT_MS = 5_000  # Opening a connection
+    MONGO_SOCKET_TIMEOUT_MS = 60_000  # One network round trip (None: no limit)
+    # Wire compression, e.g. "zstd,zlib" (zstd needs `zstandard`); None: off
+    MONGO_COMPRESSORS = os.environ.get("MONGO_COMPRESSORS")
+
     # JWT Configuration
     JWT_SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "jwt-super-secret")
     JWT_ACCESS_TOKEN_EXPIRES = timedelta(hours=1)
+
+    # Rate limiting (token buckets keyed by ip / email / user)
+    RATE_LIMIT_ENABLED = True
+    RATE_LIMIT_BACKEND = "mongo"  # "mongo" (shared by workers) or "memory"
+    RATE_LIMITS = {
+        "login": {"limit": "10/minute", "keys": ("ip", "email")},
+        "register": {"limit": "5/minute", "keys": ("ip",)},
+        "task_write": {"limit": "120/minute", "keys": ("user",)},
+        "task_bulk": {"limit": "10/minute", "keys": ("user",)},
+    }
+    # Reverse proxies in front of the app (e.g. 1 on Render or behind nginx):
+    # the client IP ("ip" key) is taken from the X-Forwarded-For entry they
+    # added. 0 trusts no header; too high lets clients pick their own IP.
+    TRUSTED_PROXY_COUNT = int(os.environ.get("TRUSTED_PROXY_COUNT", 0))
+
+    # Password hashing (bcrypt)
+    BCRYPT_LOG_ROUNDS = 12  # Cost; hashes with another cost are upgraded on login
+    BCRYPT_POOL_SIZE = 2  # Threads per process running bcrypt
+    BCRYPT_MAX_PENDING = 8  # Running + queued operations before answering 503
+    BCRYPT_TIMEOUT = 10  # Seconds to wait for a pool result
+
+    # Token blocklist (shared in MongoDB, cached per worker)
+    BLOCKLIST_SYNC_INTERVAL = 2  # Max seconds before a revocation reaches a worker
+    BLOCKLIST_SYNC_OVERLAP = 30  # Seconds re-read on each sync (clock skew)
+    BLOCKLIST_REBUILD_INTERVAL = 3600  # Rebuild the filter to drop expired tokens
+    BLOCKLIST_FILTER_CAPACITY = 100_000  # Expected live revocations per filter
+    BLOCKLIST_FILTER_ERROR_RATE = 0.01  # Filter false-positive rate
+    BLOCKLIST_CACHE_SIZE = 10_000  # LRU entries for filter hits
+    BLOCKLIST_CACHE_TTL = 5  # Seconds an LRU answer may be served
+    BLOCKLIST_DEFAULT_TTL = 86400  # Retention for tokens without an exp claim
     # File Storage (Local)
     UPLOAD_FOLDER = os.path.join(os.getcwd(), "uploads")
     MAX_FILE_UPLOADS = 3  # Attach up to 3 documents (PDF format)
     ALLOWED_EXTENSIONS = {"pdf"}  # Only PDF files are allowed
+    MAX_UPLOAD_FILE_SIZE = 10 * 1024 * 1024  # Per attached document, while streaming
+    MAX_CONTENT_LENGTH = 32 * 1024 * 1024  # Per request body (Flask, 413)
+    IMPORT_MAX_CONTENT_LENGTH = 512 * 1024 * 1024  # Per request body for imports
+    UPLOAD_CHUNK_SIZE = 64 * 1024  # Bytes per write when copying spooled files
+    ATTACHMENT_STORAGE = "local"  # Blob backend: "local" (UPLOAD_FOLDER) or "gridfs"
+    GRIDFS_BUCKET = "attachments"  # Bucket used by the "gridfs" backend
+    # Downloads streamed by the web server: None, "x-accel" (nginx), "x-sendfile"
+    DOWNLOAD_OFFLOAD = None
+    DOWNLOAD_OFFLOAD_PREFIX = "/protected-uploads/"  # nginx internal location
+    BULK_MAX_OPERATIONS = 500  # Operations accepted by POST /api/tasks/bulk
+    EXPORT_BATCH_SIZE = 1000  # Documents per cursor batch / streamed chunk
+    IMPORT_BATCH_SIZE = 1000  # Rows per insert_many during imports
+    IMPORT_MAX_REPORTED_ERRORS = 100  # Row errors listed in an import summary
+
+    # Background Jobs (`flask jobs work`)
+    JOBS_EAGER = False  # Run each job inline as soon as it is enqueued (tests)
+    # Worker threads in every serving process (gunicorn workers, python app.py).
+    # Set JOBS_RUN_IN_APP=0 where a separate `flask jobs work` process runs them.
+    JOBS_RUN_IN_APP = os.environ.get("JOBS_RUN_IN_APP", "1") == "1"
+    JOBS_WORKERS = 2  # Worker threads per process
+    JOBS_POLL_INTERVAL = 1  # Seconds an idle worker waits before polling again
+    JOBS_LEASE_SECONDS = 300  # A silent worker's job is re-claimed after this
+    JOBS_MAX_ATTEMPTS = 5  # Attempts before a job is marked failed
+    JOBS_BACKOFF_BASE = 5  # Seconds before the first retry, doubled per attempt
+    JOBS_BACKOFF_MAX = 600  # Upper bound on the retry delay
+    JOBS_RETENTION = 7 * 86400  # Finished jobs are kept this long (TTL index)
+    JOBS_CASCADE_BATCH_SIZE = 500  # Tasks deleted/reassigned per user cascade batch
+    JOBS_CASCADE_PAUSE = 0.2  # Seconds user cascades sleep between batches
+    JOBS_SWEEP_INTERVAL = 3600  # Orphaned-upload sweep period (0 disables)
+    JOBS_SWEEP_GRACE = 3600  # Files younger than this are never swept
+
+    # Indexes (created by `flask ensure-indexes`)
+    # Unique email index compares case-insensitively (after changing it, run
+    # `flask ensure-indexes --rebuild`)
+    USER_EMAIL_CASE_INSENSITIVE = False
+
+    # List totals (count=cached)
+    COUNT_CACHE_TTL = 30  # Seconds a cached total may be served by a worker
+    COUNT_CACHE_MAX_ENTRIES = 1024  # Per-process bound on cached totals
 
 
 class DevelopmentConfig(Config):
@@ -72,3 +153,16 @@ class TestConfig(Config):
 
     # You might also want to disable JWT expiration for tests
     JWT_ACCESS_TOKEN_EXPIRES = False
+
+    # Cheap hashes keep the suite fast
+    BCRYPT_LOG_ROUNDS = 4
+
+    # Every test logs in from the same address; tests enable limits explicitly
+    RATE_LIMIT_ENABLED = False
+    RATE_LIMIT_BACKEND = "memory"
+    TRUSTED_PROXY_COUNT = 1  # Tests send X-Forwarded-For as one proxy would
+
+    # Jobs run inline, so tests see their effects right away
+    JOBS_EAGER = True
+    JOBS_RUN_IN_APP = False
+    JOBS_CASCADE_PAUSE = 0
@@ -0,0 +1,64 @@
+"""
+Gunicorn production profile: `gunicorn -c gunicorn.conf.py` (from backend/).
+
+The app is imported once in the master (preload_app) and each worker is
+forked from it, so workers start fast and share the imported code. Nothing
+holding sockets or threads may cross the fork: the master closes its MongoDB
+client before forking (when_ready), and each worker builds its own client and
+job threads (post_fork, with JOBS_RUN_IN_APP). The code looks collections
+up through get_*_collection() on every use, so they follow the new client.
+
+Every setting can be overridden on the command line or with GUNICORN_CMD_ARGS.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "app:create_app()"
+bind = os.environ.get("GUNICORN_BIND", "0.0.0.0:5000")
+
+# Threaded workers: requests mostly wait on MongoDB or on file I/O. Keep
+# threads (plus JOBS_WORKERS when JOBS_RUN_IN_APP) within MONGO_MAX_POOL_SIZE.
+worker_class = "gthread"
+workers = int(os.environ.get("GUNICORN_WORKERS", multiprocessing.cpu_count()))
+threads = int(os.environ.get("GUNICORN_THREADS", 8))
+preload_app = True
+
+timeout = 90  # Imports and exports stream large bodies
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers now and then (cheap with preload_app) to bound memory growth
+max_requests = 2000
+max_requests_jitter = 200
+
+accesslog = "-"
+errorlog = "-"
+
+
+def when_ready(server):
+    """In the master, once the app is loaded and before any worker is forked."""
+    from src import mongo
+    from src.utils.indexes import has_unique_email_index
+
+    app = server.app.wsgi()
+    # Registration relies on the unique index to reject duplicate accounts:
+    # refuse to serve without it (gunicorn exits with the error)
+    with app.app_context():
+        if not has_unique_email_index():
+            raise RuntimeError(
+                "users.email has no unique index; run `flask ensure-indexes`"
+            )
+    # Drop whatever the app factory opened (pooled sockets, monitor threads):
+    # workers connect on their own
+    mongo.cx.close()
+
+
+def post_fork(server, worker):
+    """In each worker, right after the fork."""
+    from src.jobs.runner import JobWorker
+    from src.utils.db import reconnect_mongo
+
+    app = server.app.wsgi()
+    reconnect_mongo(app)
+    if app.config["JOBS_RUN_IN_APP"]:
+        app.extensions["job_worker"] = JobWorker(app).start()
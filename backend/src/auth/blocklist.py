@@ -0,0 +1,180 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from flask import current_app
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from src.utils.cache import TTLCache
+from src.utils.date_utils import utcnow
+from .models import get_revoked_token_collection
+
+
+class BloomFilter:
+    """
+    Fixed-size probabilistic set: `in` never gives false negatives and gives
+    false positives at roughly `error_rate` once `capacity` items are added.
+    """
+
+    def __init__(self, capacity, error_rate=0.01):
+        self.size = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hash_count = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+
+    def _positions(self, item):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.size for i in range(self.hash_count))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+class TokenBlocklist:
+    """
+    Revoked-token store shared by every gunicorn worker.
+
+    Revocations live in the `revoked_tokens` collection, which expires them
+    through a TTL index on `expires_at` (the token's own `exp`). Each worker
+    keeps two in-process layers in front of it:
+
+    * A Bloom filter of every live revocation, synced incrementally from the
+      collection at most once per BLOCKLIST_SYNC_INTERVAL seconds. A miss
+      proves the token is not revoked, so the common case costs no DB trip.
+    * A short-TTL LRU cache of DB answers for the rare filter hits.
+
+    A revocation made on another worker becomes visible here within
+    BLOCKLIST_SYNC_INTERVAL seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._cache = None
+        self._last_sync = 0.0  # monotonic time of the last successful sync
+        self._last_rebuild = 0.0
+        self._synced_until = None  # revoked_at high-water mark (UTC)
+
+    # --- Configuration ---
+    @staticmethod
+    def _config(key):
+        return current_app.config[key]
+
+    def _default_expiry(self):
+        """Expiry for tokens without `exp` (e.g. JWT_ACCESS_TOKEN_EXPIRES=False)."""
+        return utcnow() + timedelta(seconds=self._config("BLOCKLIST_DEFAULT_TTL"))
+
+    # --- Local Layers ---
+    def _rebuild(self):
+        """Reloads the filter from scratch, dropping expired revocations."""
+        bloom = BloomFilter(
+            self._config("BLOCKLIST_FILTER_CAPACITY"),
+            self._config("BLOCKLIST_FILTER_ERROR_RATE"),
+        )
+        now = utcnow()
+        cursor = get_revoked_token_collection().find(
+            {"expires_at": {"$gt": now}}, {"_id": 1}
+        )
+        for token in cursor:
+            bloom.add(token["_id"])
+
+        self._filter = bloom
+        self._cache = TTLCache(
+            maxsize=self._config("BLOCKLIST_CACHE_SIZE"),
+            ttl=self._config("BLOCKLIST_CACHE_TTL"),
+        )
+        self._synced_until = now
+        self._last_rebuild = time.monotonic()
+
+    def _sync(self):
+        """Adds revocations made since the last sync (on any worker)."""
+        # Overlap the window to tolerate clock skew between app servers
+        since = self._synced_until - timedelta(
+            seconds=self._config("BLOCKLIST_SYNC_OVERLAP")
+        )
+        now = utcnow()
+        cursor = get_revoked_token_collection().find(
+            {"revoked_at": {"$gte": since}}, {"_id": 1}
+        )
+        for token in cursor:
+            self._filter.add(token["_id"])
+        self._synced_until = now
+
+    def _refresh(self):
+        """
+        Makes sure the filter is fresh enough to answer negative lookups.
+
+        Returns:
+            bool: False if the filter could not be refreshed (DB unavailable).
+        """
+        now = time.monotonic()
+        if now - self._last_sync < self._config("BLOCKLIST_SYNC_INTERVAL"):
+            return True
+
+        with self._lock:
+            if now - self._last_sync < self._config("BLOCKLIST_SYNC_INTERVAL"):
+                return True
+            try:
+                rebuild_interval = self._config("BLOCKLIST_REBUILD_INTERVAL")
+                if self._filter is None or now - self._last_rebuild >= rebuild_interval:
+                    self._rebuild()
+                else:
+                    self._sync()
+            except PyMongoError as e:
+                current_app.logger.warning(f"Token blocklist sync failed: {e}")
+                return False
+            self._last_sync = now
+        return True
+
+    # --- Public API ---
+    def is_revoked(self, jti):
+        """True if the token with this JTI has been revoked."""
+        fresh = self._refresh()
+        if fresh and jti not in self._filter:
+            # Definitely not revoked: the hot path, no DB round trip
+            return False
+
+        revoked = self._cache.get(jti) if self._cache is not None else None
+        if revoked is None:
+            revoked = (
+                get_revoked_token_collection().find_one({"_id": jti}, {"_id": 1})
+                is not None
+            )
+            if self._cache is not None:
+                self._cache.set(jti, revoked)
+        return revoked
+
+    def revoke(self, jti, exp=None):
+        """
+        Revokes a token until its expiry (`exp` claim, seconds since epoch).
+        The document is removed by the TTL index once the token is expired.
+        """
+        if exp is not None:
+            expires_at = datetime.fromtimestamp(exp, timezone.utc).replace(tzinfo=None)
+        else:
+            expires_at = self._default_expiry()
+
+        try:
+            get_revoked_token_collection().insert_one(
+                {"_id": jti, "revoked_at": utcnow(), "expires_at": expires_at}
+            )
+        except DuplicateKeyError:
+            pass  # Already revoked
+
+        # Visible to this worker immediately
+        if self._filter is not None:
+            self._filter.add(jti)
+        if self._cache is not None:
+            self._cache.set(jti, True)
+
+
+# One instance per worker process
+token_blocklist = TokenBlocklist()
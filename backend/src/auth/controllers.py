@@ -1,16 +1,24 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token
-from src import bcrypt  # Import bcrypt for hashing
-from .models import get_user_by_email, get_user_collection
+from .services import (
+    hash_password,
+    verify_password,
+    verify_dummy_password,
+    needs_rehash,
+)
+from .models import get_user_by_email, get_user_collection, LOGIN_PROJECTION
+from pymongo.errors import DuplicateKeyError
 from bson.objectid import ObjectId  # Used to convert string IDs to MongoDB
 from flask_jwt_extended import jwt_required, get_jwt  # Add get_jwt
-from src import BLACKLIST  # Import the global blacklist set from your __init__.py
-
+from .blocklist import token_blocklist  # Shared, cross-worker token blocklist
+from src.utils.rate_limit import rate_limit
+from src.utils.counting import invalidate_counts
 
 auth_bp = Blueprint("auth", __name__)
 
 
 @auth_bp.route("/register", methods=["POST"])
+@rate_limit("register")
 def register():
     """Implements user registration with password hashing and role setting."""
     data = request.get_json()
@@ -22,11 +30,8 @@ def register():
     if not email or not password:
         return jsonify({"msg": "Missing email or password"}), 400
 
-    if get_user_by_email(email):
-        return jsonify({"msg": "User already exists"}), 409
-
-    # Password Hashing
-    hashed_password = bcrypt.generate_password_hash(password).decode("utf-8")
+    # Password Hashing (runs in the bounded bcrypt pool)
+    hashed_password = hash_password(password)
 
     user_data = {
         "email": email,
@@ -35,8 +40,10 @@ def register():
     }
 
     try:
-        # Insert the new user into the database
+        # Insert the new user into the database. The unique email index
+        # rejects duplicates atomically, so there is no lookup beforehand.
         result = get_user_collection().insert_one(user_data)
+        invalidate_counts(get_user_collection().name)
         # Create a simple access token for immediate login after registration
         access_token = create_access_token(
             identity=str(result.inserted_id), additional_claims={"role": role}
@@ -47,6 +54,9 @@ def register():
             201,
         )
 
+    except DuplicateKeyError:
+        return jsonify({"msg": "User already exists"}), 409
+
     except Exception as e:
         # Log the exception for debugging
         print(f"Error during registration: {e}")
@@ -54,19 +64,33 @@ def register():
 
 
 @auth_bp.route("/login", methods=["POST"])
+@rate_limit("login")
 def login():
     """Implements user login with JWT-based authentication."""
     data = request.get_json()
     email = data.get("email")
     password = data.get("password")
 
-    user = get_user_by_email(email)
-    print(
-        f"Attempted login for: {email}. Password check result: {bcrypt.check_password_hash(user['password'], password) if user else False}"
-    )
+    if not email or not password:
+        return jsonify({"msg": "Missing email or password"}), 400
+
+    user = get_user_by_email(email, LOGIN_PROJECTION)
+
+    # Verify exactly once; unknown users get a dummy check of the same cost
+    if user:
+        password_ok = verify_password(user["password"], password)
+    else:
+        password_ok = verify_dummy_password(password)
 
     # Check user existence and password validity
-    if user and bcrypt.check_password_hash(user["password"], password):
+    if password_ok:
+        # Transparently upgrade hashes made with an outdated cost
+        if needs_rehash(user["password"]):
+            get_user_collection().update_one(
+                {"_id": user["_id"], "password": user["password"]},
+                {"$set": {"password": hash_password(password)}},
+            )
+
         # Create JWT Token [cite: 5, 18]
         # Use user's MongoDB ID as the identity
         user_id = str(user["_id"])
@@ -94,10 +118,11 @@ def login():
 @auth_bp.route("/logout", methods=["POST"])
 @jwt_required()
 def logout():
-    """Revokes the current JWT token by adding its JTI to the global blocklist."""
-    jti = get_jwt()["jti"]
+    """Revokes the current JWT token by adding its JTI to the shared blocklist."""
+    claims = get_jwt()
 
-    # Add the token's unique ID to the set, instantly invalidating it.
-    BLACKLIST.add(jti)
+    # Store the token's unique ID until the token expires, invalidating it on
+    # every worker.
+    token_blocklist.revoke(claims["jti"], claims.get("exp"))
 
     return jsonify({"msg": "Successfully logged out and token revoked"}), 200
@@ -1,14 +1,42 @@
+from flask import current_app, has_app_context
+from pymongo.collation import Collation
 from src import mongo  # Import the PyMongo instance
 
+# Case-insensitive comparison used by the unique email index when
+# USER_EMAIL_CASE_INSENSITIVE is enabled (queries must use the same collation)
+EMAIL_COLLATION = Collation(locale="en", strength=2)
+
+# Fields needed to authenticate a login
+LOGIN_PROJECTION = {"password": 1, "role": 1}
+
+# Fields selectable with `fields=` on user reads (_id is always returned; the
+# password hash never is)
+USER_FIELDS = ("email", "role")
+USER_LIST_FIELDS = USER_FIELDS
+
 
 def get_user_collection():
     """Returns the MongoDB users collection."""
     return mongo.db.users
 
 
-def get_user_by_email(email):
-    """Finds a user document by email."""
-    return get_user_collection().find_one({"email": email})
+def get_revoked_token_collection():
+    """Returns the MongoDB collection of revoked JWTs (the shared blocklist)."""
+    return mongo.db.revoked_tokens
+
+
+def get_email_collation():
+    """Returns the collation email lookups must use to hit the unique index."""
+    if has_app_context() and current_app.config.get("USER_EMAIL_CASE_INSENSITIVE"):
+        return EMAIL_COLLATION
+    return None
+
+
+def get_user_by_email(email, projection=None):
+    """Finds a user document by email (optionally projected)."""
+    return get_user_collection().find_one(
+        {"email": email}, projection, collation=get_email_collation()
+    )
 
 
 # Note: We are using Flask-PyMongo's direct dictionary handling,
@@ -1 +1,90 @@
-#empty file now
\ No newline at end of file
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from src import bcrypt
+
+# --- Password Hashing Service ---
+# bcrypt is the most expensive operation in the API. Every hash/verification
+# runs in a small per-process thread pool (bcrypt releases the GIL while
+# hashing), and at most BCRYPT_MAX_PENDING operations may be queued or running
+# at once, so a login burst is shed with 503s instead of pinning every worker.
+
+
+class PasswordHasherBusy(Exception):
+    """Raised when the hashing pool is saturated; map to 503 + Retry-After."""
+
+
+_executor = None
+_executor_pid = None
+_slots = None
+_pool_lock = threading.Lock()
+_dummy_hashes = {}  # rounds -> hash used for constant-time misses
+
+
+def _get_executor():
+    """Creates the pool lazily, and again in a forked worker process."""
+    global _executor, _executor_pid, _slots
+    if _executor is None or _executor_pid != os.getpid():
+        with _pool_lock:
+            if _executor is None or _executor_pid != os.getpid():
+                _executor = ThreadPoolExecutor(
+                    max_workers=current_app.config["BCRYPT_POOL_SIZE"],
+                    thread_name_prefix="bcrypt",
+                )
+                _slots = threading.BoundedSemaphore(
+                    current_app.config["BCRYPT_MAX_PENDING"]
+                )
+                _executor_pid = os.getpid()
+    return _executor
+
+
+def _run(fn, *args):
+    """Runs a bcrypt call in the pool and waits for its result."""
+    executor = _get_executor()
+    if not _slots.acquire(blocking=False):
+        raise PasswordHasherBusy("Too many concurrent password operations")
+
+    try:
+        future = executor.submit(fn, *args)
+    except Exception:
+        _slots.release()
+        raise
+    future.add_done_callback(lambda _: _slots.release())
+    try:
+        return future.result(timeout=current_app.config["BCRYPT_TIMEOUT"])
+    except TimeoutError:
+        raise PasswordHasherBusy("Password operation timed out")
+
+
+def hash_password(password):
+    """Hashes a password with the configured cost (BCRYPT_LOG_ROUNDS)."""
+    rounds = current_app.config["BCRYPT_LOG_ROUNDS"]
+    return _run(bcrypt.generate_password_hash, password, rounds).decode("utf-8")
+
+
+def verify_password(password_hash, password):
+    """Checks a password against its stored hash."""
+    return _run(bcrypt.check_password_hash, password_hash, password)
+
+
+def verify_dummy_password(password):
+    """
+    Spends the same time as a real verification, for logins of unknown users,
+    so response times do not reveal which emails are registered.
+    """
+    rounds = current_app.config["BCRYPT_LOG_ROUNDS"]
+    if rounds not in _dummy_hashes:
+        _dummy_hashes[rounds] = hash_password("dummy-password-for-timing")
+    verify_password(_dummy_hashes[rounds], password)
+    return False
+
+
+def needs_rehash(password_hash):
+    """True if the hash was made with a cost other than BCRYPT_LOG_ROUNDS."""
+    try:
+        # Format: $2b$<rounds>$<salt+hash>
+        rounds = int(password_hash.split("$")[2])
+    except (IndexError, ValueError, AttributeError):
+        return True
+    return rounds != current_app.config["BCRYPT_LOG_ROUNDS"]
@@ -0,0 +1,38 @@
+import signal
+import threading
+import click
+from flask import current_app
+from flask.cli import AppGroup
+from .handlers import sweep_uploads
+from .runner import JobWorker
+
+# Registered in create_app: `flask jobs <command>`
+jobs_cli = AppGroup("jobs", help="Background job commands.")
+
+
+@jobs_cli.command("work")
+@click.option("--threads", default=None, type=int, help="Defaults to JOBS_WORKERS.")
+def work_command(threads):
+    """Runs queued jobs until interrupted (SIGINT/SIGTERM)."""
+    worker = JobWorker(current_app._get_current_object(), threads=threads).start()
+    print(f"Job worker {worker.worker_id} running {worker.threads} threads.")
+
+    stopping = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stopping.set())
+    signal.signal(signal.SIGINT, lambda signum, frame: stopping.set())
+    stopping.wait()
+
+    # Jobs still running are claimed again once their lease expires
+    worker.stop(timeout=current_app.config["JOBS_POLL_INTERVAL"] + 5)
+
+
+@jobs_cli.command("sweep")
+@click.option("--grace", default=None, type=int, help="Defaults to JOBS_SWEEP_GRACE.")
+def sweep_command(grace):
+    """Removes orphaned upload files now."""
+    summary = sweep_uploads(grace=grace)
+    print(
+        f"Removed {summary['partial']} partial uploads, {summary['legacy']} "
+        f"unreferenced legacy files and {summary['blobs']} unreferenced blobs; "
+        f"released {summary['refs']} references held by no task."
+    )
@@ -0,0 +1,40 @@
+from flask import Blueprint, jsonify
+from flask_jwt_extended import jwt_required
+from bson.objectid import ObjectId
+from src.utils.decorators import role_required
+from .models import get_job_collection
+
+jobs_bp = Blueprint("jobs", __name__)
+
+# Job fields exposed on the API (payloads and journals stay internal)
+JOB_STATUS_PROJECTION = {
+    "type": 1,
+    "status": 1,
+    "attempts": 1,
+    "progress.tasks_deleted": 1,
+    "progress.tasks_reassigned": 1,
+    "result": 1,
+    "last_error": 1,
+    "created_at": 1,
+    "started_at": 1,
+    "finished_at": 1,
+}
+
+
+# --- READ JOB STATUS (Admin Only) ---
+@jobs_bp.route("/<job_id>", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def get_job(job_id):
+    """Admin endpoint to follow a background job (e.g. a user cascade)."""
+    try:
+        job = get_job_collection().find_one(
+            {"_id": ObjectId(job_id)}, JOB_STATUS_PROJECTION
+        )
+    except:
+        return jsonify({"msg": "Invalid Job ID format"}), 400
+
+    if not job:
+        return jsonify({"msg": "Job not found"}), 404
+
+    return jsonify(job), 200
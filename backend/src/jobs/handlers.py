@@ -0,0 +1,242 @@
+import os
+import re
+import time
+from datetime import timedelta
+from bson.objectid import ObjectId
+from flask import current_app
+from pymongo import ASCENDING
+from src.auth.models import get_user_collection
+from src.tasks.models import get_task_collection
+from src.tasks.stats import record_task_changes, TASK_STATS_PROJECTION
+from src.utils.blob_store import (
+    delete_unreferenced_blob,
+    finish_deletion,
+    get_blob_collection,
+    release_attachments,
+    release_stale_refs,
+    release_unheld_attachments,
+)
+from src.utils.counting import invalidate_counts
+from src.utils.date_utils import utcnow
+from src.utils.file_handler import PARTIAL_SUFFIX
+from src.utils.storage import BLOB_DIRECTORY
+from .runner import job_handler, update_job_progress
+
+# Files written by save_uploaded_files before the blob store: <uuid4 hex>_<name>
+LEGACY_UPLOAD_NAME = re.compile(r"^[0-9a-f]{32}_")
+
+
+@job_handler("release_attachments")
+def release_attachments_job(job):
+    """Releases the attachments of deleted tasks (idempotent: refs are by name)."""
+    release_attachments(job["payload"]["attachments"])
+
+
+# Task fields referencing a user, in the order user cascades process them
+CASCADE_USER_FIELDS = ("assigned_to", "created_by")
+
+
+@job_handler("cascade_delete_user")
+def cascade_delete_user_job(job):
+    """
+    Deletes the tasks a user was assigned or created, or reassigns them to
+    `reassign_to` when the payload has one, releases the deleted tasks'
+    attachments, then deletes the user. The user goes last so that a job that
+    fails for good leaves it in place, with what is left of its tasks, for
+    another DELETE to retry.
+
+    Reassignments are counted per user field: a task the user both created
+    and was assigned is reassigned (and counted) once for each.
+
+    Tasks are processed per user field in `_id` order, JOBS_CASCADE_BATCH_SIZE
+    at a time with a JOBS_CASCADE_PAUSE pause in between, so no single write
+    is unbounded. The field and last `_id` done are checkpointed on the job:
+    an interrupted cascade resumes after them. Each batch's attachments are
+    journaled before its tasks are deleted, so a retry still releases them.
+
+    Each task is written with find_one_and_*, guarded by the user field: the
+    statistics and attachments follow the documents actually deleted or
+    reassigned, not the batch as read (a task changed or reassigned in
+    between is counted as it was written, or skipped).
+    """
+    payload = job["payload"]
+    user_id = ObjectId(payload["user_id"])
+    reassign_to = payload.get("reassign_to")
+    reassign_to = ObjectId(reassign_to) if reassign_to else None
+
+    config = current_app.config
+    batch_size = config["JOBS_CASCADE_BATCH_SIZE"]
+    pause = config["JOBS_CASCADE_PAUSE"]
+    collection = get_task_collection()
+    progress = job.get("progress", {})
+    if reassign_to:
+        reassigned = {field: 0 for field in CASCADE_USER_FIELDS}
+        reassigned.update(progress.get("tasks_reassigned", {}))
+    else:
+        deleted = progress.get("tasks_deleted", 0)
+    checkpoint = progress.get("checkpoint")
+
+    # Finish the batch an interrupted attempt had started (its tasks may not
+    # all have been deleted)
+    release_unheld_attachments(job.get("pending_attachments"))
+
+    # Resume at the checkpointed field (earlier ones are finished)
+    start = CASCADE_USER_FIELDS.index(checkpoint["field"]) if checkpoint else 0
+    for field in CASCADE_USER_FIELDS[start:]:
+        last_id = None
+        if checkpoint and checkpoint["field"] == field:
+            last_id = checkpoint["last_id"]
+
+        while True:
+            # Equality + _id range: walks the "<field>_id" index
+            batch_filter = {field: user_id}
+            if last_id is not None:
+                batch_filter["_id"] = {"$gt": last_id}
+            batch = list(
+                collection.find(
+                    batch_filter, {"attached_documents": 1, **TASK_STATS_PROJECTION}
+                )
+                .sort("_id", ASCENDING)
+                .limit(batch_size)
+            )
+            if not batch:
+                break
+            batch_ids = [task["_id"] for task in batch]
+            last_id = batch_ids[-1]
+
+            if reassign_to:
+                changes = []
+                for task_id in batch_ids:
+                    # Only while still referencing the user (idempotent on retry)
+                    before = collection.find_one_and_update(
+                        {"_id": task_id, field: user_id},
+                        {"$set": {field: reassign_to}, "$inc": {"version": 1}},
+                        projection=TASK_STATS_PROJECTION,
+                    )
+                    if before is not None:
+                        changes.append((before, {**before, field: reassign_to}))
+                reassigned[field] += len(changes)
+                record_task_changes(changes)
+                update = {f"progress.tasks_reassigned.{field}": reassigned[field]}
+            else:
+                attachments = [
+                    doc for task in batch for doc in task.get("attached_documents", [])
+                ]
+                update_job_progress(job, {"pending_attachments": attachments})
+
+                removed = []
+                for task_id in batch_ids:
+                    task = collection.find_one_and_delete(
+                        {"_id": task_id, field: user_id},
+                        projection={"attached_documents": 1, **TASK_STATS_PROJECTION},
+                    )
+                    if task is not None:
+                        removed.append(task)
+                record_task_changes((task, None) for task in removed)
+                release_attachments(
+                    [
+                        doc
+                        for task in removed
+                        for doc in task.get("attached_documents", [])
+                    ]
+                )
+                deleted += len(removed)
+                update = {"pending_attachments": [], "progress.tasks_deleted": deleted}
+
+            invalidate_counts(collection.name)
+            update["progress.checkpoint"] = {"field": field, "last_id": last_id}
+            update_job_progress(job, update)
+
+            if len(batch) < batch_size:
+                break
+            # Let replication and other clients catch up between batches
+            time.sleep(pause)
+
+    users = get_user_collection()
+    users.delete_one({"_id": user_id})
+    invalidate_counts(users.name)
+
+    if reassign_to:
+        return {"tasks_reassigned": reassigned, "reassigned_to": str(reassign_to)}
+    return {"tasks_deleted": deleted}
+
+
+@job_handler("sweep_uploads")
+def sweep_uploads_job(job):
+    """Periodic sweep of orphaned files (JOBS_SWEEP_INTERVAL)."""
+    return sweep_uploads()
+
+
+def sweep_uploads(grace=None):
+    """
+    Reclaims storage nothing references any more. Files younger than `grace`
+    seconds (JOBS_SWEEP_GRACE) are left alone, as they may belong to a request
+    still in flight.
+
+    * `.part` files of uploads whose process died before cleaning up.
+    * Legacy per-upload files that no task references.
+    * References held by no task (a deleted task whose release job was never
+      enqueued); the last one released deletes its blob.
+    * Blobs without references (a release interrupted before deleting), stale
+      deletions, and local blob files without a `blobs` document.
+
+    Returns:
+        dict: Counts of removed partial uploads, legacy files, released
+        references and blobs.
+    """
+    if grace is None:
+        grace = current_app.config["JOBS_SWEEP_GRACE"]
+    upload_folder = current_app.config["UPLOAD_FOLDER"]
+    cutoff = time.time() - grace
+    summary = {"partial": 0, "legacy": 0, "refs": 0, "blobs": 0}
+
+    # 1. Top-level files: partial and legacy uploads
+    referenced_names = None
+    for entry in os.scandir(upload_folder):
+        if not entry.is_file() or entry.stat().st_mtime > cutoff:
+            continue
+        if entry.name.endswith(PARTIAL_SUFFIX):
+            os.remove(entry.path)
+            summary["partial"] += 1
+        elif LEGACY_UPLOAD_NAME.match(entry.name):
+            if referenced_names is None:
+                referenced_names = set(
+                    get_task_collection().distinct("attached_documents.stored_name")
+                )
+            if entry.name not in referenced_names:
+                os.remove(entry.path)
+                summary["legacy"] += 1
+
+    # 2. References of deleted tasks whose release was lost, blob documents
+    # without references, and interrupted deletions
+    summary["refs"] = release_stale_refs(older_than=grace)
+    blobs = get_blob_collection()
+    for blob in blobs.find({"refs": {"$size": 0}}, {"_id": 1}):
+        delete_unreferenced_blob(blob["_id"])
+        summary["blobs"] += 1
+    stale = utcnow() - timedelta(seconds=grace)
+    for blob in blobs.find({"deleting_at": {"$lt": stale}}, {"_id": 1}):
+        finish_deletion(blob["_id"], older_than=grace)
+        summary["blobs"] += 1
+
+    # 3. Local blob files without a document (one query per shard directory)
+    if current_app.config["ATTACHMENT_STORAGE"] == "local":
+        blob_root = os.path.join(upload_folder, BLOB_DIRECTORY)
+        for directory, _, filenames in os.walk(blob_root):
+            candidates = [
+                name
+                for name in filenames
+                if os.path.getmtime(os.path.join(directory, name)) <= cutoff
+            ]
+            if not candidates:
+                continue
+            known = {
+                blob["_id"]
+                for blob in blobs.find({"_id": {"$in": candidates}}, {"_id": 1})
+            }
+            for name in candidates:
+                if name not in known:
+                    os.remove(os.path.join(directory, name))
+                    summary["blobs"] += 1
+
+    return summary
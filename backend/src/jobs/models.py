@@ -0,0 +1,22 @@
+from src import mongo  # Import the PyMongo instance
+
+# Lifecycle of a job document:
+#   queued -> running -> done
+#              |  ^
+#              v  |  (failed attempt, retried after a backoff)
+#            queued ... -> failed (after JOBS_MAX_ATTEMPTS)
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_DONE = "done"
+JOB_FAILED = "failed"
+JOB_STATUSES = (JOB_QUEUED, JOB_RUNNING, JOB_DONE, JOB_FAILED)
+
+
+def get_job_collection():
+    """Returns the MongoDB jobs collection (the persistent queue)."""
+    return mongo.db.jobs
+
+
+def get_job_schedule_collection():
+    """Returns the collection tracking when each periodic job last ran."""
+    return mongo.db.job_schedules
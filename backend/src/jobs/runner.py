@@ -0,0 +1,268 @@
+import os
+import socket
+import threading
+from datetime import timedelta
+from flask import current_app
+from pymongo import ASCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError, PyMongoError
+from src.utils.date_utils import utcnow
+from .models import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    get_job_collection,
+    get_job_schedule_collection,
+)
+
+# --- Job Queue ---
+# Jobs are documents in the `jobs` collection, claimed atomically with
+# find_one_and_update by worker threads (`flask jobs work`, or threads started
+# in the app process when JOBS_RUN_IN_APP is set). A claim holds a lease; a job
+# whose worker died is claimed again once the lease expires. Failed attempts are
+# retried with exponential backoff, up to JOBS_MAX_ATTEMPTS.
+
+# Registered handlers: job type -> fn(job), see job_handler
+JOB_HANDLERS = {}
+
+# Periodic job types -> config key of their interval in seconds (0 disables)
+PERIODIC_JOBS = {"sweep_uploads": "JOBS_SWEEP_INTERVAL"}
+
+
+def job_handler(job_type):
+    """
+    Custom decorator registering the handler of a job type. The handler gets
+    the job document and may return a JSON-serializable result.
+
+    Handlers must be idempotent: a job runs again after a failed attempt or
+    after its worker died, possibly after doing part of the work.
+
+    Usage:
+    @job_handler('release_attachments')
+    def release_attachments_job(job):
+        # ... job["payload"]
+    """
+
+    def wrapper(fn):
+        JOB_HANDLERS[job_type] = fn
+        return fn
+
+    return wrapper
+
+
+def enqueue(job_type, payload=None, delay=0):
+    """
+    Adds a job to the queue.
+
+    With JOBS_EAGER (tests) the job is also claimed and run immediately, still
+    through the collection, so it behaves like a job run by a worker.
+
+    Returns:
+        ObjectId: The job's ID.
+    """
+    now = utcnow()
+    job = {
+        "type": job_type,
+        "payload": payload or {},
+        "status": JOB_QUEUED,
+        "attempts": 0,
+        "run_at": now + timedelta(seconds=delay),
+        "created_at": now,
+    }
+    job_id = get_job_collection().insert_one(job).inserted_id
+
+    if current_app.config["JOBS_EAGER"]:
+        claimed = _claim({"_id": job_id}, worker_id="eager")
+        if claimed:
+            run_job(claimed)
+    return job_id
+
+
+def _lease_expiry():
+    return utcnow() + timedelta(seconds=current_app.config["JOBS_LEASE_SECONDS"])
+
+
+def _claim(job_filter, worker_id):
+    now = utcnow()
+    return get_job_collection().find_one_and_update(
+        {
+            **job_filter,
+            "$or": [
+                {"status": JOB_QUEUED, "run_at": {"$lte": now}},
+                # Worker died (or stalled) while running it
+                {"status": JOB_RUNNING, "lease_expires_at": {"$lt": now}},
+            ],
+        },
+        {
+            "$set": {
+                "status": JOB_RUNNING,
+                "worker": worker_id,
+                "started_at": now,
+                "lease_expires_at": _lease_expiry(),
+            },
+            "$inc": {"attempts": 1},
+        },
+        sort=[("run_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER,
+    )
+
+
+def claim_job(worker_id):
+    """Claims the next due job, or returns None if there is none."""
+    return _claim({}, worker_id)
+
+
+def _owned(job):
+    """Filter matching the job only while this attempt still owns it."""
+    return {"_id": job["_id"], "status": JOB_RUNNING, "attempts": job["attempts"]}
+
+
+def update_job_progress(job, fields):
+    """Records progress on a running job and extends its lease (long jobs)."""
+    get_job_collection().update_one(
+        _owned(job), {"$set": {**fields, "lease_expires_at": _lease_expiry()}}
+    )
+
+
+def retry_delay(attempts):
+    """Seconds before retrying a job that failed its `attempts`-th attempt."""
+    config = current_app.config
+    return min(
+        config["JOBS_BACKOFF_MAX"], config["JOBS_BACKOFF_BASE"] * 2 ** (attempts - 1)
+    )
+
+
+def run_job(job):
+    """
+    Runs a claimed job and records the outcome.
+
+    Returns:
+        bool: True if the job succeeded.
+    """
+    config = current_app.config
+    collection = get_job_collection()
+    try:
+        handler = JOB_HANDLERS.get(job["type"])
+        if handler is None:
+            raise LookupError(f"No handler registered for job type '{job['type']}'")
+        result = handler(job)
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+        now = utcnow()
+        if job["attempts"] >= config["JOBS_MAX_ATTEMPTS"]:
+            current_app.logger.error(
+                f"Job {job['_id']} ({job['type']}) failed: {error}"
+            )
+            update = {
+                "status": JOB_FAILED,
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=config["JOBS_RETENTION"]),
+            }
+        else:
+            current_app.logger.warning(
+                f"Job {job['_id']} ({job['type']}) attempt {job['attempts']} "
+                f"failed, retrying: {error}"
+            )
+            update = {
+                "status": JOB_QUEUED,
+                "run_at": now + timedelta(seconds=retry_delay(job["attempts"])),
+            }
+        collection.update_one(
+            _owned(job),
+            {
+                "$set": {**update, "last_error": error},
+                "$unset": {"lease_expires_at": ""},
+            },
+        )
+        return False
+
+    now = utcnow()
+    collection.update_one(
+        _owned(job),
+        {
+            "$set": {
+                "status": JOB_DONE,
+                "result": result,
+                "finished_at": now,
+                "expires_at": now + timedelta(seconds=config["JOBS_RETENTION"]),
+            },
+            "$unset": {"lease_expires_at": ""},
+        },
+    )
+    return True
+
+
+def enqueue_due_periodic_jobs():
+    """Enqueues each periodic job once per interval, across all workers."""
+    now = utcnow()
+    for job_type, interval_key in PERIODIC_JOBS.items():
+        interval = current_app.config[interval_key]
+        if not interval:
+            continue
+        try:
+            # Matches only when due; otherwise the upsert collides with the
+            # existing schedule document
+            get_job_schedule_collection().update_one(
+                {"_id": job_type, "next_run_at": {"$lte": now}},
+                {"$set": {"next_run_at": now + timedelta(seconds=interval)}},
+                upsert=True,
+            )
+        except DuplicateKeyError:
+            continue
+        enqueue(job_type)
+
+
+class JobWorker:
+    """
+    Pool of daemon threads running queued jobs. A job interrupted by shutdown
+    is claimed again by another worker once its lease expires.
+    """
+
+    def __init__(self, app, threads=None):
+        self.app = app
+        self.threads = threads or app.config["JOBS_WORKERS"]
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._pool = []
+
+    def start(self):
+        for index in range(self.threads):
+            thread = threading.Thread(
+                target=self._loop,
+                args=(f"{self.worker_id}:{index}",),
+                name=f"jobs-{index}",
+                daemon=True,
+            )
+            thread.start()
+            self._pool.append(thread)
+        return self
+
+    def stop(self, timeout=None):
+        self._stop.set()
+        for thread in self._pool:
+            thread.join(timeout)
+
+    def _loop(self, worker_id):
+        with self.app.app_context():
+            poll_interval = self.app.config["JOBS_POLL_INTERVAL"]
+            while not self._stop.is_set():
+                try:
+                    enqueue_due_periodic_jobs()
+                    job = claim_job(worker_id)
+                except PyMongoError as e:
+                    current_app.logger.warning(f"Job queue unavailable: {e}")
+                    job = None
+
+                if job is None:
+                    self._stop.wait(poll_interval)
+                    continue
+                try:
+                    run_job(job)
+                except Exception:
+                    # e.g. the outcome could not be recorded (network blip,
+                    # stepdown): the job is claimed again once its lease
+                    # expires. Keep this thread alive.
+                    current_app.logger.exception(
+                        f"Job {job['_id']} ({job['type']}) could not be run"
+                    )
+                    self._stop.wait(poll_interval)
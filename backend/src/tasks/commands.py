@@ -0,0 +1,187 @@
+import hashlib
+import os
+import click
+from uuid import uuid4
+from flask import current_app
+from flask.cli import AppGroup
+from pymongo import UpdateOne
+from src.utils.blob_store import release_blob, store_blob
+from src.utils.date_utils import parse_datetime
+from src.utils.file_handler import PARTIAL_SUFFIX
+from .models import get_task_collection
+from .stats import check_task_stats, rebuild_task_stats
+
+# Registered in create_app: `flask tasks <command>`
+tasks_cli = AppGroup("tasks", help="Task maintenance commands.")
+
+
+def migrate_due_dates(batch_size=1000):
+    """
+    Converts string due dates to BSON datetimes in place.
+
+    Streams only `_id`/`due_date` of the affected documents through a server-side
+    cursor and writes them back in unordered bulk batches, so memory use is
+    bounded by `batch_size`. Each update is guarded by the original string, so
+    concurrent edits are never overwritten.
+
+    Returns:
+        dict: Counts of converted, cleared (empty strings) and invalid dates.
+    """
+    collection = get_task_collection()
+    summary = {"converted": 0, "cleared": 0, "invalid": 0}
+    batch = []
+
+    def flush():
+        if batch:
+            collection.bulk_write(batch, ordered=False)
+            batch.clear()
+
+    cursor = collection.find(
+        {"due_date": {"$type": "string"}}, {"due_date": 1}
+    ).batch_size(batch_size)
+
+    for task in cursor:
+        original = task["due_date"]
+        try:
+            due_date = parse_datetime(original)
+        except ValueError:
+            # Left untouched for manual review
+            summary["invalid"] += 1
+            continue
+
+        summary["cleared" if due_date is None else "converted"] += 1
+        batch.append(
+            UpdateOne(
+                {"_id": task["_id"], "due_date": original},
+                {"$set": {"due_date": due_date}, "$inc": {"version": 1}},
+            )
+        )
+        if len(batch) >= batch_size:
+            flush()
+
+    flush()
+    return summary
+
+
+@tasks_cli.command("migrate-due-dates")
+@click.option("--batch-size", default=1000, show_default=True, type=int)
+@click.option(
+    "--rebuild-stats",
+    is_flag=True,
+    help="Also rebuild the task statistics; only while task writes are stopped.",
+)
+def migrate_due_dates_command(batch_size, rebuild_stats):
+    """
+    Converts string due dates to BSON datetimes.
+
+    Only datetime due dates count towards the overdue statistics, so converted
+    tasks leave the counters off until they are rebuilt. The rebuild replaces
+    every counter and loses the task writes made while it runs: pass
+    --rebuild-stats only while writes are quiesced (API and job workers
+    stopped), or run `flask tasks rebuild-stats` later in such a window.
+    """
+    summary = migrate_due_dates(batch_size=batch_size)
+    print(
+        f"Converted {summary['converted']} due dates, cleared {summary['cleared']} "
+        f"empty values, left {summary['invalid']} invalid values untouched."
+    )
+    if not summary["converted"]:
+        return
+    if rebuild_stats:
+        rebuild_task_stats()
+        print("Rebuilt the task statistics.")
+    else:
+        print(
+            "The task statistics are now off; run `flask tasks rebuild-stats` "
+            "while task writes are stopped."
+        )
+
+
+def migrate_attachments():
+    """
+    Moves attachments saved under a per-upload `filepath` into the blob store.
+
+    Each file is hashed and copied into the store (deduplicated like a new
+    upload), then the task's metadata is switched to the blob key, guarded by
+    the old path. The old file is removed once its task no longer points at it.
+
+    Returns:
+        dict: Counts of migrated and missing (file not found) attachments.
+    """
+    collection = get_task_collection()
+    chunk_size = current_app.config["UPLOAD_CHUNK_SIZE"]
+    summary = {"migrated": 0, "missing": 0}
+
+    cursor = collection.find(
+        {"attached_documents.filepath": {"$exists": True}}, {"attached_documents": 1}
+    )
+    for task in cursor:
+        for doc in task["attached_documents"]:
+            filepath = doc.get("filepath")
+            if not filepath:
+                continue
+            if not os.path.exists(filepath):
+                summary["missing"] += 1
+                continue
+
+            # Copy (rather than move) so the task stays valid until updated
+            partial_path = os.path.join(
+                current_app.config["UPLOAD_FOLDER"], uuid4().hex + PARTIAL_SUFFIX
+            )
+            sha256 = hashlib.sha256()
+            with open(filepath, "rb") as source, open(partial_path, "wb") as target:
+                while chunk := source.read(chunk_size):
+                    sha256.update(chunk)
+                    target.write(chunk)
+            blob_key = sha256.hexdigest()
+            store_blob(
+                partial_path, blob_key, os.path.getsize(filepath), doc["stored_name"]
+            )
+
+            result = collection.update_one(
+                {"_id": task["_id"], "attached_documents.filepath": filepath},
+                {
+                    "$set": {"attached_documents.$.blob_key": blob_key},
+                    "$unset": {"attached_documents.$.filepath": ""},
+                },
+            )
+            if result.modified_count:
+                os.remove(filepath)
+                summary["migrated"] += 1
+            else:
+                # Task or attachment deleted meanwhile
+                release_blob(blob_key, doc["stored_name"])
+
+    return summary
+
+
+@tasks_cli.command("migrate-attachments")
+def migrate_attachments_command():
+    """Moves legacy per-upload attachment files into the blob store."""
+    summary = migrate_attachments()
+    print(
+        f"Migrated {summary['migrated']} attachments, "
+        f"{summary['missing']} files were missing."
+    )
+
+
+@tasks_cli.command("rebuild-stats")
+def rebuild_stats_command():
+    """Recomputes the task statistics counters from the tasks."""
+    assignees = rebuild_task_stats()
+    print(f"Rebuilt the task statistics of {assignees} assignees.")
+
+
+@tasks_cli.command("check-stats")
+def check_stats_command():
+    """Compares the task statistics counters with the tasks (exit code 1 if off)."""
+    mismatches = check_task_stats()
+    for mismatch in mismatches:
+        print(
+            f"Assignee {mismatch['assigned_to']}: expected {mismatch['expected']}, "
+            f"found {mismatch['actual']}"
+        )
+    if mismatches:
+        print(f"{len(mismatches)} assignees differ; run `flask tasks rebuild-stats`.")
+        raise SystemExit(1)
+    print("Task statistics are consistent.")
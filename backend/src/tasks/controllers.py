@@ -1,16 +1,77 @@
-from flask import Blueprint, request, jsonify, send_file
+from flask import (
+    Blueprint,
+    Response,
+    request,
+    jsonify,
+    send_file,
+    current_app,
+    stream_with_context,
+)
 from flask_jwt_extended import jwt_required, get_jwt_identity, get_jwt
 from bson.objectid import ObjectId
-from src.utils.file_handler import save_uploaded_files, allowed_file
+from bson.errors import InvalidId
+from pymongo import InsertOne, UpdateOne, DeleteOne, ReturnDocument
+from pymongo.errors import BulkWriteError, PyMongoError
+from src.utils.file_handler import save_uploaded_files, allowed_file, streams_uploads
+from src.utils.blob_store import (
+    attachment_local_path,
+    open_attachment,
+    release_attachments,
+)
+from src.utils.storage import offload_download
+from src.jobs.runner import enqueue
+from src.utils.date_utils import format_datetime, stored_datetime
 from src.utils.decorators import role_required  # We'll need this for admin operations
-from .models import get_task_collection, TASK_STATUSES, TASK_PRIORITIES
+from src.utils.rate_limit import rate_limit
+from .models import (
+    get_task_collection,
+    task_projection,
+    TASK_FIELDS,
+    TASK_LIST_FIELDS,
+    TASK_DETAIL_FIELDS,
+    TASK_EXPORT_FIELDS,
+)
 import os
+import csv
+import io
+from collections import Counter
+from datetime import datetime
 from flask_jwt_extended import jwt_required, get_jwt_identity  # Add get_jwt_identity
-from src.utils.fsp_parser import parse_task_fsp_params  # Import the parser
-
+from src.utils.fsp_parser import (
+    parse_task_fsp_params,
+    parse_cursor_param,
+    parse_count_param,
+    parse_fields_param,
+    TEXT_SCORE,
+)
+from src.utils.pagination import fetch_keyset_page
+from src.utils.counting import count_total, fetch_counted_page, invalidate_counts
+from .validation import build_task_document, build_task_update
+from .stats import (
+    get_task_stats,
+    record_task_changes,
+    TASK_STATS_FIELDS,
+    TASK_STATS_PROJECTION,
+)
 
 tasks_bp = Blueprint("tasks", __name__)
-TaskCollection = get_task_collection()
+
+# ObjectId fields that may appear (or be projected out) in task responses
+TASK_OBJECTID_FIELDS = ("_id", "assigned_to", "created_by")
+
+
+def serialize_task(task):
+    """
+    Converts the ObjectIds and the due date present in a (possibly projected)
+    task to strings, for CSV rows. JSON responses need no conversion: the
+    app's JSON provider serializes these types (see json_provider).
+    """
+    for field in TASK_OBJECTID_FIELDS:
+        if task.get(field) is not None:
+            task[field] = str(task[field])
+    if isinstance(task.get("due_date"), datetime):
+        task["due_date"] = format_datetime(task["due_date"])
+    return task
 
 
 # --- 1. LIST TASKS (Filtering, Sorting, Pagination) ---
@@ -21,6 +82,19 @@ def list_tasks():
     Lists tasks with filtering (status, priority, due date, assigned_to),
     sorting, and pagination.
 
+    Pagination is page/skip based by default; passing `cursor=` switches to
+    keyset pagination with opaque next/prev cursors.
+
+    `count=` selects how the total is computed: exact (default in page mode),
+    facet, estimated, cached or none (default in cursor mode). A cached total
+    may miss writes made through other processes for up to COUNT_CACHE_TTL
+    seconds.
+
+    `fields=` limits the returned fields (defaults to TASK_LIST_FIELDS).
+
+    `q=` searches the title and description (text index); results then carry
+    their relevance `score` and are sorted by it unless `sort=` is given.
+
     Non-admin users only see tasks assigned to them.
     Admin users see all tasks.
     """
@@ -29,7 +103,15 @@ def list_tasks():
 
     # 1. Parse FSP parameters from the request
     # NOTE: We pass 5 as the default limit for initial load optimization
-    base_filter, query_sort, skip, limit = parse_task_fsp_params(default_limit=5)
+    try:
+        base_filter, query_sort, skip, limit = parse_task_fsp_params(default_limit=5)
+        cursor = parse_cursor_param(query_sort)
+        count_strategy = parse_count_param(
+            default="none" if cursor is not None else "exact"
+        )
+        fields = parse_fields_param(TASK_FIELDS, TASK_LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
 
     # 2. Enforce Task Visibility/Authorization Filter
     if user_role != "admin":
@@ -38,34 +120,63 @@ def list_tasks():
 
     # Combine the authorization filter with the user-defined filters
     final_query_filter = base_filter
+    projection = task_projection(fields)
+    if "$text" in final_query_filter:
+        projection["score"] = TEXT_SCORE
 
-    # 3. Execute the Query
-    # Count total items matching the filter (for pagination metadata)
-    total_count = TaskCollection.count_documents(final_query_filter)
+    collection = get_task_collection()
 
-    # Fetch tasks with FSP
-    tasks_cursor = (
-        TaskCollection.find(final_query_filter).sort(query_sort).skip(skip).limit(limit)
-    )
+    # 3a. Keyset (cursor) mode: range predicates instead of skip
+    if cursor is not None:
+        tasks, next_cursor, prev_cursor = fetch_keyset_page(
+            collection, final_query_filter, query_sort, limit, cursor, projection
+        )
+        total_count, count_used = count_total(
+            collection, final_query_filter, count_strategy
+        )
 
-    task_list = []
-    for task in tasks_cursor:
-        # Convert ObjectIds to strings for JSON serialization
-        task["_id"] = str(task["_id"])
-        task["assigned_to"] = str(task["assigned_to"])
-        task_list.append(task)
+        response_data = {
+            "tasks": tasks,
+            "pagination": {
+                "mode": "cursor",
+                "count_strategy": count_used,
+                "total_tasks": total_count,
+                "page_size": limit,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+            },
+        }
+        return jsonify(response_data), 200
+
+    # 3b. Page mode: Execute the Query
+    # Fetch tasks with FSP, plus the total count using the requested strategy
+    tasks, total_count, count_used, has_more = fetch_counted_page(
+        collection,
+        final_query_filter,
+        query_sort,
+        skip,
+        limit,
+        count_strategy,
+        projection,
+    )
 
     # 4. Prepare Pagination Metadata
-    total_pages = (total_count + limit - 1) // limit
+    # Without a count (count=none) the number of pages is unknown
+    total_pages = None
+    if total_count is not None:
+        total_pages = (total_count + limit - 1) // limit
     current_page = skip // limit + 1
 
     response_data = {
-        "tasks": task_list,
+        "tasks": tasks,
         "pagination": {
+            "mode": "page",
+            "count_strategy": count_used,
             "total_tasks": total_count,
             "current_page": current_page,
             "total_pages": total_pages,
             "page_size": limit,
+            "has_more": has_more,
         },
     }
 
@@ -91,9 +202,93 @@ def check_task_ownership_or_admin(task):
     return False
 
 
+def authorized_task_filter(task_id):
+    """
+    Filter matching a task only if the current user may access it (assigned to
+    them, or any task for admins), so queries authorize without a prior read.
+
+    Raises:
+        InvalidId: If task_id is not a valid ObjectId.
+    """
+    task_filter = {"_id": ObjectId(task_id)}
+    if get_jwt().get("role") != "admin":
+        task_filter["assigned_to"] = ObjectId(get_jwt_identity())
+    return task_filter
+
+
+def task_miss_response(task_filter, forbidden_msg):
+    """
+    Explains why an authorized query matched nothing, with one probe by _id.
+
+    Returns:
+        The 404 (no such task) or 403 (not the user's task) response, or None
+        if the task is accessible (a write's If-Match version did not match).
+    """
+    task = get_task_collection().find_one(
+        {"_id": task_filter["_id"]}, {"assigned_to": 1}
+    )
+    if not task:
+        return jsonify({"msg": "Task not found"}), 404
+    if not check_task_ownership_or_admin(task):
+        return jsonify({"msg": forbidden_msg}), 403
+    return None
+
+
+# --- Versioning Helpers (ETag / If-Match) ---
+def task_etag(task):
+    """The task's version as a strong ETag value (0 before versioning)."""
+    return str(task.get("version", 0))
+
+
+def if_match_filter():
+    """
+    Turns the If-Match header into a filter on the task version, so a write
+    only applies while the task is still at a version the client has seen.
+
+    Returns:
+        dict: Filter to merge into the write's filter ({} when If-Match is
+        absent or `*`), or None if no listed ETag can be a version.
+    """
+    if_match = request.if_match
+    if not if_match or if_match.star_tag:
+        return {}
+
+    # Strong ETags only: If-Match uses the strong comparison
+    versions = {int(etag) for etag in if_match if etag.isdigit()}
+    if not versions:
+        return None
+    if 0 in versions:
+        versions.add(None)  # Matches tasks without a version field
+    return {"version": {"$in": list(versions)}}
+
+
+def precondition_failed():
+    """Response for a write whose If-Match no longer matches the task."""
+    return jsonify({"msg": "Task has been modified since it was retrieved"}), 412
+
+
+def remove_task_files(task):
+    """
+    Hands a deleted task's attachments to a background job for release. Blobs
+    shared with other tasks are kept; each is deleted with its last reference.
+    If the job cannot be enqueued, the periodic sweep releases the references
+    instead (release_stale_refs): the task is gone either way.
+    """
+    if not task.get("attached_documents"):
+        return
+    try:
+        enqueue("release_attachments", {"attachments": task["attached_documents"]})
+    except PyMongoError as e:
+        current_app.logger.warning(
+            f"Attachment release of task {task['_id']} left to the sweeper: {e}"
+        )
+
+
 # --- 1. CREATE Task ---
 @tasks_bp.route("", methods=["POST"])
 @jwt_required()
+@rate_limit("task_write")
+@streams_uploads
 def create_task():
     """Create a new task, handling multi-part form data for files."""
     user_id = get_jwt_identity()
@@ -101,19 +296,13 @@ def create_task():
     # Flask handles file and form data separately for multi-part forms
     data = request.form
 
-    # 1. Basic Validation
-    title = data.get("title")
-    description = data.get("description")
-    due_date = data.get("due_date")
-    assigned_to_id = data.get(
-        "assigned_to", user_id
-    )  # Defaults to self if not specified
-
-    if not title:
-        return jsonify({"msg": "Title is required"}), 400
+    # 1. Validate and construct the task data (status, priority, due date,
+    # assigned_to defaulting to the creator)
+    new_task, error = build_task_document(data, user_id)
+    if error:
+        return jsonify({"msg": error}), 400
 
     # 2. Handle File Uploads
-    attached_documents = []
     # request.files is a MultiDict of uploaded files
     files = request.files.getlist(
         "documents"
@@ -121,55 +310,19 @@ def create_task():
 
     try:
         if files and files[0].filename != "":
-            attached_documents = save_uploaded_files(files)
+            new_task["attached_documents"] = save_uploaded_files(files)
     except ValueError as e:
         return jsonify({"msg": str(e)}), 400
 
-    # 3. Construct Task Data
-
-    # --- FIX START (Corrected Logic) ---
-
-    # 1. Retrieve the input value (will be a string or None)
-    assigned_to_input = data.get("assigned_to")
-
-    # 2. Determine the final non-empty ID string
-    # If the input is empty or None, use the current user_id from JWT.
-    if not assigned_to_input:
-        final_assigned_id_str = user_id
-    else:
-        # If the input exists, use it.
-        final_assigned_id_str = assigned_to_input
-
-    # 3. Safely convert the final, non-empty ID string to ObjectId
-    try:
-        assigned_to_objectid = ObjectId(final_assigned_id_str)
-    except Exception:
-        # Catch case where a malformed string (e.g., "hello") was sent
-        return jsonify({"msg": "Invalid Assigned To User ID format"}), 400
-
-    # 4. Safely convert created_by ID (which is guaranteed to be valid from JWT)
+    # 3. Insert and Respond
     try:
-        created_by_objectid = ObjectId(user_id)
+        result = get_task_collection().insert_one(new_task)
     except Exception:
-        return jsonify({"msg": "Invalid Creator User ID format"}), 500
-
-    # --- FIX END (Corrected Logic) ---
-
-    new_task = {
-        "title": title,
-        "description": description,
-        "status": data.get("status", TASK_STATUSES[0]),
-        "priority": data.get("priority", TASK_PRIORITIES[0]),
-        "due_date": due_date,
-        # --- APPLY FIX HERE ---
-        "assigned_to": assigned_to_objectid,
-        "created_by": created_by_objectid,  # Record the creator
-        # ---------------------
-        "attached_documents": attached_documents,
-    }
-
-    # 4. Insert and Respond
-    result = TaskCollection.insert_one(new_task)
+        # Drop the blob references taken for this task
+        release_attachments(new_task["attached_documents"])
+        raise
+    invalidate_counts(get_task_collection().name)
+    record_task_changes([(None, new_task)])
     return (
         jsonify(
             {"msg": "Task created successfully", "task_id": str(result.inserted_id)}
@@ -182,24 +335,46 @@ def create_task():
 @tasks_bp.route("/<task_id>", methods=["GET"])
 @jwt_required()
 def get_task(task_id):
-    """Retrieve details of a single task."""
+    """
+    Retrieve details of a single task (`fields=` limits the returned fields).
+
+    The task's version is returned as its ETag; a matching If-None-Match is
+    answered with 304 and no body.
+    """
+    try:
+        fields = parse_fields_param(TASK_FIELDS, TASK_DETAIL_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    # version is always needed for the ETag
+    projection = task_projection(fields)
+    projection["version"] = 1
+
+    # Security check: User must be assigned to it OR be an Admin
     try:
-        task = TaskCollection.find_one({"_id": ObjectId(task_id)})
-    except:
+        task_filter = authorized_task_filter(task_id)
+    except InvalidId:
         return jsonify({"msg": "Invalid Task ID format"}), 400
 
+    task = get_task_collection().find_one(task_filter, projection)
     if not task:
-        return jsonify({"msg": "Task not found"}), 404
+        return task_miss_response(
+            task_filter, "You do not have permission to view this task"
+        ) or (jsonify({"msg": "Task not found"}), 404)
 
-    # Security check: User must be assigned to it OR be an Admin
-    if not check_task_ownership_or_admin(task):
-        return jsonify({"msg": "You do not have permission to view this task"}), 403
+    # Unchanged since the client's copy: skip serializing and sending it
+    etag = task_etag(task)
+    if request.if_none_match.contains_weak(etag):
+        response = current_app.response_class(status=304)
+        response.set_etag(etag)
+        return response
 
-    # Convert ObjectIds to strings for JSON
-    task["_id"] = str(task["_id"])
-    task["assigned_to"] = str(task["assigned_to"])
+    if "version" not in fields:
+        task.pop("version", None)
 
-    return jsonify(task), 200
+    response = jsonify(task)
+    response.set_etag(etag)
+    return response, 200
 
 
 # --- 3. UPDATE Task ---
@@ -208,76 +383,88 @@ def get_task(task_id):
 # A separate file-specific route may be cleaner for document replacement/deletion.
 @tasks_bp.route("/<task_id>", methods=["PUT"])
 @jwt_required()
+@rate_limit("task_write")
 def update_task(task_id):
-    """Update task metadata. NOTE: This simplified version does not handle file uploads/replacements."""
+    """
+    Update task metadata. NOTE: This simplified version does not handle file uploads/replacements.
+
+    With If-Match, the update only applies if the task is still at one of the
+    listed versions (412 otherwise). The new version is returned as the ETag.
+    """
     data = request.get_json()
-    update_data = {}
+    version_filter = if_match_filter()
+    if version_filter is None:
+        return precondition_failed()
 
-    # 1. Retrieve current task and authorize
     try:
-        task = TaskCollection.find_one({"_id": ObjectId(task_id)})
-    except:
+        task_filter = authorized_task_filter(task_id)
+    except InvalidId:
         return jsonify({"msg": "Invalid Task ID format"}), 400
 
-    if not task:
-        return jsonify({"msg": "Task not found"}), 404
-
-    if not check_task_ownership_or_admin(task):
-        return jsonify({"msg": "You do not have permission to modify this task"}), 403
-
-    # 2. Build update payload (e.g., update status, priority, due date) [cite: 7]
-    if "title" in data:
-        update_data["title"] = data["title"]
-    if "description" in data:
-        update_data["description"] = data["description"]
-    if "status" in data and data["status"] in TASK_STATUSES:
-        update_data["status"] = data["status"]
-    if "priority" in data and data["priority"] in TASK_PRIORITIES:
-        update_data["priority"] = data["priority"]
-    if "due_date" in data:
-        update_data["due_date"] = data["due_date"]
-    if "assigned_to" in data:
-        update_data["assigned_to"] = ObjectId(
-            data["assigned_to"]
-        )  # Assign to different users [cite: 8]
-
-    if not update_data:
-        return jsonify({"msg": "No valid fields provided for update"}), 400
-
-    # 3. Perform update
-    result = TaskCollection.update_one(
-        {"_id": ObjectId(task_id)}, {"$set": update_data}
+    # 1. Build update payload (e.g., update status, priority, due date) [cite: 7]
+    update_data, error = build_task_update(data)
+    if error:
+        return jsonify({"msg": error}), 400
+
+    # 2. Authorize and update in one write, bumping the version atomically. The
+    # previous values feed the statistics counters.
+    task = get_task_collection().find_one_and_update(
+        {**task_filter, **version_filter},
+        {"$set": update_data, "$inc": {"version": 1}},
+        projection={"version": 1, **TASK_STATS_PROJECTION},
+        return_document=ReturnDocument.BEFORE,
     )
+    if task is None:
+        # Missing, forbidden, or written by someone else since the client read it
+        return (
+            task_miss_response(
+                task_filter, "You do not have permission to modify this task"
+            )
+            or precondition_failed()
+        )
+    invalidate_counts(get_task_collection().name)
+    if update_data.keys() & TASK_STATS_PROJECTION.keys():
+        record_task_changes([(task, {**task, **update_data})])
 
-    return jsonify({"msg": "Task updated successfully"}), 200
+    response = jsonify({"msg": "Task updated successfully"})
+    response.set_etag(str(task.get("version", 0) + 1))
+    return response, 200
 
 
 # --- 4. DELETE Task ---
 @tasks_bp.route("/<task_id>", methods=["DELETE"])
 @jwt_required()
+@rate_limit("task_write")
 def delete_task(task_id):
-    """Delete a task and its associated files."""
+    """Delete a task and its associated files (honours If-Match, see update_task)."""
+    version_filter = if_match_filter()
+    if version_filter is None:
+        return precondition_failed()
+
     try:
-        task = TaskCollection.find_one({"_id": ObjectId(task_id)})
-    except:
+        task_filter = authorized_task_filter(task_id)
+    except InvalidId:
         return jsonify({"msg": "Invalid Task ID format"}), 400
 
-    if not task:
-        return jsonify({"msg": "Task not found"}), 404
-
-    if not check_task_ownership_or_admin(task):
-        return jsonify({"msg": "You do not have permission to delete this task"}), 403
-
-    # 1. Delete actual files from storage [cite: 73]
-    for doc in task.get("attached_documents", []):
-        try:
-            os.remove(doc["filepath"])
-        except OSError as e:
-            # Log error but continue to delete the database entry
-            print(f"Error deleting file {doc['filepath']}: {e}")
+    # 1. Authorize and delete in one write, keeping the attachment list and
+    # the fields the statistics counters need
+    task = get_task_collection().find_one_and_delete(
+        {**task_filter, **version_filter},
+        projection={"attached_documents": 1, **TASK_STATS_PROJECTION},
+    )
+    if task is None:
+        return (
+            task_miss_response(
+                task_filter, "You do not have permission to delete this task"
+            )
+            or precondition_failed()
+        )
+    invalidate_counts(get_task_collection().name)
+    record_task_changes([(task, None)])
 
-    # 2. Delete task from database
-    TaskCollection.delete_one({"_id": ObjectId(task_id)})
+    # 2. Release its files from storage [cite: 73] in the background (after the
+    # delete, so a failure can only leak a blob, never leave a dangling task)
+    remove_task_files(task)
 
     return jsonify({"msg": "Task deleted successfully"}), 204
 
@@ -287,41 +474,483 @@ def delete_task(task_id):
 @jwt_required()
 def download_document(task_id, stored_name):
     """Provides an API endpoint to retrieve and download an attached document."""
+    # Security check: User must be able to view the task to download its files [cite: 30]
     try:
-        task = TaskCollection.find_one({"_id": ObjectId(task_id)})
-    except:
+        task_filter = authorized_task_filter(task_id)
+    except InvalidId:
         return jsonify({"msg": "Invalid Task ID format"}), 400
 
+    # Fetch only the requested document's metadata
+    task = get_task_collection().find_one(
+        task_filter,
+        {"attached_documents": {"$elemMatch": {"stored_name": stored_name}}},
+    )
     if not task:
-        return jsonify({"msg": "Task not found"}), 404
-
-    # Security check: User must be able to view the task to download its files [cite: 30]
-    if not check_task_ownership_or_admin(task):
-        return (
-            jsonify({"msg": "You do not have permission to access this task's files"}),
-            403,
-        )
+        return task_miss_response(
+            task_filter, "You do not have permission to access this task's files"
+        ) or (jsonify({"msg": "Task not found"}), 404)
 
-    # Find the document metadata
-    doc_meta = next(
-        (
-            doc
-            for doc in task.get("attached_documents", [])
-            if doc["stored_name"] == stored_name
-        ),
-        None,
-    )
+    doc_meta = next(iter(task.get("attached_documents", [])), None)
 
     if not doc_meta:
         return jsonify({"msg": "Document not found on this task"}), 404
 
-    # Use Flask's send_file function for streaming the file download
     try:
-        return send_file(
-            doc_meta["filepath"],
+        # Let the web server stream it when DOWNLOAD_OFFLOAD is configured
+        response = offload_download(
+            attachment_local_path(doc_meta),
             mimetype=doc_meta["mime_type"],
-            as_attachment=True,  # Forces download
-            download_name=doc_meta["original_name"],  # Use the friendly original name
+            download_name=doc_meta["original_name"],
         )
+        if response is not None:
+            return response
+
+        file, size_bytes, last_modified = open_attachment(doc_meta)
     except FileNotFoundError:
         return jsonify({"msg": "File found in DB but not on server storage"}), 500
+
+    # Use Flask's send_file function for streaming the file download. The
+    # validators are set here since the storage backend may not be a local path.
+    response = send_file(
+        file,
+        mimetype=doc_meta["mime_type"],
+        as_attachment=True,  # Forces download
+        download_name=doc_meta["original_name"],  # Use the friendly original name
+        conditional=False,
+        etag=False,
+    )
+    response.content_length = size_bytes
+    response.last_modified = last_modified
+    response.accept_ranges = "bytes"  # Lets clients resume interrupted downloads
+    if doc_meta.get("blob_key"):
+        # Strong validator: the blob key is the content's SHA-256
+        response.set_etag(doc_meta["blob_key"])
+
+    # 304 for If-None-Match / If-Modified-Since, 206 for Range requests
+    return response.make_conditional(
+        request, accept_ranges=True, complete_length=size_bytes
+    )
+
+
+# --- 6. BULK Mutations ---
+def mark_unmatched_writes(operations, write_indexes, changes, results, counts):
+    """
+    Marks the bulk updates/deletes whose filter matched nothing (the task was
+    changed, reassigned or deleted after it was fetched) as 412.
+
+    Args:
+        counts: Tasks matched by the updates and removed by the deletes, from
+            the BulkWriteResult. Only when they fall short of the operations
+            that did not fail is the outcome of each one looked up, with one
+            query on the tasks' current state.
+    """
+    pending = [
+        index
+        for index in write_indexes
+        if operations[index]["op"] != "create" and results[index]["status"] < 300
+    ]
+    expected = Counter(operations[index]["op"] for index in pending)
+    if all(expected[op] == counts[op] for op in counts):
+        return
+
+    current = {
+        task["_id"]: task
+        for task in get_task_collection().find(
+            {"_id": {"$in": [changes[index][0]["_id"] for index in pending]}},
+            TASK_STATS_PROJECTION,
+        )
+    }
+    for index in pending:
+        before, after = changes[index]
+        task = current.get(before["_id"])
+        if after is None:
+            applied = task is None
+        else:
+            # As stored: a due date sent with microseconds reads back in ms
+            applied = task is not None and all(
+                task.get(field) == stored_datetime(after.get(field))
+                for field in TASK_STATS_FIELDS
+            )
+        if not applied:
+            results[index] = {
+                "index": index,
+                "status": 412,
+                "msg": "Task has been modified since it was retrieved",
+            }
+
+
+@tasks_bp.route("/bulk", methods=["POST"])
+@jwt_required()
+@rate_limit("task_bulk")
+def bulk_tasks():
+    """
+    Applies a list of create/update/delete operations in one request:
+
+        {"operations": [
+            {"op": "create", "data": {...}},
+            {"op": "update", "id": "<task_id>", "data": {...}},
+            {"op": "delete", "id": "<task_id>"}
+        ]}
+
+    Every operation gets the same validation and ownership checks as the
+    single-task routes. Affected tasks are fetched with one $in query and all
+    valid operations run as a single unordered bulk_write, so one failing
+    operation never blocks the others. Results are reported per operation.
+
+    Each update/delete filter repeats the ownership check and the fetched
+    values of the counted fields, so a task reassigned or changed in between
+    is left alone and reported as modified (412) instead of being written
+    against a stale read.
+    """
+    user_id = get_jwt_identity()
+    data = request.get_json(silent=True) or {}
+    operations = data.get("operations")
+
+    if not isinstance(operations, list) or not operations:
+        return jsonify({"msg": "A non-empty 'operations' list is required"}), 400
+
+    max_operations = current_app.config["BULK_MAX_OPERATIONS"]
+    if len(operations) > max_operations:
+        return (
+            jsonify({"msg": f"Only up to {max_operations} operations are allowed."}),
+            400,
+        )
+
+    results = [None] * len(operations)
+
+    def fail(index, msg, status_code):
+        results[index] = {"index": index, "status": status_code, "msg": msg}
+
+    # 1. Validate the shape of each operation and collect referenced IDs
+    target_ids = {}
+    for index, operation in enumerate(operations):
+        if not isinstance(operation, dict):
+            fail(index, "Operation must be a JSON object", 400)
+            continue
+        if operation.get("op") not in ("create", "update", "delete"):
+            fail(index, "Operation 'op' must be create, update or delete", 400)
+            continue
+        if operation["op"] != "create":
+            try:
+                target_ids[index] = ObjectId(operation.get("id"))
+            except Exception:
+                fail(index, "Invalid Task ID format", 400)
+
+    # 2. Fetch every affected task in one round trip
+    tasks_by_id = {
+        task["_id"]: task
+        for task in get_task_collection().find(
+            {"_id": {"$in": list(set(target_ids.values()))}},
+            {"attached_documents": 1, **TASK_STATS_PROJECTION},
+        )
+    }
+
+    # 3. Authorize and validate, building the write models
+    write_models = []
+    write_indexes = []  # write model position -> operation index
+    changes = {}  # operation index -> (before, after) for the stats counters
+    for index, operation in enumerate(operations):
+        if results[index] is not None:
+            continue
+
+        op = operation["op"]
+        if op == "create":
+            new_task, error = build_task_document(operation.get("data") or {}, user_id)
+            if error:
+                fail(index, error, 400)
+                continue
+            new_task["_id"] = ObjectId()
+            write_models.append(InsertOne(new_task))
+            changes[index] = (None, new_task)
+            results[index] = {"index": index, "status": 201, "id": str(new_task["_id"])}
+
+        else:
+            task = tasks_by_id.get(target_ids[index])
+            if not task:
+                fail(index, "Task not found", 404)
+                continue
+            if not check_task_ownership_or_admin(task):
+                fail(index, f"You do not have permission to {op} this task", 403)
+                continue
+
+            # Only while still accessible and counted as fetched
+            write_filter = {field: task.get(field) for field in TASK_STATS_FIELDS}
+            write_filter.update(authorized_task_filter(task["_id"]))
+            if op == "update":
+                update_data, error = build_task_update(operation.get("data"))
+                if error:
+                    fail(index, error, 400)
+                    continue
+                write_models.append(
+                    UpdateOne(
+                        write_filter, {"$set": update_data, "$inc": {"version": 1}}
+                    )
+                )
+                changes[index] = (task, {**task, **update_data})
+                results[index] = {"index": index, "status": 200, "id": str(task["_id"])}
+            else:
+                write_models.append(DeleteOne(write_filter))
+                changes[index] = (task, None)
+                results[index] = {"index": index, "status": 204, "id": str(task["_id"])}
+
+        write_indexes.append(index)
+
+    # 4. Run every valid operation as one unordered bulk write
+    if write_models:
+        try:
+            result = get_task_collection().bulk_write(write_models, ordered=False)
+            counts = {"update": result.matched_count, "delete": result.deleted_count}
+        except BulkWriteError as e:
+            for write_error in e.details.get("writeErrors", []):
+                index = write_indexes[write_error["index"]]
+                fail(index, write_error.get("errmsg", "Write failed"), 500)
+            counts = {"update": e.details["nMatched"], "delete": e.details["nRemoved"]}
+        mark_unmatched_writes(operations, write_indexes, changes, results, counts)
+        invalidate_counts(get_task_collection().name)
+        record_task_changes(
+            change
+            for index, change in changes.items()
+            if results[index]["status"] < 300
+        )
+
+        # Delete the files of the tasks that are now gone
+        for index in write_indexes:
+            if operations[index]["op"] == "delete" and results[index]["status"] == 204:
+                remove_task_files(tasks_by_id[target_ids[index]])
+
+    succeeded = sum(1 for result in results if result["status"] < 300)
+    return (
+        jsonify(
+            {
+                "msg": "Bulk operations processed",
+                "succeeded": succeeded,
+                "failed": len(results) - succeeded,
+                "results": results,
+            }
+        ),
+        200,
+    )
+
+
+# --- 7. EXPORT Tasks (Admin Only) ---
+EXPORT_FORMATS = {
+    "ndjson": ("application/x-ndjson", "tasks.ndjson"),
+    "csv": ("text/csv", "tasks.csv"),
+}
+
+
+@tasks_bp.route("/export", methods=["GET"])
+@jwt_required()
+@role_required("admin")
+def export_tasks():
+    """
+    Streams every task matching the FSP filters as NDJSON (default) or CSV.
+
+    Rows are read from a server-side cursor (EXPORT_BATCH_SIZE documents per
+    round trip), converted as they are written and flushed by a generator, so
+    memory stays flat whatever the size of the export. Pagination parameters
+    are ignored; `fields=` selects the exported columns.
+    """
+    export_format = request.args.get("format", "ndjson").lower()
+    if export_format not in EXPORT_FORMATS:
+        return (
+            jsonify({"msg": f"Invalid format. Allowed: {', '.join(EXPORT_FORMATS)}"}),
+            400,
+        )
+
+    try:
+        query_filter, query_sort, _, _ = parse_task_fsp_params()
+        fields = parse_fields_param(TASK_EXPORT_FIELDS, TASK_EXPORT_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    batch_size = current_app.config["EXPORT_BATCH_SIZE"]
+    cursor = (
+        get_task_collection()
+        .find(query_filter, task_projection(fields))
+        .sort(query_sort)
+        .batch_size(batch_size)
+    )
+    columns = ["_id", *fields]
+    dumps = current_app.json.dumps
+
+    def generate_ndjson():
+        chunk = []
+        for task in cursor:
+            chunk.append(dumps(task, separators=(",", ":")))
+            if len(chunk) >= batch_size:
+                yield "\n".join(chunk) + "\n"
+                chunk = []
+        if chunk:
+            yield "\n".join(chunk) + "\n"
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.DictWriter(buffer, fieldnames=columns, extrasaction="ignore")
+        writer.writeheader()
+        rows = 0
+        for task in cursor:
+            writer.writerow(serialize_task(task))
+            rows += 1
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    mimetype, filename = EXPORT_FORMATS[export_format]
+    generator = generate_csv() if export_format == "csv" else generate_ndjson()
+    return Response(
+        stream_with_context(generator),
+        mimetype=mimetype,
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
+
+
+# --- 8. IMPORT Tasks (Admin Only) ---
+IMPORT_CONTENT_TYPES = {
+    "application/x-ndjson": "ndjson",
+    "application/json": "ndjson",
+    "text/csv": "csv",
+}
+
+
+def _iter_import_rows(stream, import_format):
+    """
+    Yields (row number, row dict or None, error message) from a text stream,
+    one line at a time.
+    """
+    if import_format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row, None
+        return
+
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            row = current_app.json.loads(line)
+        except ValueError:
+            yield line_number, None, "Invalid JSON"
+            continue
+        if not isinstance(row, dict):
+            yield line_number, None, "Row must be a JSON object"
+            continue
+        yield line_number, row, None
+
+
+@tasks_bp.route("/import", methods=["POST"])
+@jwt_required()
+@role_required("admin")
+@rate_limit("task_bulk")
+def import_tasks():
+    """
+    Imports tasks from an NDJSON or CSV body (raw, or as a multipart `file`).
+
+    The body is parsed line by line and each row is validated with the same
+    rules as create_task. Valid rows are inserted with insert_many(ordered=False)
+    in IMPORT_BATCH_SIZE batches, so neither the file nor the tasks are ever
+    held in memory. Returns a summary with the inserted/rejected counts and the
+    first IMPORT_MAX_REPORTED_ERRORS row errors.
+    """
+    user_id = get_jwt_identity()
+    batch_size = current_app.config["IMPORT_BATCH_SIZE"]
+    # Imports are streamed row by row, so they may exceed MAX_CONTENT_LENGTH
+    request.max_content_length = current_app.config["IMPORT_MAX_CONTENT_LENGTH"]
+    max_reported_errors = current_app.config["IMPORT_MAX_REPORTED_ERRORS"]
+
+    # 1. Locate the body and its format (?format= overrides the content type)
+    upload = request.files.get("file")
+    if upload:
+        raw_stream = upload.stream
+        content_type = upload.mimetype
+        filename = upload.filename or ""
+    else:
+        raw_stream = request.stream
+        content_type = request.mimetype
+        filename = ""
+
+    import_format = request.args.get("format") or IMPORT_CONTENT_TYPES.get(
+        content_type, "csv" if filename.lower().endswith(".csv") else "ndjson"
+    )
+    if import_format not in ("ndjson", "csv"):
+        return jsonify({"msg": "Invalid format. Allowed: ndjson, csv"}), 400
+
+    text_stream = io.TextIOWrapper(raw_stream, encoding="utf-8-sig", newline="")
+
+    summary = {"inserted": 0, "rejected": 0, "errors": [], "errors_truncated": False}
+
+    def reject(row_number, msg):
+        summary["rejected"] += 1
+        if len(summary["errors"]) < max_reported_errors:
+            summary["errors"].append({"row": row_number, "msg": msg})
+        else:
+            summary["errors_truncated"] = True
+
+    batch, batch_rows = [], []
+
+    def flush():
+        if not batch:
+            return
+        failed = set()
+        try:
+            result = get_task_collection().insert_many(batch, ordered=False)
+            summary["inserted"] += len(result.inserted_ids)
+        except BulkWriteError as e:
+            summary["inserted"] += e.details.get("nInserted", 0)
+            for write_error in e.details.get("writeErrors", []):
+                failed.add(write_error["index"])
+                reject(batch_rows[write_error["index"]], write_error.get("errmsg"))
+        record_task_changes(
+            (None, task) for index, task in enumerate(batch) if index not in failed
+        )
+        batch.clear()
+        batch_rows.clear()
+
+    # 2. Validate and insert row by row, in batches
+    try:
+        for row_number, row, error in _iter_import_rows(text_stream, import_format):
+            if error is None:
+                new_task, error = build_task_document(row, user_id)
+            if error:
+                reject(row_number, error)
+                continue
+
+            batch.append(new_task)
+            batch_rows.append(row_number)
+            if len(batch) >= batch_size:
+                flush()
+    except (UnicodeDecodeError, csv.Error) as e:
+        reject(None, f"Unreadable input, import stopped: {e}")
+    finally:
+        flush()
+        if summary["inserted"]:
+            invalidate_counts(get_task_collection().name)
+
+    return jsonify({"msg": "Import finished", **summary}), 200
+
+
+# --- 9. STATISTICS ---
+@tasks_bp.route("/stats", methods=["GET"])
+@jwt_required()
+def task_stats():
+    """
+    Dashboard counts: tasks by status and by priority, and overdue tasks, in
+    total and per assignee ("by_user"). Read from the incrementally maintained
+    counters (see stats), so the cost does not grow with the number of tasks.
+
+    Non-admin users get their own tasks; admins get every assignee, or one
+    with `assigned_to=`.
+    """
+    if get_jwt().get("role") != "admin":
+        assigned_to = ObjectId(get_jwt_identity())
+    elif request.args.get("assigned_to"):
+        try:
+            assigned_to = ObjectId(request.args["assigned_to"])
+        except InvalidId:
+            return jsonify({"msg": "Invalid Assigned To User ID format"}), 400
+    else:
+        assigned_to = None
+
+    return jsonify(get_task_stats(assigned_to)), 200
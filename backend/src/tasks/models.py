@@ -6,7 +6,69 @@ def get_task_collection():
     return mongo.db.tasks
 
 
+def get_task_stats_collection():
+    """Returns the MongoDB collection of task counters (see stats)."""
+    return mongo.db.task_stats
+
+
 # We'll use simple dictionary representations for status and priority for now,
 # but in a real application, these might be stored in separate config collections.
 TASK_STATUSES = ["To Do", "In Progress", "Completed"]
 TASK_PRIORITIES = ["Low", "Medium", "High"]
+TASK_DONE_STATUS = "Completed"  # Tasks in this status are never overdue
+
+# Fields selectable with `fields=` on task reads (_id is always returned).
+TASK_FIELDS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "assigned_to",
+    "created_by",
+    "attached_documents",
+    "version",
+)
+
+# Default fieldsets: the list view omits bookkeeping fields, the detail view
+# returns everything. Neither exposes server-side storage details.
+TASK_LIST_FIELDS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "assigned_to",
+    "attached_documents",
+)
+TASK_DETAIL_FIELDS = TASK_FIELDS
+
+# Every write to a task increments `version` (tasks written before versioning
+# have none and count as version 0); it is the task's ETag on the API.
+TASK_INITIAL_VERSION = 1
+
+# Flat fields written by the NDJSON/CSV export (attachments are omitted)
+TASK_EXPORT_FIELDS = (
+    "title",
+    "description",
+    "status",
+    "priority",
+    "due_date",
+    "assigned_to",
+    "created_by",
+)
+
+# Public attachment metadata (excludes the absolute storage path)
+ATTACHMENT_PUBLIC_FIELDS = ("original_name", "stored_name", "mime_type", "size_bytes")
+
+
+def task_projection(fields):
+    """Builds the MongoDB projection for a list of TASK_FIELDS."""
+    projection = {}
+    for field in fields:
+        if field == "attached_documents":
+            for sub_field in ATTACHMENT_PUBLIC_FIELDS:
+                projection[f"attached_documents.{sub_field}"] = 1
+        else:
+            projection[field] = 1
+    return projection
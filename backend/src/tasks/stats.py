@@ -0,0 +1,250 @@
+from collections import Counter, defaultdict
+from datetime import datetime
+from pymongo import ReplaceOne, UpdateOne
+from src.utils.date_utils import utcnow
+from .models import (
+    get_task_collection,
+    get_task_stats_collection,
+    TASK_DONE_STATUS,
+    TASK_PRIORITIES,
+    TASK_STATUSES,
+)
+
+# --- Task Statistics ---
+# `task_stats` holds one document of counters per assignee:
+#   {_id: assigned_to, counts: {"total": n, "status:<status>": n,
+#                               "priority:<priority>": n, "open_due:<day>": n}}
+# Open (not completed) tasks with a due date are counted per UTC due day, so
+# the overdue count is the sum of the past days plus the tasks due earlier
+# today. Task writes apply their changes with $inc (record_task_changes);
+# rebuild_task_stats recomputes everything with one aggregation and
+# check_task_stats compares the counters with it.
+
+# Task fields the counters depend on: project them on the documents passed to
+# record_task_changes
+TASK_STATS_FIELDS = ("assigned_to", "status", "priority", "due_date")
+TASK_STATS_PROJECTION = {field: 1 for field in TASK_STATS_FIELDS}
+
+DUE_DAY_FORMAT = "%Y-%m-%d"
+OPEN_DUE_PREFIX = "open_due:"
+
+
+def task_stats_keys(task):
+    """Counter keys a task adds one to."""
+    keys = ["total"]
+    if isinstance(task.get("status"), str):
+        keys.append(f"status:{task['status']}")
+    if isinstance(task.get("priority"), str):
+        keys.append(f"priority:{task['priority']}")
+    due_date = task.get("due_date")
+    if task.get("status") != TASK_DONE_STATUS and isinstance(due_date, datetime):
+        keys.append(OPEN_DUE_PREFIX + due_date.strftime(DUE_DAY_FORMAT))
+    return keys
+
+
+def record_task_changes(changes):
+    """
+    Applies the counter changes of task writes, one $inc per assignee.
+
+    Args:
+        changes: Iterable of (before, after) task documents with the
+            TASK_STATS_FIELDS; before is None for an insert, after is None
+            for a delete.
+    """
+    deltas = defaultdict(Counter)
+    for before, after in changes:
+        if before is not None:
+            deltas[before.get("assigned_to")].subtract(task_stats_keys(before))
+        if after is not None:
+            deltas[after.get("assigned_to")].update(task_stats_keys(after))
+
+    writes = []
+    prunes = []
+    for assigned_to, delta in deltas.items():
+        increments = {f"counts.{key}": n for key, n in delta.items() if n}
+        if increments:
+            writes.append(
+                UpdateOne({"_id": assigned_to}, {"$inc": increments}, upsert=True)
+            )
+        # Due days come and go: drop their counters once back to zero
+        for key, n in delta.items():
+            if n < 0 and key.startswith(OPEN_DUE_PREFIX):
+                counter = f"counts.{key}"
+                prunes.append(
+                    UpdateOne(
+                        {"_id": assigned_to, counter: 0}, {"$unset": {counter: ""}}
+                    )
+                )
+    collection = get_task_stats_collection()
+    if writes:
+        collection.bulk_write(writes, ordered=False)
+    if prunes:
+        collection.bulk_write(prunes, ordered=False)
+
+
+def compute_task_stats():
+    """
+    Counts the tasks with one aggregation, grouped by assignee, status,
+    priority and (open tasks) due day.
+
+    Returns:
+        dict: assigned_to -> Counter of counter keys.
+    """
+    pipeline = [
+        {
+            "$group": {
+                "_id": {
+                    "assigned_to": "$assigned_to",
+                    "status": "$status",
+                    "priority": "$priority",
+                    "open_due": {
+                        "$cond": [
+                            {
+                                "$and": [
+                                    {"$ne": ["$status", TASK_DONE_STATUS]},
+                                    {"$eq": [{"$type": "$due_date"}, "date"]},
+                                ]
+                            },
+                            {
+                                "$dateToString": {
+                                    "format": DUE_DAY_FORMAT,
+                                    "date": "$due_date",
+                                }
+                            },
+                            None,
+                        ]
+                    },
+                },
+                "n": {"$sum": 1},
+            }
+        }
+    ]
+    stats = defaultdict(Counter)
+    for group in get_task_collection().aggregate(pipeline, allowDiskUse=True):
+        key, n = group["_id"], group["n"]
+        counts = stats[key.get("assigned_to")]
+        counts["total"] += n
+        if isinstance(key.get("status"), str):
+            counts[f"status:{key['status']}"] += n
+        if isinstance(key.get("priority"), str):
+            counts[f"priority:{key['priority']}"] += n
+        if key.get("open_due"):
+            counts[OPEN_DUE_PREFIX + key["open_due"]] += n
+    return stats
+
+
+def rebuild_task_stats():
+    """
+    Replaces the counters with freshly computed ones. Writes made while it runs
+    may be lost, so run it when the API is quiet (and check_task_stats after).
+
+    Returns:
+        int: Number of assignees counted.
+    """
+    stats = compute_task_stats()
+    collection = get_task_stats_collection()
+    writes = [
+        ReplaceOne({"_id": assigned_to}, {"counts": dict(counts)}, upsert=True)
+        for assigned_to, counts in stats.items()
+    ]
+    if writes:
+        collection.bulk_write(writes, ordered=False)
+    collection.delete_many({"_id": {"$nin": list(stats)}})
+    return len(stats)
+
+
+def check_task_stats():
+    """
+    Compares the counters with freshly computed ones (zero counters ignored).
+
+    Returns:
+        list: {"assigned_to", "expected", "actual"} for each assignee whose
+        counters differ.
+    """
+
+    def non_zero(counts):
+        return {key: n for key, n in counts.items() if n}
+
+    expected = {
+        assigned_to: non_zero(counts)
+        for assigned_to, counts in compute_task_stats().items()
+    }
+    actual = {
+        doc["_id"]: non_zero(doc.get("counts", {}))
+        for doc in get_task_stats_collection().find()
+    }
+    return [
+        {
+            "assigned_to": assigned_to,
+            "expected": expected.get(assigned_to, {}),
+            "actual": actual.get(assigned_to, {}),
+        }
+        for assigned_to in set(expected) | set(actual)
+        if expected.get(assigned_to, {}) != actual.get(assigned_to, {})
+    ]
+
+
+def _summarize(counts, overdue):
+    return {
+        "total": counts.get("total", 0),
+        "status": {
+            status: counts.get(f"status:{status}", 0) for status in TASK_STATUSES
+        },
+        "priority": {
+            priority: counts.get(f"priority:{priority}", 0)
+            for priority in TASK_PRIORITIES
+        },
+        "overdue": overdue,
+    }
+
+
+def get_task_stats(assigned_to=None):
+    """
+    Reads the dashboard statistics from the counters, for every assignee or
+    only `assigned_to`.
+
+    Returns:
+        dict: total, status and priority counts and overdue count summed over
+        the assignees, and the same for each assignee under "by_user".
+    """
+    now = utcnow()
+    today = OPEN_DUE_PREFIX + now.strftime(DUE_DAY_FORMAT)
+    stats_filter = {} if assigned_to is None else {"_id": assigned_to}
+    docs = [
+        doc
+        for doc in get_task_stats_collection().find(stats_filter)
+        if doc.get("counts", {}).get("total")
+    ]
+
+    # Of the tasks due today, only those due before now are overdue: one
+    # indexed count for the assignees that have any
+    due_today = {}
+    pending = [doc["_id"] for doc in docs if doc["counts"].get(today)]
+    if pending:
+        midnight = now.replace(hour=0, minute=0, second=0, microsecond=0)
+        pipeline = [
+            {
+                "$match": {
+                    "assigned_to": {"$in": pending},
+                    "status": {"$ne": TASK_DONE_STATUS},
+                    "due_date": {"$gte": midnight, "$lt": now},
+                }
+            },
+            {"$group": {"_id": "$assigned_to", "n": {"$sum": 1}}},
+        ]
+        for group in get_task_collection().aggregate(pipeline):
+            due_today[group["_id"]] = group["n"]
+
+    totals, total_overdue, by_user = Counter(), 0, []
+    for doc in docs:
+        counts = doc["counts"]
+        overdue = due_today.get(doc["_id"], 0) + sum(
+            n
+            for key, n in counts.items()
+            if key.startswith(OPEN_DUE_PREFIX) and key < today
+        )
+        by_user.append({"assigned_to": doc["_id"], **_summarize(counts, overdue)})
+        totals.update(counts)
+        total_overdue += overdue
+
+    return {**_summarize(totals, total_overdue), "by_user": by_user}
@@ -0,0 +1,116 @@
+from bson.objectid import ObjectId
+from bson.errors import InvalidId
+from src.utils.date_utils import parse_datetime
+from .models import TASK_STATUSES, TASK_PRIORITIES, TASK_INITIAL_VERSION
+
+# Shared by create_task, update_task, the bulk endpoint and the importer, so
+# every write path enforces the same rules. Each helper returns a
+# (result, error message) pair instead of raising, mirroring how the
+# controllers report validation errors.
+
+
+def _to_object_id(value):
+    try:
+        return ObjectId(value)
+    except (InvalidId, TypeError):
+        return None
+
+
+def _validate_choice(field, value, choices):
+    if value not in choices:
+        return f"Invalid {field} '{value}'. Allowed values: {', '.join(choices)}"
+    return None
+
+
+def build_task_document(data, user_id):
+    """
+    Validates creation input (form fields, JSON object or import row) and builds
+    the task document. assigned_to defaults to the creator.
+
+    Returns:
+        tuple: (task document, None) or (None, error message)
+    """
+    title = data.get("title")
+    if not title:
+        return None, "Title is required"
+
+    status = data.get("status") or TASK_STATUSES[0]
+    priority = data.get("priority") or TASK_PRIORITIES[0]
+    error = _validate_choice("status", status, TASK_STATUSES) or _validate_choice(
+        "priority", priority, TASK_PRIORITIES
+    )
+    if error:
+        return None, error
+
+    # Due dates are stored as BSON datetimes so they sort and range-filter
+    try:
+        due_date = parse_datetime(data.get("due_date"))
+    except ValueError as e:
+        return None, str(e)
+
+    # If the input is empty or missing, assign the task to its creator
+    assigned_to = _to_object_id(data.get("assigned_to") or user_id)
+    if assigned_to is None:
+        return None, "Invalid Assigned To User ID format"
+
+    created_by = _to_object_id(user_id)
+    if created_by is None:
+        return None, "Invalid Creator User ID format"
+
+    task = {
+        "title": title,
+        "description": data.get("description"),
+        "status": status,
+        "priority": priority,
+        "due_date": due_date,
+        "assigned_to": assigned_to,
+        "created_by": created_by,  # Record the creator
+        "attached_documents": [],
+        "version": TASK_INITIAL_VERSION,
+    }
+    return task, None
+
+
+def build_task_update(data):
+    """
+    Validates a partial update and builds its `$set` payload.
+
+    Returns:
+        tuple: ($set dict, None) or (None, error message)
+    """
+    if not isinstance(data, dict):
+        return None, "Update data must be a JSON object"
+
+    update_data = {}
+    if "title" in data:
+        if not data["title"]:
+            return None, "Title is required"
+        update_data["title"] = data["title"]
+    if "description" in data:
+        update_data["description"] = data["description"]
+    if "status" in data:
+        error = _validate_choice("status", data["status"], TASK_STATUSES)
+        if error:
+            return None, error
+        update_data["status"] = data["status"]
+    if "priority" in data:
+        error = _validate_choice("priority", data["priority"], TASK_PRIORITIES)
+        if error:
+            return None, error
+        update_data["priority"] = data["priority"]
+    if "due_date" in data:
+        try:
+            update_data["due_date"] = parse_datetime(data["due_date"])
+        except ValueError as e:
+            return None, str(e)
+    if "assigned_to" in data:
+        # Assign to different users [cite: 8]
+        assigned_to = _to_object_id(data["assigned_to"])
+        if assigned_to is None:
+            return None, "Invalid Assigned To User ID format"
+        update_data["assigned_to"] = assigned_to
+
+    if not update_data:
+        return None, "No valid fields provided for update"
+
+    return update_data, None
@@ -1,14 +1,26 @@
 from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required
 from bson.objectid import ObjectId
+from pymongo.errors import DuplicateKeyError, PyMongoError
 from src.utils.decorators import role_required
-from src.auth.models import get_user_collection  # Reuse user collection function
-from .. import bcrypt  # For updating passwords
-from src.tasks.models import get_task_collection
+from src.auth.models import (  # Reuse user collection function
+    get_user_collection,
+    get_email_collation,
+    USER_FIELDS,
+    USER_LIST_FIELDS,
+)
+from src.auth.services import hash_password  # For updating passwords
+from src.jobs.runner import enqueue
+from src.utils.fsp_parser import (
+    parse_user_fsp_params,
+    parse_cursor_param,
+    parse_count_param,
+    parse_fields_param,
+)
+from src.utils.pagination import fetch_keyset_page
+from src.utils.counting import count_total, fetch_counted_page, invalidate_counts
 
-TaskCollection = get_task_collection()
 users_bp = Blueprint("users", __name__)
-UserCollection = get_user_collection()  # Alias for convenience
 
 
 # --- 1. READ ALL USERS (Admin Only) ---
@@ -16,17 +28,93 @@ UserCollection = get_user_collection()  # Alias for convenience
 @jwt_required()
 @role_required("admin")
 def list_users():
-    """Admin endpoint to list all users with basic pagination and filtering."""
-    # To implement later: Filtering, sorting, and pagination [cite: 37]
-    users = UserCollection.find({}, {"password": 0})  # Exclude passwords
+    """
+    Admin endpoint to list users with filtering (role, email prefix), sorting,
+    and pagination.
 
-    user_list = []
-    for user in users:
-        # Convert ObjectId to string for JSON serialization
-        user["_id"] = str(user["_id"])
-        user_list.append(user)
+    Pagination is page/skip based by default; passing `cursor=` switches to
+    keyset pagination with opaque next/prev cursors. `count=` and `fields=`
+    work as for tasks (defaults: exact/none and USER_LIST_FIELDS).
+    """
+    try:
+        query_filter, query_sort, skip, limit = parse_user_fsp_params()
+        cursor = parse_cursor_param(query_sort)
+        count_strategy = parse_count_param(
+            default="none" if cursor is not None else "exact"
+        )
+        fields = parse_fields_param(USER_FIELDS, USER_LIST_FIELDS)
+    except ValueError as e:
+        return jsonify({"msg": str(e)}), 400
+
+    # Inclusion projection: passwords are never returned
+    projection = {field: 1 for field in fields}
+    # Email filters and sorts must use the collation of the email index; any
+    # other query must not, or it could not use the (simple collation) role
+    # and _id indexes
+    collation = None
+    if "email" in query_filter or query_sort[0][0] == "email":
+        collation = get_email_collation()
+    collection = get_user_collection()
+
+    # Keyset (cursor) mode: range predicates instead of skip
+    if cursor is not None:
+        users, next_cursor, prev_cursor = fetch_keyset_page(
+            collection,
+            query_filter,
+            query_sort,
+            limit,
+            cursor,
+            projection,
+            collation,
+        )
+        total_count, count_used = count_total(
+            collection, query_filter, count_strategy, collation
+        )
+
+        response_data = {
+            "users": users,
+            "pagination": {
+                "mode": "cursor",
+                "count_strategy": count_used,
+                "total_users": total_count,
+                "page_size": limit,
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
+            },
+        }
+        return jsonify(response_data), 200
+
+    # Page mode
+    users, total_count, count_used, has_more = fetch_counted_page(
+        collection,
+        query_filter,
+        query_sort,
+        skip,
+        limit,
+        count_strategy,
+        projection,
+        collation,
+    )
+
+    # Without a count (count=none) the number of pages is unknown
+    total_pages = None
+    if total_count is not None:
+        total_pages = (total_count + limit - 1) // limit
 
-    return jsonify(user_list), 200
+    # ObjectIds are serialized by the app's JSON provider
+    response_data = {
+        "users": users,
+        "pagination": {
+            "mode": "page",
+            "count_strategy": count_used,
+            "total_users": total_count,
+            "current_page": skip // limit + 1,
+            "total_pages": total_pages,
+            "page_size": limit,
+            "has_more": has_more,
+        },
+    }
+    return jsonify(response_data), 200
 
 
 # --- 2. READ SINGLE USER (Admin Only) ---
@@ -36,14 +124,15 @@ def list_users():
 def get_user(user_id):
     """Admin endpoint to get a single user by ID."""
     try:
-        user = UserCollection.find_one({"_id": ObjectId(user_id)}, {"password": 0})
+        user = get_user_collection().find_one(
+            {"_id": ObjectId(user_id)}, {"password": 0}
+        )
     except:
         return jsonify({"msg": "Invalid User ID format"}), 400
 
     if not user:
         return jsonify({"msg": "User not found"}), 404
 
-    user["_id"] = str(user["_id"])
     return jsonify(user), 200
 
 
@@ -70,9 +159,7 @@ def update_user(user_id):
             return jsonify({"msg": "Invalid role specified"}), 400
         update_data["role"] = data["role"]
     if "password" in data:
-        update_data["password"] = bcrypt.generate_password_hash(
-            data["password"]
-        ).decode("utf-8")
+        update_data["password"] = hash_password(data["password"])
 
     if not update_data:
         return jsonify({"msg": "No fields provided for update"}), 400
@@ -80,13 +167,15 @@ def update_user(user_id):
     # Perform the update
     # The try/except is now minimal and focuses on the database operation
     try:
-        result = UserCollection.update_one(
+        result = get_user_collection().update_one(
             {"_id": user_object_id}, {"$set": update_data}
         )
 
+        invalidate_counts(get_user_collection().name)  # Role/email counts may change
+
         if result.matched_count == 0:
             # Check if the user exists before sending the request
-            if not UserCollection.find_one({"_id": user_object_id}):
+            if not get_user_collection().find_one({"_id": user_object_id}):
                 return jsonify({"msg": "User not found"}), 404
             # If matched_count is 0 but user exists, it means nothing changed, which is success.
             return (
@@ -96,6 +185,10 @@ def update_user(user_id):
 
         return jsonify({"msg": "User updated successfully"}), 200
 
+    except DuplicateKeyError:
+        # Unique email index
+        return jsonify({"msg": "Email is already in use"}), 409
+
     except Exception as e:
         # Catch broader database/server issues
         return jsonify({"msg": f"Error updating user: {e}"}), 500
@@ -106,37 +199,58 @@ def update_user(user_id):
 @jwt_required()
 @role_required("admin")
 def delete_user(user_id):
-    """Admin endpoint to delete a user AND their associated tasks."""
+    """
+    Admin endpoint to delete a user AND their associated tasks.
+
+    A background job deletes the tasks (or reassigns them to another user with
+    `?reassign_to=<user_id>`), then the user: the user is only gone once
+    nothing references it, and a failed job can be retried with another
+    DELETE. Responds 202 with the job to follow at /api/jobs/<job_id>.
+    """
     try:
         user_object_id = ObjectId(user_id)
     except:
         return jsonify({"msg": "Invalid User ID format"}), 400
 
+    collection = get_user_collection()
+    reassign_to = request.args.get("reassign_to")
+    if reassign_to:
+        try:
+            reassign_object_id = ObjectId(reassign_to)
+        except:
+            return jsonify({"msg": "Invalid reassign_to User ID format"}), 400
+        if reassign_object_id == user_object_id or not collection.find_one(
+            {"_id": reassign_object_id}, {"_id": 1}
+        ):
+            return jsonify({"msg": "User to reassign the tasks to not found"}), 400
+
     # Check if the user exists before attempting deletion
-    user_to_delete = UserCollection.find_one({"_id": user_object_id})
+    user_to_delete = collection.find_one({"_id": user_object_id})
     if not user_to_delete:
         return jsonify({"msg": "User not found"}), 404
 
-    # --- FIX 1: DELETE ASSOCIATED TASKS ---
-
-    # 1. Delete tasks where the user was the creator OR the assigned user.
-    task_result = TaskCollection.delete_many(
-        {"$or": [{"created_by": user_object_id}, {"assigned_to": user_object_id}]}
-    )
+    # Delete (or reassign) tasks where the user was the creator OR the
+    # assigned user, and their files, then the user itself, in the background
+    # in bounded batches (can be hundreds of thousands of tasks). Nothing is
+    # deleted if the job cannot be queued.
+    payload = {"user_id": user_id}
+    if reassign_to:
+        payload["reassign_to"] = reassign_to
+    try:
+        job_id = enqueue("cascade_delete_user", payload)
+    except PyMongoError:
+        return (
+            jsonify({"msg": "User deletion could not be started, nothing was deleted"}),
+            503,
+        )
 
-    # Optional: Log the task deletion count
-    # print(f"Deleted {task_result.deleted_count} tasks associated with user {user_id}")
-
-    # 2. Delete the user
-    UserCollection.delete_one({"_id": user_object_id})
-
-    # 3. Return successful response
-    return (
-        jsonify(
-            {
-                "msg": "User and associated tasks deleted successfully",
-                "tasks_deleted": task_result.deleted_count,
-            }
-        ),
-        204,
+    # Return the job handle
+    action = "reassigned" if reassign_to else "removed"
+    response = jsonify(
+        {
+            "msg": f"User is being deleted; associated tasks are being {action}",
+            "job_id": job_id,
+        }
     )
+    response.headers["Location"] = f"/api/jobs/{job_id}"
+    return response, 202
@@ -0,0 +1,214 @@
+import os
+import time
+from datetime import timedelta
+from pymongo import ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from src import mongo
+from src.tasks.models import get_task_collection
+from src.utils.date_utils import utcnow
+from src.utils.storage import get_storage, open_local_file
+
+# --- Content-Addressed Attachment Store ---
+# Attachments are stored once per distinct content, under their SHA-256 hex
+# digest (the "blob key"), in the configured storage backend. Each `blobs`
+# document lists the attachments referencing it (`refs`, by their unique
+# stored_name), so taking or dropping a reference is idempotent and safe to
+# retry from background jobs. The content is deleted with the last reference.
+#
+# Deleting content cannot be atomic with the blob document, so it is a
+# short-lived state: the last release marks the blob `deleting_at`, deletes the
+# content, then the document. Stores never reuse a blob being deleted; they
+# wait until its document is gone and store the content again.
+
+# A deletion older than this was interrupted (crash); a store may finish it
+BLOB_DELETE_TIMEOUT = 30
+BLOB_RETRY_DELAY = 0.05
+
+
+def get_blob_collection():
+    """Returns the MongoDB collection holding blob reference counts."""
+    return mongo.db.blobs
+
+
+def finish_deletion(blob_key, older_than=None):
+    """Deletes the content and document of a blob marked `deleting_at`."""
+    marker = {"$exists": True}
+    if older_than is not None:
+        marker = {"$lt": utcnow() - timedelta(seconds=older_than)}
+    if get_blob_collection().find_one({"_id": blob_key, "deleting_at": marker}):
+        get_storage().delete(blob_key)
+        get_blob_collection().delete_one({"_id": blob_key, "deleting_at": marker})
+
+
+def store_blob(source_path, blob_key, size_bytes, ref):
+    """
+    Adds the reference `ref` (an attachment's stored_name) to the blob
+    `blob_key`, moving `source_path` into storage if the content is new
+    (otherwise the duplicate is removed).
+
+    Args:
+        source_path: Completed local file (removed in every case).
+    """
+    deadline = time.monotonic() + BLOB_DELETE_TIMEOUT
+    while True:
+        try:
+            previous = get_blob_collection().find_one_and_update(
+                {"_id": blob_key, "deleting_at": {"$exists": False}},
+                {
+                    "$addToSet": {"refs": ref},
+                    # The sweeper leaves recently taken references alone: the
+                    # task holding them may not be written yet
+                    "$set": {"refs_updated_at": utcnow()},
+                    "$setOnInsert": {"size_bytes": size_bytes, "created_at": utcnow()},
+                },
+                upsert=True,
+                return_document=ReturnDocument.BEFORE,
+            )
+            break
+        except DuplicateKeyError:
+            # The blob is being deleted by a concurrent release
+            if time.monotonic() > deadline:
+                raise
+            finish_deletion(blob_key, older_than=BLOB_DELETE_TIMEOUT)
+            time.sleep(BLOB_RETRY_DELAY)
+
+    storage = get_storage()
+    if previous is None or not storage.exists(blob_key):
+        # New content (or a blob lost from storage): the upload becomes the blob
+        storage.save(source_path, blob_key)
+    else:
+        # Identical content is already stored
+        os.remove(source_path)
+
+
+def release_blob(blob_key, ref):
+    """
+    Drops the reference `ref` from a blob, deleting it with the last reference.
+    Releasing a reference that is already gone does nothing.
+    """
+    collection = get_blob_collection()
+    blob = collection.find_one_and_update(
+        {"_id": blob_key, "refs": ref},
+        {"$pull": {"refs": ref}},
+        return_document=ReturnDocument.AFTER,
+    )
+    if blob is None or blob["refs"]:
+        return
+    delete_unreferenced_blob(blob_key)
+
+
+def delete_unreferenced_blob(blob_key):
+    """Deletes a blob if it has no references (fails if a store took one)."""
+    result = get_blob_collection().update_one(
+        {"_id": blob_key, "refs": {"$size": 0}, "deleting_at": {"$exists": False}},
+        {"$set": {"deleting_at": utcnow()}},
+    )
+    if result.modified_count:
+        finish_deletion(blob_key)
+
+
+def release_stale_refs(older_than, batch_size=500):
+    """
+    Releases references no task holds any more, e.g. when a task was deleted
+    but the job releasing its attachments could not be enqueued. Only blobs
+    whose references last changed more than `older_than` seconds ago are
+    checked, so attachments of tasks still being written are kept.
+
+    Returns:
+        int: Number of references released.
+    """
+    stale = utcnow() - timedelta(seconds=older_than)
+    blob_filter = {
+        "refs.0": {"$exists": True},
+        "deleting_at": {"$exists": False},
+        "$or": [
+            {"refs_updated_at": {"$lt": stale}},
+            {"refs_updated_at": {"$exists": False}, "created_at": {"$lt": stale}},
+        ],
+    }
+    released, batch = 0, []
+    for blob in get_blob_collection().find(blob_filter, {"refs": 1}):
+        batch.append(blob)
+        if len(batch) == batch_size:
+            released += _release_unheld_refs(batch)
+            batch = []
+    if batch:
+        released += _release_unheld_refs(batch)
+    return released
+
+
+def _release_unheld_refs(blobs):
+    refs = [ref for blob in blobs for ref in blob["refs"]]
+    # One indexed lookup per batch (attached_stored_name index)
+    held = set(
+        get_task_collection().distinct(
+            "attached_documents.stored_name",
+            {"attached_documents.stored_name": {"$in": refs}},
+        )
+    )
+    released = 0
+    for blob in blobs:
+        for ref in blob["refs"]:
+            if ref not in held:
+                release_blob(blob["_id"], ref)
+                released += 1
+    return released
+
+
+def release_unheld_attachments(documents):
+    """
+    Releases the attachments of a list that no task holds any more, e.g. the
+    journal of a batch of deletions that may not all have happened.
+    """
+    documents = documents or []
+    names = [doc.get("stored_name") for doc in documents]
+    if not names:
+        return
+    held = set(
+        get_task_collection().distinct(
+            "attached_documents.stored_name",
+            {"attached_documents.stored_name": {"$in": names}},
+        )
+    )
+    release_attachments(
+        [doc for doc in documents if doc.get("stored_name") not in held]
+    )
+
+
+def open_attachment(doc):
+    """
+    Opens an attachment (blob, or legacy per-upload `filepath`).
+
+    Returns:
+        tuple: (binary file object, size in bytes, last modified datetime)
+
+    Raises:
+        FileNotFoundError: if the content is missing from storage.
+    """
+    if doc.get("blob_key"):
+        return get_storage().open(doc["blob_key"])
+    return open_local_file(doc["filepath"])
+
+
+def attachment_local_path(doc):
+    """Path of an attachment on this node's disk, or None (e.g. GridFS)."""
+    if doc.get("blob_key"):
+        return get_storage().local_path(doc["blob_key"])
+    return doc.get("filepath")
+
+
+def release_attachments(documents):
+    """Releases the storage of a list of attachment metadata dicts."""
+    for doc in documents or []:
+        try:
+            if doc.get("blob_key"):
+                release_blob(doc["blob_key"], doc["stored_name"])
+            elif doc.get("filepath"):
+                # Uploaded before the blob store existed
+                os.remove(doc["filepath"])
+        except FileNotFoundError:
+            pass  # Already released (e.g. a retried job)
+        except OSError as e:
+            # Log error but continue; the task itself is already gone
+            name = doc.get("blob_key") or doc.get("filepath")
+            print(f"Error deleting file {name}: {e}")
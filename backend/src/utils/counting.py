@@ -0,0 +1,121 @@
+from bson import json_util
+from flask import current_app
+from src.utils.cache import TTLCache
+
+# Supported `count=` strategies
+COUNT_STRATEGIES = ("exact", "facet", "estimated", "cached", "none")
+
+# One cache of totals per collection name, per process. invalidate_counts only
+# clears the current process's cache: writes made by other gunicorn workers,
+# job workers (cascades, imports) or other hosts show up once the entries
+# expire. A "cached" total may thus be up to COUNT_CACHE_TTL seconds stale, so
+# it is never a default, only opted into with `count=cached` by clients that
+# can live with an approximate total.
+_count_caches = {}
+
+
+def _get_count_cache(collection_name):
+    cache = _count_caches.get(collection_name)
+    if cache is None:
+        cache = _count_caches[collection_name] = TTLCache(
+            maxsize=current_app.config.get("COUNT_CACHE_MAX_ENTRIES", 1024),
+            ttl=current_app.config.get("COUNT_CACHE_TTL", 30),
+        )
+    return cache
+
+
+def invalidate_counts(collection_name):
+    """Drops every cached total for a collection (call after writes)."""
+    cache = _count_caches.get(collection_name)
+    if cache is not None:
+        cache.clear()
+
+
+def count_total(collection, query_filter, strategy, collation=None):
+    """
+    Counts the documents matching `query_filter` with the given strategy.
+    The "facet" strategy needs the page query and is handled by
+    fetch_counted_page; here it degrades to "exact". `collation` applies to
+    the filter.
+
+    Returns:
+        tuple: (total or None, strategy actually used)
+    """
+    if strategy == "none":
+        return None, "none"
+
+    if strategy == "estimated" and not query_filter:
+        # Reads collection metadata instead of scanning
+        return collection.estimated_document_count(), "estimated"
+
+    if strategy == "cached":
+        # The filter already carries the caller's visibility restriction
+        # (e.g. assigned_to for non-admins), so it identifies (user, filter)
+        cache = _get_count_cache(collection.name)
+        cache_key = json_util.dumps(query_filter, sort_keys=True)
+        total = cache.get(cache_key)
+        if total is None:
+            total = collection.count_documents(query_filter, collation=collation)
+            cache.set(cache_key, total)
+        return total, "cached"
+
+    return collection.count_documents(query_filter, collation=collation), "exact"
+
+
+def fetch_counted_page(
+    collection,
+    query_filter,
+    query_sort,
+    skip,
+    limit,
+    strategy,
+    projection=None,
+    collation=None,
+):
+    """
+    Fetches one skip/limit page together with the total count. `collation`
+    applies to the filter and sort.
+
+    Returns:
+        tuple: (documents, total or None, strategy actually used, has_more)
+    """
+    if strategy == "facet":
+        # Page and total in a single round trip. The sort stays outside the
+        # $facet, where $match + $sort can use an index (facet sub-pipelines
+        # never do)
+        page_stages = [{"$skip": skip}, {"$limit": limit}]
+        if projection:
+            page_stages.append({"$project": projection})
+
+        pipeline = [
+            {"$match": query_filter},
+            {"$sort": dict(query_sort)},
+            {
+                "$facet": {
+                    "documents": page_stages,
+                    "total": [{"$count": "count"}],
+                }
+            },
+        ]
+        result = next(collection.aggregate(pipeline, collation=collation))
+        total = result["total"][0]["count"] if result["total"] else 0
+        documents = result["documents"]
+        return documents, total, "facet", skip + len(documents) < total
+
+    total, strategy_used = count_total(collection, query_filter, strategy, collation)
+
+    # Without a total, fetch one extra document to tell whether more pages exist
+    fetch_limit = limit + 1 if total is None else limit
+    documents = list(
+        collection.find(query_filter, projection, collation=collation)
+        .sort(query_sort)
+        .skip(skip)
+        .limit(fetch_limit)
+    )
+    if total is None:
+        has_more = len(documents) > limit
+        documents = documents[:limit]
+    else:
+        has_more = skip + len(documents) < total
+
+    return documents, total, strategy_used, has_more
@@ -0,0 +1,70 @@
+from datetime import datetime, timedelta, timezone
+
+
+def is_date_only(value):
+    """True for plain calendar dates such as '2025-10-30'."""
+    return isinstance(value, str) and len(value.strip()) == 10
+
+
+def parse_datetime(value):
+    """
+    Parses an ISO 8601 date or datetime into a naive UTC datetime, the form
+    PyMongo stores and returns by default.
+
+    Accepts '2025-10-30', '2025-10-30T14:00', '2025-10-30T14:00:00Z',
+    '2025-10-30T14:00:00+02:00', ... Returns None for empty values.
+
+    Raises:
+        ValueError: If the value is not a valid ISO 8601 date/datetime.
+    """
+    if value is None or isinstance(value, datetime):
+        return value
+
+    value = str(value).strip()
+    if not value:
+        return None
+
+    if value.endswith(("Z", "z")):
+        value = value[:-1] + "+00:00"
+
+    try:
+        parsed = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}'. Use ISO 8601 (YYYY-MM-DD).")
+
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def parse_date_range_end(value):
+    """
+    Parses an inclusive upper bound. A plain date covers the whole day, so it
+    is returned as an exclusive bound on the next midnight.
+
+    Returns:
+        tuple: (operator, datetime), e.g. ("$lt", 2025-10-31 00:00).
+    """
+    if is_date_only(value):
+        return "$lt", parse_datetime(value) + timedelta(days=1)
+    return "$lte", parse_datetime(value)
+
+
+def stored_datetime(value):
+    """
+    A datetime as MongoDB stores it: BSON dates keep milliseconds, so the
+    microseconds below are dropped. Other values are returned unchanged.
+    """
+    if isinstance(value, datetime):
+        return value.replace(microsecond=value.microsecond // 1000 * 1000)
+    return value
+
+
+def utcnow():
+    """Current time as a naive UTC datetime (matches stored values)."""
+    return datetime.now(timezone.utc).replace(tzinfo=None)
+
+
+def format_datetime(value):
+    """Formats a stored (naive UTC) datetime as ISO 8601 with a 'Z' suffix."""
+    return value.isoformat() + "Z"
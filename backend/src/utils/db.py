@@ -0,0 +1,42 @@
+from pymongo import MongoClient
+from src import mongo  # Import the PyMongo instance
+
+# Config keys -> MongoClient options (pool, timeouts, wire compression). Unset
+# (None) keys keep the driver's default.
+MONGO_CLIENT_OPTIONS = {
+    "MONGO_MAX_POOL_SIZE": "maxPoolSize",
+    "MONGO_MIN_POOL_SIZE": "minPoolSize",
+    "MONGO_MAX_IDLE_TIME_MS": "maxIdleTimeMS",
+    "MONGO_WAIT_QUEUE_TIMEOUT_MS": "waitQueueTimeoutMS",
+    "MONGO_SERVER_SELECTION_TIMEOUT_MS": "serverSelectionTimeoutMS",
+    "MONGO_CONNECT_TIMEOUT_MS": "connectTimeoutMS",
+    "MONGO_SOCKET_TIMEOUT_MS": "socketTimeoutMS",
+    "MONGO_COMPRESSORS": "compressors",
+}
+
+
+def mongo_client_options(config):
+    """MongoClient keyword arguments for the MONGO_* settings of `config`."""
+    return {
+        option: config[key]
+        for key, option in MONGO_CLIENT_OPTIONS.items()
+        if config.get(key) is not None
+    }
+
+
+def reconnect_mongo(app):
+    """
+    Replaces the `mongo` client with a new one, for a process forked from one
+    that already used it (e.g. a gunicorn worker of a preloaded app): a
+    MongoClient is not fork-safe, its sockets and monitor threads belong to the
+    parent. The parent's client is left alone (closing it from the child would
+    end the parent's sessions).
+
+    Collections must be looked up through the get_*_collection() accessors,
+    never kept from before the fork.
+    """
+    client = MongoClient(
+        app.config["MONGO_URI"], connect=False, **mongo_client_options(app.config)
+    )
+    mongo.cx = client
+    mongo.db = client.get_default_database()
@@ -1,7 +1,17 @@
+import hashlib
 import os
-from flask import current_app
+from functools import wraps
+from flask import Request, current_app, request
+from werkzeug.exceptions import RequestEntityTooLarge, UnsupportedMediaType
 from werkzeug.utils import secure_filename
 from uuid import uuid4  # To ensure unique filenames
+from src.utils.blob_store import release_attachments, store_blob
+
+# Leading bytes of every PDF file
+PDF_MAGIC = b"%PDF-"
+
+# Suffix of files still being received; they are renamed when committed
+PARTIAL_SUFFIX = ".part"
 
 
 # Helper function to check allowed extensions
@@ -14,11 +24,166 @@ def allowed_file(filename):
     )
 
 
+class StreamedUpload:
+    """
+    Write-only sink for one uploaded file. Chunks go straight to a `.part` file
+    in UPLOAD_FOLDER while the size limit, the PDF magic bytes, the size and the
+    SHA-256 checksum are handled in the same pass. `commit()` moves the file
+    into the blob store; `discard()` removes it (called on teardown for every
+    upload the request did not commit).
+    """
+
+    def __init__(self, filename):
+        self.original_name = secure_filename(filename)
+        # Identifies the attachment within its task (download URLs)
+        self.stored_name = f"{uuid4().hex}_{self.original_name}"
+        self.partial_path = os.path.join(
+            current_app.config["UPLOAD_FOLDER"], uuid4().hex + PARTIAL_SUFFIX
+        )
+        self.max_size = current_app.config["MAX_UPLOAD_FILE_SIZE"]
+        self.size_bytes = 0
+        self.committed = False
+        self._head = b""
+        self._sha256 = hashlib.sha256()
+        self._file = open(self.partial_path, "wb")
+
+    # --- File-like interface used by Werkzeug's multipart parser ---
+    def write(self, chunk):
+        self.size_bytes += len(chunk)
+        if self.max_size is not None and self.size_bytes > self.max_size:
+            raise RequestEntityTooLarge(
+                f"'{self.original_name}' exceeds the "
+                f"{self.max_size // (1024 * 1024)} MB per-file limit."
+            )
+
+        # Sniff the content on the first chunk(s) rather than trusting the
+        # extension / Content-Type sent by the client
+        if len(self._head) < len(PDF_MAGIC):
+            self._head += chunk[: len(PDF_MAGIC) - len(self._head)]
+            if not PDF_MAGIC.startswith(self._head):
+                self._reject()
+
+        self._sha256.update(chunk)
+        self._file.write(chunk)
+        return len(chunk)
+
+    def seek(self, offset, whence=0):
+        # Werkzeug rewinds each file once the part is complete; nothing is ever
+        # read back through this object.
+        return 0
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+
+    # --- Upload lifecycle ---
+    @property
+    def sha256(self):
+        return self._sha256.hexdigest()
+
+    def _reject(self):
+        raise UnsupportedMediaType(f"'{self.original_name}' is not a valid PDF file.")
+
+    def commit(self, mime_type):
+        """Adds the completed file to the blob store and returns its metadata."""
+        self.close()
+        if self._head != PDF_MAGIC:  # Shorter than the magic bytes
+            self._reject()
+        store_blob(self.partial_path, self.sha256, self.size_bytes, self.stored_name)
+        self.committed = True
+        return {
+            "original_name": self.original_name,
+            "stored_name": self.stored_name,
+            "blob_key": self.sha256,  # Content address (SHA-256), see blob_store
+            "mime_type": mime_type,
+            "size_bytes": self.size_bytes,
+        }
+
+    def discard(self):
+        """Removes the partial file of an upload that was not committed."""
+        self.close()
+        if not self.committed:
+            try:
+                os.remove(self.partial_path)
+            except FileNotFoundError:
+                pass
+
+
+class UploadRequest(Request):
+    """
+    Request class that streams the files of @streams_uploads views straight
+    into UPLOAD_FOLDER instead of spooling them to a temporary file first.
+    """
+
+    stream_uploads = False
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.streamed_uploads = []
+
+    def _get_file_stream(
+        self, total_content_length, content_type, filename=None, content_length=None
+    ):
+        if not self.stream_uploads or not filename:
+            return super()._get_file_stream(
+                total_content_length, content_type, filename, content_length
+            )
+
+        # Stop before writing a file beyond the MAX_FILE_UPLOADS limit
+        max_files = current_app.config["MAX_FILE_UPLOADS"]
+        if len(self.streamed_uploads) >= max_files:
+            raise RequestEntityTooLarge(
+                f"Only up to {max_files} documents are allowed."
+            )
+        if not allowed_file(filename):
+            return super()._get_file_stream(
+                total_content_length, content_type, filename, content_length
+            )
+
+        upload = StreamedUpload(filename)
+        self.streamed_uploads.append(upload)
+        return upload
+
+
+def streams_uploads(fn):
+    """
+    Custom decorator streaming the view's uploaded files to UPLOAD_FOLDER.
+    Must run before the view touches request.form / request.files.
+
+    Usage:
+    @tasks_bp.route('', methods=['POST'])
+    @jwt_required()
+    @streams_uploads
+    def create_task():
+        # ...
+    """
+
+    @wraps(fn)
+    def decorator(*args, **kwargs):
+        request.stream_uploads = True
+        return fn(*args, **kwargs)
+
+    return decorator
+
+
+def discard_uncommitted_uploads(exc=None):
+    """Teardown hook: removes partial files of failed or aborted requests."""
+    for upload in getattr(request, "streamed_uploads", []):
+        upload.discard()
+
+
 def save_uploaded_files(files):
     """
-    Saves a list of uploaded files to the local UPLOAD_FOLDER and returns their metadata.
+    Saves a list of uploaded files to the blob store and returns their metadata.
 
-    Returns: A list of metadata dictionaries (filename, path, mime_type, size).
+    Files already streamed to disk by UploadRequest are only moved into the
+    store (or dropped, if identical content is already stored); any other file
+    is copied through the same checks chunk by chunk.
+
+    If a file fails, the references taken by the files stored before it are
+    released before the error propagates: no task will hold them.
+
+    Returns: A list of metadata dictionaries (filename, blob key, mime_type, size).
     """
     metadata_list = []
 
@@ -28,32 +193,24 @@ def save_uploaded_files(files):
             f"Only up to {current_app.config['MAX_FILE_UPLOADS']} documents are allowed."
         )
 
-    for file in files:
-        if file and allowed_file(file.filename):
-            # 1. Create a secure, unique filename
-            original_filename = secure_filename(file.filename)
-            unique_filename = f"{uuid4().hex}_{original_filename}"
+    try:
+        for file in files:
+            if file and allowed_file(file.filename):
+                upload = file.stream
+                if not isinstance(upload, StreamedUpload):
+                    # Spooled by Werkzeug (view without @streams_uploads)
+                    upload = StreamedUpload(file.filename)
+                    request.streamed_uploads.append(upload)
+                    chunk_size = current_app.config["UPLOAD_CHUNK_SIZE"]
+                    while chunk := file.stream.read(chunk_size):
+                        upload.write(chunk)
 
-            # 2. Define the full save path
-            filepath = os.path.join(
-                current_app.config["UPLOAD_FOLDER"], unique_filename
-            )
-
-            # 3. Save the file
-            file.save(filepath)
-
-            # 4. Store metadata
-            metadata_list.append(
-                {
-                    "original_name": original_filename,
-                    "stored_name": unique_filename,
-                    "filepath": filepath,  # Local path (for local storage)
-                    "mime_type": file.mimetype,
-                    "size_bytes": os.path.getsize(filepath),
-                }
-            )
-        else:
-            # Skip invalid files, or you could raise an error here
-            print(f"Skipping invalid file: {file.filename if file else 'None'}")
+                metadata_list.append(upload.commit(file.mimetype))
+            else:
+                # Skip invalid files, or you could raise an error here
+                print(f"Skipping invalid file: {file.filename if file else 'None'}")
+    except Exception:
+        release_attachments(metadata_list)
+        raise
 
     return metadata_list
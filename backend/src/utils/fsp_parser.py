@@ -1,5 +1,21 @@
 from flask import request
 from bson.objectid import ObjectId
+from src.utils.indexes import (
+    TASK_SCORE_SORT_FIELD,
+    TASK_SORTABLE_FIELDS,
+    USER_SORTABLE_FIELDS,
+    task_sort_is_indexed,
+)
+from src.utils.date_utils import parse_datetime, parse_date_range_end, utcnow
+from src.tasks.models import TASK_DONE_STATUS
+from src.utils.counting import COUNT_STRATEGIES
+from src.utils.pagination import NEXT, decode_cursor
+
+# Sort direction/projection value of the relevance of a $text search
+TEXT_SCORE = {"$meta": "textScore"}
+
+# Appended to an email prefix to get the exclusive upper bound of its range
+EMAIL_PREFIX_UPPER_BOUND = "\uffff"
 
 
 def parse_task_fsp_params(default_limit=10):
@@ -9,19 +25,15 @@ def parse_task_fsp_params(default_limit=10):
 
     Returns:
         tuple: (query_filter, query_sort, skip, limit)
+
+    Raises:
+        ValueError: If a date filter is malformed or the sort parameter
+            references a field without an index.
     """
     args = request.args
 
     # 1. Pagination Parameters
-    try:
-        page = int(args.get("page", 1))
-        limit = int(args.get("limit", default_limit))
-    except ValueError:
-        page = 1
-        limit = default_limit
-
-    skip = (page - 1) * limit if page > 0 else 0
-    limit = max(1, limit)  # Ensure limit is at least 1
+    skip, limit = parse_pagination_params(default_limit)
 
     # 2. Filtering Parameters
     query_filter = {}
@@ -36,12 +48,26 @@ def parse_task_fsp_params(default_limit=10):
     if priority:
         query_filter["priority"] = priority
 
-    # Filter by Due Date (e.g., tasks due before a certain date)
-    # This example assumes a simple 'due_date_max' format
+    # Filter by Due Date range (ISO 8601 dates/datetimes, both bounds inclusive)
+    # and overdue tasks (due in the past and not completed)
+    due_date_range = {}
+    due_date_min = args.get("due_date_min")
+    if due_date_min:
+        due_date_range["$gte"] = parse_datetime(due_date_min)
+
     due_date_max = args.get("due_date_max")
     if due_date_max:
-        # In a production app, validation of date format is crucial
-        query_filter["due_date"] = {"$lte": due_date_max}
+        operator, bound = parse_date_range_end(due_date_max)
+        due_date_range[operator] = bound
+
+    if args.get("overdue", "").lower() in ("true", "1"):
+        now = utcnow()
+        due_date_range["$lt"] = min(due_date_range.get("$lt", now), now)
+        if "status" not in query_filter:
+            query_filter["status"] = {"$ne": TASK_DONE_STATUS}
+
+    if due_date_range:
+        query_filter["due_date"] = due_date_range
 
     # Filter by assigned_to user ID
     assigned_to = args.get("assigned_to")
@@ -52,13 +78,83 @@ def parse_task_fsp_params(default_limit=10):
             # Handle case where assigned_to ID is invalid
             pass
 
+    # Full-text search on title/description (text index), e.g. ?q=invoice
+    search = args.get("q", "").strip()
+    if search:
+        query_filter["$text"] = {"$search": search}
+
     # 3. Sorting Parameters
     # Format: ?sort=field1,-field2 (positive for ascending, negative for descending)
-    sort_param = args.get("sort", "-due_date")  # Default sort by descending due date
+    # Default sort by descending due date, or by relevance when searching
+    sort_param = args.get("sort", "-score" if search else "-due_date")
     query_sort = []
 
-    sort_fields = sort_param.split(",")
-    for field in sort_fields:
+    for field_name, direction in split_sort_param(sort_param):
+        # Relevance is only defined for searches, and always descending
+        if field_name == TASK_SCORE_SORT_FIELD:
+            if not search:
+                raise ValueError("Sorting by 'score' requires a search query (q=)")
+            query_sort.append((field_name, TEXT_SCORE))
+            continue
+
+        # Only indexed fields may be sorted on, otherwise MongoDB has to scan
+        # and sort the whole collection in memory
+        if field_name not in TASK_SORTABLE_FIELDS:
+            raise ValueError(
+                f"Cannot sort by '{field_name}'. "
+                f"Allowed fields: {', '.join(TASK_SORTABLE_FIELDS)}"
+            )
+        query_sort.append((field_name, direction))
+
+    if not query_sort:
+        query_sort.append(("due_date", -1))
+
+    # Stabilize the order with _id so equal sort keys page deterministically
+    last_direction = query_sort[-1][1]
+    query_sort.append(("_id", -1 if last_direction == TEXT_SCORE else last_direction))
+
+    # Combinations of sortable fields must have an index of their own (search
+    # results are ranked in memory anyway)
+    if not search and not task_sort_is_indexed(query_sort):
+        raise ValueError(
+            f"Cannot sort by '{sort_param}': no index serves this combination. "
+            "Sort by one field, or by status/priority then due_date in the "
+            "opposite direction (e.g. status,-due_date)."
+        )
+
+    return query_filter, query_sort, skip, limit
+
+
+def parse_pagination_params(default_limit=10):
+    """
+    Parses the page-mode pagination parameters (?page=2&limit=20).
+
+    Returns:
+        tuple: (skip, limit)
+    """
+    args = request.args
+    try:
+        page = int(args.get("page", 1))
+        limit = int(args.get("limit", default_limit))
+    except ValueError:
+        page = 1
+        limit = default_limit
+
+    skip = (page - 1) * limit if page > 0 else 0
+    limit = max(1, limit)  # Ensure limit is at least 1
+    return skip, limit
+
+
+def split_sort_param(sort_param):
+    """
+    Splits a sort parameter such as "field1,-field2" (positive for ascending,
+    negative for descending).
+
+    Returns:
+        list: (field_name, direction) pairs, direction being 1 or -1.
+    """
+    query_sort = []
+    for field in sort_param.split(","):
         field = field.strip()
         if field.startswith("-"):
             # Descending order (-1)
@@ -66,5 +162,130 @@ def parse_task_fsp_params(default_limit=10):
         elif field:
             # Ascending order (1)
             query_sort.append((field, 1))
+    return query_sort
+
+
+def parse_user_fsp_params(default_limit=50):
+    """
+    Parses Flask request arguments for Filtering, Sorting, and Pagination (FSP)
+    parameters specific to users.
+
+    Filters: `role=` (exact) and `email=` (prefix, case-insensitive when the
+    email index is). Sorts: see USER_SORTABLE_FIELDS, default `_id` (creation
+    order), or `email` when filtering by email prefix.
+
+    Returns:
+        tuple: (query_filter, query_sort, skip, limit)
+
+    Raises:
+        ValueError: If the sort parameter references a field without an index.
+    """
+    args = request.args
+
+    # 1. Pagination Parameters
+    skip, limit = parse_pagination_params(default_limit)
+
+    # 2. Filtering Parameters
+    query_filter = {}
+
+    role = args.get("role")
+    if role:
+        query_filter["role"] = role
+
+    # Prefix as a range on the email index: U+FFFF sorts after every other
+    # character, both in binary order and in the collation of the index
+    email_prefix = args.get("email", "").strip()
+    if email_prefix:
+        query_filter["email"] = {
+            "$gte": email_prefix,
+            "$lt": email_prefix + EMAIL_PREFIX_UPPER_BOUND,
+        }
+
+    # 3. Sorting Parameters
+    # One field only: each is indexed on its own (role together with _id)
+    sort_param = args.get("sort", "email" if email_prefix else "_id")
+    query_sort = split_sort_param(sort_param) or [("_id", 1)]
+    if len(query_sort) > 1:
+        raise ValueError("Users can only be sorted by one field")
+
+    field_name, direction = query_sort[0]
+    if field_name not in USER_SORTABLE_FIELDS:
+        raise ValueError(
+            f"Cannot sort by '{field_name}'. "
+            f"Allowed fields: {', '.join(USER_SORTABLE_FIELDS)}"
+        )
+
+    # Stabilize the order with _id so equal roles page deterministically
+    # (emails and _ids are unique)
+    if field_name == "role":
+        query_sort.append(("_id", direction))
 
     return query_filter, query_sort, skip, limit
+
+
+def parse_cursor_param(query_sort):
+    """
+    Parses the opt-in keyset pagination parameter.
+
+    `?cursor=` (empty) requests the first page in cursor mode; any other value
+    must be a next/prev cursor returned by a previous response for the same sort.
+
+    Returns:
+        tuple or None: (values, direction), or None when page/skip mode is used.
+
+    Raises:
+        ValueError: If the cursor is malformed or does not match the sort.
+    """
+    cursor = request.args.get("cursor")
+    if cursor is None:
+        return None
+    if any(direction == TEXT_SCORE for _, direction in query_sort):
+        # The score is not stored, so there is no key to resume from
+        raise ValueError("Cursor pagination is not supported when sorting by score")
+    if not cursor:
+        return None, NEXT
+
+    return decode_cursor(cursor, query_sort)
+
+
+def parse_count_param(default="exact"):
+    """
+    Parses the `count=` parameter selecting how the total is computed.
+
+    Returns:
+        str: One of COUNT_STRATEGIES.
+
+    Raises:
+        ValueError: If the strategy is unknown.
+    """
+    strategy = request.args.get("count", default).strip().lower() or default
+    if strategy not in COUNT_STRATEGIES:
+        raise ValueError(
+            f"Invalid count strategy '{strategy}'. "
+            f"Allowed values: {', '.join(COUNT_STRATEGIES)}"
+        )
+    return strategy
+
+
+def parse_fields_param(allowed_fields, default_fields):
+    """
+    Parses the `fields=` sparse fieldset parameter (e.g. ?fields=title,status).
+
+    Returns:
+        list: The requested fields, or `default_fields` when none are given.
+
+    Raises:
+        ValueError: If an unknown field is requested.
+    """
+    fields_param = request.args.get("fields", "")
+    fields = [field.strip() for field in fields_param.split(",") if field.strip()]
+    if not fields:
+        return list(default_fields)
+
+    unknown = [field for field in fields if field not in allowed_fields]
+    if unknown:
+        raise ValueError(
+            f"Unknown field(s): {', '.join(unknown)}. "
+            f"Allowed fields: {', '.join(allowed_fields)}"
+        )
+    return fields
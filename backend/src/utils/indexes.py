@@ -0,0 +1,338 @@
+from flask import current_app
+from pymongo import ASCENDING, DESCENDING, TEXT, IndexModel
+from pymongo.errors import ConnectionFailure, OperationFailure, PyMongoError
+from src.auth.models import (
+    get_user_collection,
+    get_revoked_token_collection,
+    get_email_collation,
+)
+from src.tasks.models import get_task_collection
+from src.jobs.models import get_job_collection
+from src.utils.rate_limit import get_rate_limit_collection
+
+# Fields accepted by the `sort=` query parameter. Every entry must be backed by
+# the "<field>_id" indexes below (with and without the assigned_to prefix).
+# Multi-field sorts are only accepted where an index has the same keys (see
+# task_sort_is_indexed): status or priority, then due_date in the opposite
+# direction (e.g. `status,-due_date`). Combinations such as `priority,title`
+# or `status,due_date` have no index and are rejected rather than sorted in
+# memory.
+TASK_SORTABLE_FIELDS = ("due_date", "title", "status", "priority")
+
+# Pseudo sort field: relevance of a `q=` full-text search (the text score)
+TASK_SCORE_SORT_FIELD = "score"
+
+# Fields accepted by the `sort=` parameter of the user list, each backed by an
+# index ("role" is stabilized with _id; emails are unique).
+USER_SORTABLE_FIELDS = ("_id", "email", "role")
+
+# MongoDB error codes raised when an index with the same name/keys already
+# exists with different options or key specs.
+INDEX_CONFLICT_CODES = (85, 86)
+
+
+# --- Task Indexes ---
+# Shapes produced by parse_task_fsp_params:
+#   * Non-admins always filter on assigned_to (equality first).
+#   * status/priority are equality filters, due_date is a range filter.
+#   * Sorts are stabilized with _id, in the direction of the last sort field.
+TASK_INDEXES = [
+    # Default list view: assigned_to + sort by due_date (non-admins / admins)
+    IndexModel(
+        [("assigned_to", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)],
+        name="assigned_due_date",
+    ),
+    IndexModel([("due_date", DESCENDING), ("_id", DESCENDING)], name="due_date"),
+    # Equality filters on status / priority combined with the default sort
+    IndexModel(
+        [
+            ("assigned_to", ASCENDING),
+            ("status", ASCENDING),
+            ("due_date", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="assigned_status_due_date",
+    ),
+    IndexModel(
+        [
+            ("assigned_to", ASCENDING),
+            ("priority", ASCENDING),
+            ("due_date", DESCENDING),
+            ("_id", DESCENDING),
+        ],
+        name="assigned_priority_due_date",
+    ),
+    IndexModel(
+        [("status", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)],
+        name="status_due_date",
+    ),
+    IndexModel(
+        [("priority", ASCENDING), ("due_date", DESCENDING), ("_id", DESCENDING)],
+        name="priority_due_date",
+    ),
+    # Remaining sortable fields (sort=title, sort=-priority, sort=status, ...)
+    IndexModel(
+        [("assigned_to", ASCENDING), ("title", ASCENDING), ("_id", ASCENDING)],
+        name="assigned_title",
+    ),
+    IndexModel([("title", ASCENDING), ("_id", ASCENDING)], name="title"),
+    IndexModel(
+        [("assigned_to", ASCENDING), ("status", ASCENDING), ("_id", ASCENDING)],
+        name="assigned_status",
+    ),
+    IndexModel([("status", ASCENDING), ("_id", ASCENDING)], name="status"),
+    IndexModel(
+        [("assigned_to", ASCENDING), ("priority", ASCENDING), ("_id", ASCENDING)],
+        name="assigned_priority",
+    ),
+    IndexModel([("priority", ASCENDING), ("_id", ASCENDING)], name="priority"),
+    # delete_user cascades walk each user field in _id order (equality + range)
+    IndexModel([("created_by", ASCENDING), ("_id", ASCENDING)], name="created_by"),
+    IndexModel([("assigned_to", ASCENDING), ("_id", ASCENDING)], name="assigned_to_id"),
+    # Attachment lookups by stored_name (the sweeper's stale reference check)
+    IndexModel(
+        [("attached_documents.stored_name", ASCENDING)], name="attached_stored_name"
+    ),
+    # Full-text search (q=), matches in the title weigh more. A collection can
+    # only have one text index, so new searchable fields must be added here.
+    IndexModel(
+        [("title", TEXT), ("description", TEXT)],
+        name="title_description_text",
+        weights={"title": 3, "description": 1},
+    ),
+]
+
+
+# --- User Indexes ---
+def get_user_indexes():
+    """User indexes; the email collation depends on USER_EMAIL_CASE_INSENSITIVE."""
+    email_options = {}
+    if get_email_collation() is not None:
+        email_options["collation"] = get_email_collation()
+
+    return [
+        # Login lookups; enforces one account per email (registration relies
+        # on the DuplicateKeyError instead of a lookup)
+        IndexModel([("email", ASCENDING)], name="email", unique=True, **email_options),
+        IndexModel([("role", ASCENDING), ("_id", ASCENDING)], name="role"),
+    ]
+
+
+# --- Revoked Token Indexes ---
+REVOKED_TOKEN_INDEXES = [
+    # Drop each revocation once the token itself has expired
+    IndexModel(
+        [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+    ),
+    # Incremental per-worker blocklist sync
+    IndexModel([("revoked_at", ASCENDING)], name="revoked_at"),
+]
+
+
+# --- Rate Limit Indexes ---
+RATE_LIMIT_INDEXES = [
+    # Idle buckets are full again after one period; drop them
+    IndexModel(
+        [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+    ),
+]
+
+
+# --- Job Indexes ---
+JOB_INDEXES = [
+    # claim_job: due queued jobs, and running jobs whose lease expired
+    IndexModel([("status", ASCENDING), ("run_at", ASCENDING)], name="status_run_at"),
+    IndexModel(
+        [("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease"
+    ),
+    # Finished jobs are dropped after JOBS_RETENTION
+    IndexModel(
+        [("expires_at", ASCENDING)], name="expires_at_ttl", expireAfterSeconds=0
+    ),
+]
+
+
+def task_sort_is_indexed(query_sort):
+    """
+    Whether a task index has exactly the keys of `query_sort` (including its
+    _id tie-breaker), in the same or the reverse direction, with or without
+    the assigned_to equality prefix. Such a sort never runs in memory.
+    """
+    reverse_sort = [(field, -direction) for field, direction in query_sort]
+    for model in TASK_INDEXES:
+        keys = list(model.document["key"].items())
+        if keys[0][0] == "assigned_to":
+            keys = keys[1:]
+        if keys in (query_sort, reverse_sort):
+            return True
+    return False
+
+
+def _ensure_collection_indexes(collection, index_models):
+    """
+    Creates each missing index. An existing index whose definition changed is
+    kept as it is (and reported) until the next rebuild_indexes.
+
+    Returns:
+        bool: False if any index could not be created (errors are logged).
+
+    Raises:
+        ConnectionFailure: If MongoDB is unreachable (no use trying the rest).
+    """
+    ok = True
+    for model in index_models:
+        name = model.document["name"]
+        try:
+            collection.create_indexes([model])
+        except ConnectionFailure:
+            raise
+        except OperationFailure as e:
+            if e.code in INDEX_CONFLICT_CODES:
+                current_app.logger.error(
+                    f"Index {collection.name}.{name} has an outdated definition "
+                    f"and was kept; run `flask ensure-indexes --rebuild`: "
+                    f"{e.details}"
+                )
+            else:
+                current_app.logger.error(
+                    f"Index creation failed for {collection.name}.{name}: {e}"
+                )
+            ok = False
+        except PyMongoError as e:
+            # e.g. duplicate emails blocking the unique index; keep going so
+            # one bad index never leaves the others missing
+            current_app.logger.error(
+                f"Index creation failed for {collection.name}.{name}: {e}"
+            )
+            ok = False
+    return ok
+
+
+def _find_duplicate_key(collection, model):
+    """
+    Returns the key values of one group of documents a unique index would
+    reject (compared with the index's collation), or None.
+    """
+    spec = model.document
+    group_id = {field.replace(".", "_"): f"${field}" for field in spec["key"]}
+    pipeline = [
+        {"$group": {"_id": group_id, "n": {"$sum": 1}}},
+        {"$match": {"n": {"$gt": 1}}},
+        {"$limit": 1},
+    ]
+    options = {"allowDiskUse": True}
+    if "collation" in spec:
+        options["collation"] = spec["collation"]
+    duplicate = next(collection.aggregate(pipeline, **options), None)
+    return duplicate["_id"] if duplicate else None
+
+
+def _rebuild_collection_indexes(collection, index_models):
+    """
+    Replaces the indexes whose definition changed (drop, then create). A
+    unique index is only replaced if no existing documents violate it, so the
+    collection is never left without its constraint.
+
+    Returns:
+        bool: False if any index could not be rebuilt (errors are logged).
+    """
+    ok = True
+    existing = collection.index_information()
+    for model in index_models:
+        name = model.document["name"]
+        if name not in existing:
+            continue
+        try:
+            collection.create_indexes([model])
+            continue  # Same definition: nothing to rebuild
+        except OperationFailure as e:
+            if e.code not in INDEX_CONFLICT_CODES:
+                current_app.logger.error(
+                    f"Index check failed for {collection.name}.{name}: {e}"
+                )
+                ok = False
+                continue
+
+        if model.document.get("unique"):
+            duplicate = _find_duplicate_key(collection, model)
+            if duplicate is not None:
+                current_app.logger.error(
+                    f"Not rebuilding unique index {collection.name}.{name}: "
+                    f"duplicate documents for {duplicate}; fix them first"
+                )
+                ok = False
+                continue
+
+        current_app.logger.warning(f"Rebuilding index {collection.name}.{name}")
+        collection.drop_index(name)
+        collection.create_indexes([model])
+    return ok
+
+
+def _index_plan():
+    """(collection, index models) for every collection the API indexes."""
+    return [
+        (get_task_collection(), TASK_INDEXES),
+        (get_user_collection(), get_user_indexes()),
+        (get_revoked_token_collection(), REVOKED_TOKEN_INDEXES),
+        (get_rate_limit_collection(), RATE_LIMIT_INDEXES),
+        (get_job_collection(), JOB_INDEXES),
+    ]
+
+
+def ensure_indexes():
+    """
+    Declares every index the API relies on. Safe to call repeatedly: existing
+    indexes with the same definition are left untouched by MongoDB, and
+    existing indexes are never dropped (see rebuild_indexes). Runs from the
+    `flask ensure-indexes` deploy step, not on app startup.
+
+    Must be called inside an application context.
+
+    Returns:
+        bool: True if every index is in place.
+    """
+    try:
+        results = [
+            _ensure_collection_indexes(collection, index_models)
+            for collection, index_models in _index_plan()
+        ]
+    except ConnectionFailure as e:
+        current_app.logger.error(f"Index creation skipped, MongoDB unreachable: {e}")
+        return False
+    return all(results)
+
+
+def has_unique_email_index():
+    """
+    Whether the users collection has the unique email index registration
+    relies on to reject duplicate accounts (see get_user_indexes).
+
+    Must be called inside an application context.
+    """
+    return any(
+        list(index["key"].items()) == [("email", ASCENDING)] and index.get("unique")
+        for index in get_user_collection().list_indexes()
+    )
+
+
+def rebuild_indexes():
+    """
+    Replaces the indexes whose definition changed (e.g. after toggling
+    USER_EMAIL_CASE_INSENSITIVE), then creates the missing ones. Queries that
+    need a rebuilt index are slower while it is built.
+
+    Must be called inside an application context.
+
+    Returns:
+        bool: True if every index is in place with its current definition.
+    """
+    try:
+        rebuilt = [
+            _rebuild_collection_indexes(collection, index_models)
+            for collection, index_models in _index_plan()
+        ]
+    except ConnectionFailure as e:
+        current_app.logger.error(f"Index rebuild skipped, MongoDB unreachable: {e}")
+        return False
+    return all(rebuilt) and ensure_indexes()
@@ -0,0 +1,89 @@
+from datetime import date, datetime, timezone
+from bson.decimal128 import Decimal128
+from bson.objectid import ObjectId
+from flask.json.provider import DefaultJSONProvider
+from src.utils.date_utils import format_datetime
+
+try:
+    import orjson  # C-accelerated encoder/decoder, used when installed
+except ImportError:
+    orjson = None
+
+
+def mongo_json_default(value):
+    """
+    Serializes the non-JSON types found in MongoDB documents, wherever they
+    are nested: ObjectId as its hex string, datetimes as ISO 8601 UTC with a
+    'Z' suffix (see format_datetime), Decimal128 as a decimal string.
+
+    Raises:
+        TypeError: For any other type the default provider cannot handle.
+    """
+    if isinstance(value, ObjectId):
+        return str(value)
+    if isinstance(value, datetime):
+        if value.tzinfo is not None:
+            value = value.astimezone(timezone.utc).replace(tzinfo=None)
+        return format_datetime(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, Decimal128):
+        return str(value)
+    return DefaultJSONProvider.default(value)
+
+
+class MongoJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider for `app.json` (jsonify, request.get_json) that serializes
+    MongoDB documents as they come from PyMongo, so views need not convert
+    them first.
+
+    orjson does the encoding when it is installed; the standard library json
+    module is used otherwise, and for the rare values orjson rejects (e.g.
+    integers beyond 64 bits). Both produce the same values; keys are sorted
+    like Flask's default provider.
+    """
+
+    default = staticmethod(mongo_json_default)
+
+    def _orjson_options(self, indent=False):
+        # Dates go through mongo_json_default, as with the json module
+        options = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if self.sort_keys:
+            options |= orjson.OPT_SORT_KEYS
+        if indent:
+            options |= orjson.OPT_INDENT_2
+        return options
+
+    def _dumps_bytes(self, obj, indent=False):
+        if orjson is not None:
+            try:
+                return orjson.dumps(
+                    obj, default=self.default, option=self._orjson_options(indent)
+                )
+            except orjson.JSONEncodeError:
+                pass
+        dump_args = {"indent": 2} if indent else {"separators": (",", ":")}
+        return super().dumps(obj, **dump_args).encode()
+
+    def dumps(self, obj, **kwargs):
+        # orjson only covers the compact and the indented layouts
+        if orjson is None or set(kwargs) - {"separators", "indent"}:
+            return super().dumps(obj, **kwargs)
+        indent = kwargs.get("indent")
+        if indent not in (None, 2):
+            return super().dumps(obj, **kwargs)
+        return self._dumps_bytes(obj, indent=bool(indent)).decode()
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Like DefaultJSONProvider.response, without a round trip through str."""
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        return self._app.response_class(
+            self._dumps_bytes(obj, indent=indent) + b"\n", mimetype=self.mimetype
+        )
@@ -0,0 +1,176 @@
+import base64
+from datetime import datetime
+from bson import json_util
+from bson.errors import BSONError
+from bson.objectid import ObjectId
+
+# Cursor directions
+NEXT = "next"
+PREV = "prev"
+
+# Types a decoded cursor value may have. Cursors come from clients and their
+# values are spliced into the query filter, so anything else (operator
+# documents such as {"$ne": null}, regexes, arrays) is rejected.
+CURSOR_VALUE_TYPES = (str, int, float, datetime, ObjectId, type(None))
+
+
+# --- Cursor Encoding ---
+def _sort_signature(query_sort):
+    """Compact representation of a sort spec, e.g. 'due_date:-1,_id:-1'."""
+    return ",".join(f"{field}:{direction}" for field, direction in query_sort)
+
+
+def encode_cursor(doc, query_sort, direction):
+    """
+    Encodes the sort key of `doc` (including the _id tie-breaker) into an
+    opaque, URL-safe cursor string.
+    """
+    payload = {
+        "s": _sort_signature(query_sort),
+        "v": [doc.get(field) for field, _ in query_sort],
+        "d": direction,
+    }
+    raw = json_util.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token, query_sort):
+    """
+    Decodes a cursor produced by encode_cursor.
+
+    Returns:
+        tuple: (values, direction)
+
+    Raises:
+        ValueError: If the cursor is malformed or was issued for another sort.
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json_util.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        signature, values, direction = payload["s"], payload["v"], payload["d"]
+    except (ValueError, KeyError, TypeError, BSONError):
+        raise ValueError("Invalid pagination cursor")
+
+    if signature != _sort_signature(query_sort) or len(values) != len(query_sort):
+        raise ValueError("Cursor does not match the requested sort order")
+    if direction not in (NEXT, PREV):
+        raise ValueError("Invalid pagination cursor")
+    for (field, _), value in zip(query_sort, values):
+        if not isinstance(value, CURSOR_VALUE_TYPES) or isinstance(value, bool):
+            raise ValueError("Invalid pagination cursor")
+        if field == "_id" and not isinstance(value, ObjectId):
+            raise ValueError("Invalid pagination cursor")
+
+    return values, direction
+
+
+# --- Keyset Predicates ---
+def reverse_sort(query_sort):
+    """Flips every direction of a sort spec."""
+    return [(field, -direction) for field, direction in query_sort]
+
+
+def _after_clause(field, direction, value):
+    """
+    Predicate matching documents that come strictly after `value` for a single
+    sort field. MongoDB sorts null/missing values first, so they come after
+    everything in a descending sort and before everything in an ascending one.
+    """
+    if value is None:
+        return {field: {"$ne": None}} if direction == 1 else None
+    if direction == 1:
+        return {field: {"$gt": value}}
+    return {"$or": [{field: {"$lt": value}}, {field: None}]}
+
+
+def build_keyset_filter(query_sort, values):
+    """
+    Builds the range predicate selecting documents strictly after `values` in
+    `query_sort` order:
+        (f1 > v1) OR (f1 == v1 AND f2 > v2) OR ...
+    """
+    clauses = []
+    for i, (field, direction) in enumerate(query_sort):
+        after = _after_clause(field, direction, values[i])
+        if after is None:
+            continue
+        equal_prefix = {query_sort[j][0]: values[j] for j in range(i)}
+        clauses.append({**equal_prefix, **after} if equal_prefix else after)
+
+    return {"$or": clauses}
+
+
+def combine_filters(*filters):
+    """ANDs together the non-empty filters."""
+    filters = [f for f in filters if f]
+    if not filters:
+        return {}
+    if len(filters) == 1:
+        return filters[0]
+    return {"$and": filters}
+
+
+# --- Page Fetching ---
+def fetch_keyset_page(
+    collection, query_filter, query_sort, limit, cursor, projection=None, collation=None
+):
+    """
+    Fetches one page using range predicates instead of skip.
+
+    Args:
+        cursor: (values, direction) from decode_cursor, or (None, NEXT) for the
+            first page.
+        projection: Optional inclusion projection. Sort fields are fetched as
+            well (to build the cursors) and stripped again if not requested.
+        collation: Optional collation of the filter and sort (it must match
+            the index's for the index to be used).
+
+    Returns:
+        tuple: (documents, next_cursor, prev_cursor)
+    """
+    values, direction = cursor
+
+    # Walking backwards is the same query in reversed sort order
+    fetch_sort = query_sort if direction == NEXT else reverse_sort(query_sort)
+    keyset_filter = build_keyset_filter(fetch_sort, values) if values else None
+
+    hidden_fields = []
+    if projection:
+        hidden_fields = [
+            field
+            for field, _ in query_sort
+            if field != "_id" and field not in projection
+        ]
+        projection = {**projection, **{field: 1 for field in hidden_fields}}
+
+    # Fetch one extra document to know whether another page exists
+    documents = list(
+        collection.find(
+            combine_filters(query_filter, keyset_filter),
+            projection,
+            collation=collation,
+        )
+        .sort(fetch_sort)
+        .limit(limit + 1)
+    )
+    has_more = len(documents) > limit
+    documents = documents[:limit]
+
+    if direction == PREV:
+        documents.reverse()
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, values is not None
+
+    next_cursor = prev_cursor = None
+    if documents:
+        if has_next:
+            next_cursor = encode_cursor(documents[-1], query_sort, NEXT)
+        if has_prev:
+            prev_cursor = encode_cursor(documents[0], query_sort, PREV)
+
+    for document in documents:
+        for field in hidden_fields:
+            document.pop(field, None)
+
+    return documents, next_cursor, prev_cursor
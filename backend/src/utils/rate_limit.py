@@ -0,0 +1,195 @@
+import math
+import threading
+import time
+from functools import wraps
+from flask import current_app, jsonify, request
+from flask_jwt_extended import get_jwt_identity
+from pymongo import ReturnDocument
+from pymongo.errors import PyMongoError
+from src import mongo
+
+RATE_PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+def parse_rate(limit):
+    """
+    Parses a limit such as "10/minute".
+
+    Returns:
+        tuple: (capacity, tokens refilled per second)
+    """
+    count, _, period = limit.partition("/")
+    capacity = int(count)
+    return capacity, capacity / RATE_PERIODS[period.strip()]
+
+
+def get_rate_limit_collection():
+    """Returns the MongoDB collection holding the shared token buckets."""
+    return mongo.db.rate_limits
+
+
+# --- Backends ---
+class MongoRateLimitBackend:
+    """
+    Token buckets shared by every worker. Each check is one atomic
+    find_one_and_update with an aggregation-pipeline update that refills the
+    bucket from the elapsed time and takes a token if one is available. The
+    server clock ($$NOW) is used, so app servers never disagree on time.
+    """
+
+    def consume(self, key, capacity, refill_rate):
+        """Returns the seconds to wait before retrying, or 0 if allowed."""
+        ttl_ms = int(capacity / refill_rate * 1000) * 2
+        elapsed_seconds = {
+            "$divide": [
+                {"$subtract": ["$$NOW", {"$ifNull": ["$updated_at", "$$NOW"]}]},
+                1000,
+            ]
+        }
+        pipeline = [
+            {
+                "$set": {
+                    "tokens": {
+                        "$min": [
+                            capacity,
+                            {
+                                "$add": [
+                                    {"$ifNull": ["$tokens", capacity]},
+                                    {
+                                        "$multiply": [
+                                            {"$max": [elapsed_seconds, 0]},
+                                            refill_rate,
+                                        ]
+                                    },
+                                ]
+                            },
+                        ]
+                    },
+                    "updated_at": "$$NOW",
+                    "expires_at": {"$add": ["$$NOW", ttl_ms]},
+                }
+            },
+            {"$set": {"allowed": {"$gte": ["$tokens", 1]}}},
+            {
+                "$set": {
+                    "tokens": {
+                        "$cond": ["$allowed", {"$subtract": ["$tokens", 1]}, "$tokens"]
+                    }
+                }
+            },
+        ]
+        bucket = get_rate_limit_collection().find_one_and_update(
+            {"_id": key},
+            pipeline,
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        if bucket["allowed"]:
+            return 0
+        return (1 - bucket["tokens"]) / refill_rate
+
+
+class MemoryRateLimitBackend:
+    """
+    Per-process token buckets, for development and tests. Not shared between
+    gunicorn workers; use the "mongo" backend in production.
+    """
+
+    def __init__(self):
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def consume(self, key, capacity, refill_rate):
+        """Returns the seconds to wait before retrying, or 0 if allowed."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (capacity, now))
+            tokens = min(capacity, tokens + (now - updated_at) * refill_rate)
+            if tokens >= 1:
+                self._buckets[key] = (tokens - 1, now)
+                return 0
+            self._buckets[key] = (tokens, now)
+            return (1 - tokens) / refill_rate
+
+    def reset(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+RATE_LIMIT_BACKENDS = {
+    "mongo": MongoRateLimitBackend(),
+    "memory": MemoryRateLimitBackend(),
+}
+
+
+# --- Key Functions ---
+def _client_ip():
+    # The proxies' X-Forwarded-For entry with TRUSTED_PROXY_COUNT (ProxyFix)
+    return request.remote_addr or "unknown"
+
+
+def _request_email():
+    data = request.get_json(silent=True) or {}
+    email = data.get("email")
+    return email.strip().lower() if isinstance(email, str) and email else None
+
+
+def _current_user_id():
+    # Only meaningful below @jwt_required()
+    return get_jwt_identity()
+
+
+RATE_LIMIT_KEYS = {"ip": _client_ip, "email": _request_email, "user": _current_user_id}
+
+
+def rate_limit(name):
+    """
+    Custom decorator applying the token-bucket limit RATE_LIMITS[name].
+    A separate bucket is kept for each configured key (ip, email, user); the
+    request is rejected with 429 and Retry-After if any bucket is empty.
+
+    Usage:
+    @auth_bp.route('/login', methods=['POST'])
+    @rate_limit('login')
+    def login():
+        # ...
+
+    Place it below @jwt_required() when limiting by user.
+    """
+
+    def wrapper(fn):
+        @wraps(fn)
+        def decorator(*args, **kwargs):
+            config = current_app.config
+            rule = config["RATE_LIMITS"].get(name)
+            if not config["RATE_LIMIT_ENABLED"] or not rule:
+                return fn(*args, **kwargs)
+
+            capacity, refill_rate = parse_rate(rule["limit"])
+            backend = RATE_LIMIT_BACKENDS[config["RATE_LIMIT_BACKEND"]]
+
+            retry_after = 0
+            try:
+                for key_name in rule["keys"]:
+                    key_value = RATE_LIMIT_KEYS[key_name]()
+                    if key_value is None:
+                        continue
+                    bucket_key = f"{name}:{key_name}:{key_value}"
+                    retry_after = max(
+                        retry_after, backend.consume(bucket_key, capacity, refill_rate)
+                    )
+            except PyMongoError as e:
+                # Fail open: an unavailable limiter must not take the API down
+                current_app.logger.warning(f"Rate limiter unavailable: {e}")
+                retry_after = 0
+
+            if retry_after > 0:
+                response = jsonify(msg="Too many requests, please retry later.")
+                response.headers["Retry-After"] = str(math.ceil(retry_after))
+                return response, 429
+
+            return fn(*args, **kwargs)
+
+        return decorator
+
+    return wrapper
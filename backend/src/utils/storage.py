@@ -0,0 +1,165 @@
+import os
+from datetime import datetime, timezone
+from flask import current_app, request
+from werkzeug.utils import send_file
+from gridfs import GridFSBucket
+from gridfs.errors import FileExists, NoFile
+from src import mongo
+
+# --- Attachment Storage Backends ---
+# Blobs are addressed by key (their SHA-256). Every backend implements:
+#   save(source_path, key)  moves a completed local file into storage
+#   exists(key)             True if the blob content is stored
+#   delete(key)             removes the blob (no error if already gone)
+#   open(key)               -> (binary file object, size in bytes, last modified)
+#                           raising FileNotFoundError for unknown keys
+#   local_path(key)         path on this node's disk, or None (no offloading)
+# ATTACHMENT_STORAGE selects the backend. "gridfs" keeps the content in
+# MongoDB, so several app nodes can serve attachments without a shared disk.
+
+BLOB_DIRECTORY = "blobs"
+
+
+def blob_path(blob_key):
+    """Local path of a blob, sharded as <UPLOAD_FOLDER>/blobs/ab/cd/<key>."""
+    return os.path.join(
+        current_app.config["UPLOAD_FOLDER"],
+        BLOB_DIRECTORY,
+        blob_key[:2],
+        blob_key[2:4],
+        blob_key,
+    )
+
+
+class LocalStorage:
+    """Blobs on the local filesystem, under UPLOAD_FOLDER."""
+
+    def save(self, source_path, key):
+        path = blob_path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(source_path, path)
+
+    def exists(self, key):
+        return os.path.exists(blob_path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(blob_path(key))
+        except FileNotFoundError:
+            pass
+
+    def open(self, key):
+        return open_local_file(blob_path(key))
+
+    def local_path(self, key):
+        return blob_path(key)
+
+
+class GridFSStorage:
+    """Blobs in a GridFS bucket (GRIDFS_BUCKET), with the blob key as file _id."""
+
+    @staticmethod
+    def _bucket():
+        return GridFSBucket(mongo.db, bucket_name=current_app.config["GRIDFS_BUCKET"])
+
+    def save(self, source_path, key):
+        try:
+            with open(source_path, "rb") as source:
+                self._bucket().upload_from_stream_with_id(key, key, source)
+        except FileExists:
+            pass  # Identical content by construction
+        os.remove(source_path)
+
+    def exists(self, key):
+        files = mongo.db[f"{current_app.config['GRIDFS_BUCKET']}.files"]
+        return files.find_one({"_id": key}, {"_id": 1}) is not None
+
+    def delete(self, key):
+        try:
+            self._bucket().delete(key)
+        except NoFile:
+            pass
+
+    def open(self, key):
+        try:
+            grid_out = self._bucket().open_download_stream(key)
+        except NoFile:
+            raise FileNotFoundError(key)
+        # GridOut is seekable, so Range requests do not re-read skipped chunks
+        return grid_out, grid_out.length, grid_out.upload_date
+
+    def local_path(self, key):
+        return None
+
+
+STORAGE_BACKENDS = {
+    "local": LocalStorage(),
+    "gridfs": GridFSStorage(),
+}
+
+
+def get_storage():
+    """Returns the backend selected by ATTACHMENT_STORAGE."""
+    return STORAGE_BACKENDS[current_app.config["ATTACHMENT_STORAGE"]]
+
+
+def open_local_file(path):
+    """Opens a local file the way backends `open()` a blob."""
+    file = open(path, "rb")
+    stat = os.fstat(file.fileno())
+    last_modified = datetime.fromtimestamp(stat.st_mtime, timezone.utc)
+    return file, stat.st_size, last_modified
+
+
+# --- Download Offloading ---
+# With DOWNLOAD_OFFLOAD set, a download the view has authorized is answered
+# with headers only and the fronting web server streams the file, so no worker
+# is held for the transfer (Range/conditional requests are then handled by the
+# web server too):
+#   "x-accel"     nginx: X-Accel-Redirect to DOWNLOAD_OFFLOAD_PREFIX + the path
+#                 relative to UPLOAD_FOLDER, served by an `internal` location
+#   "x-sendfile"  Apache mod_xsendfile / lighttpd: X-Sendfile with the path
+DOWNLOAD_OFFLOAD_MODES = ("x-accel", "x-sendfile")
+
+
+def offload_download(path, mimetype, download_name):
+    """
+    Builds the internal-redirect response for a local file.
+
+    Returns:
+        Response, or None if offloading is disabled or does not apply to
+        the file (the caller then sends it directly).
+    """
+    mode = current_app.config.get("DOWNLOAD_OFFLOAD")
+    if mode not in DOWNLOAD_OFFLOAD_MODES or path is None:
+        return None
+
+    upload_folder = os.path.abspath(current_app.config["UPLOAD_FOLDER"])
+    path = os.path.abspath(path)
+    if os.path.commonpath([upload_folder, path]) != upload_folder:
+        return None  # The web server only exposes UPLOAD_FOLDER
+    if not os.path.exists(path):
+        raise FileNotFoundError(path)
+
+    # Werkzeug's X-Sendfile response: headers only, no body
+    response = send_file(
+        path,
+        request.environ,
+        mimetype=mimetype,
+        as_attachment=True,
+        download_name=download_name,
+        use_x_sendfile=True,
+        response_class=current_app.response_class,
+        conditional=False,
+        etag=False,
+    )
+    if mode == "x-accel":
+        relative_path = os.path.relpath(path, upload_folder).replace(os.sep, "/")
+        del response.headers["X-Sendfile"]
+        del response.headers["Content-Length"]  # nginx sets it from the file
+        response.headers["X-Accel-Redirect"] = (
+            current_app.config["DOWNLOAD_OFFLOAD_PREFIX"].rstrip("/")
+            + "/"
+            + relative_path
+        )
+    return response
@@ -23,6 +23,7 @@ from src import mongo, bcrypt
 # (assuming create_app, mongo, and bcrypt are the necessary imports)
 
 from config import TestConfig
+from src.utils.indexes import ensure_indexes
 
 import json
 
@@ -78,6 +79,9 @@ def cleanup_db(app):
             database_name
         )  # <-- Use the retrieved name or fallback
 
+        # Recreate the indexes dropped with the database (unique constraints etc.)
+        ensure_indexes()
+
     yield  # Test runs here
 
     # Teardown phase: Clear the database after the test runs (redundant but safe)
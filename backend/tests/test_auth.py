@@ -104,3 +104,215 @@ def test_login_user_not_found(client, test_user_data):
     )
     assert response.status_code == 401
     assert "Invalid credentials" in response.get_json()["msg"]
+
+
+# --- Test Logout / Blocklist ---
+
+
+def test_logout_revokes_token(app, client, create_test_user, test_user_data):
+    """A revoked token is rejected, including by other workers."""
+    create_test_user()
+    headers = get_auth_headers(
+        client, test_user_data["email"], test_user_data["password"]
+    )
+
+    response = client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 200
+
+    response = client.post("/api/auth/logout", headers=headers)
+    assert response.status_code == 401
+
+    # A fresh blocklist (another worker) sees the revocation through MongoDB
+    from src.auth.blocklist import TokenBlocklist
+    from src.auth.models import get_revoked_token_collection
+
+    with app.app_context():
+        jti = get_revoked_token_collection().find_one()["_id"]
+        assert TokenBlocklist().is_revoked(jti)
+        assert not TokenBlocklist().is_revoked("never-issued")
+
+
+def test_login_rehashes_outdated_cost(app, client, test_user_data):
+    """Hashes made with another cost are upgraded on successful login."""
+    from src import bcrypt
+    from src.auth.models import get_user_collection
+
+    old_hash = bcrypt.generate_password_hash(
+        test_user_data["password"], rounds=5
+    ).decode("utf-8")
+    get_user_collection().insert_one(
+        {"email": test_user_data["email"], "password": old_hash, "role": "user"}
+    )
+
+    response = client.post(
+        "/api/auth/login",
+        data=json.dumps(test_user_data),
+        content_type="application/json",
+    )
+    assert response.status_code == 200
+
+    new_hash = get_user_by_email(test_user_data["email"])["password"]
+    assert new_hash != old_hash
+    assert new_hash.startswith(f"$2b$0{app.config['BCRYPT_LOG_ROUNDS']}$")
+    assert bcrypt.check_password_hash(new_hash, test_user_data["password"])
+
+
+def test_login_rate_limited(app, client, test_user_data):
+    """Bursts beyond the configured limit get 429 with Retry-After."""
+    from src.utils.rate_limit import RATE_LIMIT_BACKENDS
+
+    RATE_LIMIT_BACKENDS["memory"].reset()
+    original_limits = app.config["RATE_LIMITS"]
+    app.config["RATE_LIMIT_ENABLED"] = True
+    app.config["RATE_LIMITS"] = {
+        **original_limits,
+        "login": {"limit": "3/minute", "keys": ("ip", "email")},
+    }
+    try:
+        statuses = [
+            client.post(
+                "/api/auth/login",
+                data=json.dumps(test_user_data),
+                content_type="application/json",
+            ).status_code
+            for _ in range(4)
+        ]
+        assert statuses == [401, 401, 401, 429]
+
+        response = client.post(
+            "/api/auth/login",
+            data=json.dumps(test_user_data),
+            content_type="application/json",
+        )
+        assert response.status_code == 429
+        assert 0 < int(response.headers["Retry-After"]) <= 20
+    finally:
+        app.config["RATE_LIMIT_ENABLED"] = False
+        app.config["RATE_LIMITS"] = original_limits
+        RATE_LIMIT_BACKENDS["memory"].reset()
+
+
+def test_rate_limit_keys_on_forwarded_client_ip(app, client, monkeypatch):
+    """Behind the trusted proxy, each client IP gets its own bucket."""
+    from src.utils.rate_limit import RATE_LIMIT_BACKENDS
+
+    RATE_LIMIT_BACKENDS["memory"].reset()
+    monkeypatch.setitem(app.config, "RATE_LIMIT_ENABLED", True)
+    monkeypatch.setitem(
+        app.config,
+        "RATE_LIMITS",
+        {
+            **app.config["RATE_LIMITS"],
+            "register": {"limit": "2/minute", "keys": ("ip",)},
+        },
+    )
+
+    def register(forwarded_for):
+        return client.post(
+            "/api/auth/register",
+            data=json.dumps({}),
+            content_type="application/json",
+            headers={"X-Forwarded-For": forwarded_for},
+        ).status_code
+
+    assert [register("203.0.113.1") for _ in range(3)] == [400, 400, 429]
+    # Another client behind the same proxy is not limited
+    assert register("203.0.113.2") == 400
+    # Entries before the proxy's own are client-supplied and ignored
+    assert register("198.51.100.7, 203.0.113.1") == 429
+
+
+def test_email_unique_index(app, client, create_test_user, test_user_data):
+    """Duplicate emails are rejected by the index itself, not only by /register."""
+    from pymongo.errors import DuplicateKeyError
+    from src.auth.models import get_user_collection
+
+    create_test_user()
+    with app.app_context():
+        info = get_user_collection().index_information()
+        assert info["email"].get("unique") is True
+        with pytest.raises(DuplicateKeyError):
+            get_user_collection().insert_one(
+                {"email": test_user_data["email"], "password": "x", "role": "user"}
+            )
+
+
+class IndexConflictCollection:
+    """Users collection stand-in whose email index has another definition."""
+
+    name = "users"
+
+    def __init__(self, documents):
+        self.documents = documents
+        self.dropped = []
+
+    def create_indexes(self, models):
+        from pymongo.errors import OperationFailure
+
+        raise OperationFailure("IndexOptionsConflict", code=85)
+
+    def index_information(self):
+        return {"email": {"key": [("email", 1)], "unique": True}}
+
+    def aggregate(self, pipeline, **options):
+        counts = {}
+        for doc in self.documents:
+            key = doc["email"].lower() if "collation" in options else doc["email"]
+            counts[key] = counts.get(key, 0) + 1
+        return iter([{"_id": {"email": k}, "n": n} for k, n in counts.items() if n > 1])
+
+    def drop_index(self, name):
+        self.dropped.append(name)
+
+
+def test_changed_unique_index_never_dropped_with_duplicates(app):
+    """A changed email index is kept on startup, and a rebuild refuses to drop
+    it while case-variant duplicates exist."""
+    from src.utils.indexes import (
+        _ensure_collection_indexes,
+        _rebuild_collection_indexes,
+        get_user_indexes,
+    )
+
+    collection = IndexConflictCollection(
+        [{"email": "Dup@example.com"}, {"email": "dup@example.com"}]
+    )
+    app.config["USER_EMAIL_CASE_INSENSITIVE"] = True
+    try:
+        with app.app_context():
+            models = get_user_indexes()
+            assert _ensure_collection_indexes(collection, models) is False
+            assert _rebuild_collection_indexes(collection, models) is False
+    finally:
+        app.config["USER_EMAIL_CASE_INSENSITIVE"] = False
+    assert collection.dropped == []
+
+
+def test_ensure_indexes_stops_when_mongo_unreachable(app, monkeypatch):
+    """An unreachable server fails index creation once, not once per index."""
+    from pymongo.errors import ServerSelectionTimeoutError
+    from src.utils import indexes
+
+    calls = []
+
+    def unreachable(collection, index_models):
+        calls.append(collection.name)
+        raise ServerSelectionTimeoutError("no servers")
+
+    monkeypatch.setattr(indexes, "_ensure_collection_indexes", unreachable)
+    with app.app_context():
+        assert indexes.ensure_indexes() is False
+    assert len(calls) == 1
+
+
+def test_unique_email_index_detected(app):
+    """Startup checks find a missing or non-unique email index."""
+    from src.auth.models import get_user_collection
+    from src.utils.indexes import has_unique_email_index
+
+    with app.app_context():
+        assert has_unique_email_index()
+        get_user_collection().drop_index("email")
+        assert not has_unique_email_index()
+        get_user_collection().create_index("email", name="email")
+        assert not has_unique_email_index()
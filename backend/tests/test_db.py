@@ -0,0 +1,37 @@
+from src import mongo
+from src.tasks.models import get_task_collection
+from src.utils.db import mongo_client_options, reconnect_mongo
+
+# Fixtures are auto-injected: app, cleanup_db
+
+
+def test_mongo_client_options_from_config(app):
+    """MONGO_* settings become MongoClient options; unset ones are omitted."""
+    config = {
+        "MONGO_MAX_POOL_SIZE": 20,
+        "MONGO_SERVER_SELECTION_TIMEOUT_MS": 5000,
+        "MONGO_COMPRESSORS": None,
+    }
+    assert mongo_client_options(config) == {
+        "maxPoolSize": 20,
+        "serverSelectionTimeoutMS": 5000,
+    }
+    assert mongo_client_options(app.config)["maxPoolSize"] == (
+        app.config["MONGO_MAX_POOL_SIZE"]
+    )
+
+
+def test_reconnect_mongo_rebinds_collections(app):
+    """After a (post-fork) reconnect, collection accessors use the new client."""
+    old_client, old_db = mongo.cx, mongo.db
+    try:
+        reconnect_mongo(app)
+        assert mongo.cx is not old_client
+        assert mongo.db.name == old_db.name
+        assert get_task_collection().database.client is mongo.cx
+        pool_options = mongo.cx.options.pool_options
+        assert pool_options.max_pool_size == app.config["MONGO_MAX_POOL_SIZE"]
+    finally:
+        if mongo.cx is not old_client:
+            mongo.cx.close()
+        mongo.cx, mongo.db = old_client, old_db
@@ -0,0 +1,246 @@
+import pytest
+import os
+import time
+from datetime import timedelta
+from src.jobs.models import (
+    JOB_DONE,
+    JOB_FAILED,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    get_job_collection,
+)
+from src.jobs.runner import (
+    JOB_HANDLERS,
+    claim_job,
+    enqueue,
+    enqueue_due_periodic_jobs,
+    job_handler,
+    run_job,
+)
+from src.jobs.handlers import sweep_uploads
+from src.tasks.models import get_task_collection
+from src.utils.blob_store import get_blob_collection
+from src.utils.date_utils import utcnow
+from src.utils.storage import blob_path
+
+# Fixtures are auto-injected: app, client, cleanup_db
+
+
+@pytest.fixture
+def flaky_handler():
+    """Registers a handler failing its first `failures` attempts."""
+    calls = []
+
+    @job_handler("test_flaky")
+    def flaky(job):
+        calls.append(job["attempts"])
+        if len(calls) <= job["payload"]["failures"]:
+            raise RuntimeError("temporary failure")
+        return {"calls": len(calls)}
+
+    yield calls
+    JOB_HANDLERS.pop("test_flaky", None)
+
+
+def make_due(job_id):
+    """Moves a job's retry time to now."""
+    get_job_collection().update_one({"_id": job_id}, {"$set": {"run_at": utcnow()}})
+
+
+def test_job_retried_with_backoff(app, flaky_handler):
+    """Failed attempts are retried after an exponential backoff."""
+    with app.app_context():
+        job_id = enqueue("test_flaky", {"failures": 2})  # Eager: first attempt
+
+        job = get_job_collection().find_one({"_id": job_id})
+        assert job["status"] == JOB_QUEUED
+        assert job["attempts"] == 1
+        assert "temporary failure" in job["last_error"]
+        delay = (job["run_at"] - utcnow()).total_seconds()
+        assert (
+            app.config["JOBS_BACKOFF_BASE"] - 2
+            < delay
+            <= app.config["JOBS_BACKOFF_BASE"]
+        )
+
+        # Not due yet
+        assert claim_job("test-worker") is None
+
+        make_due(job_id)
+        assert run_job(claim_job("test-worker")) is False
+        job = get_job_collection().find_one({"_id": job_id})
+        delay = (job["run_at"] - utcnow()).total_seconds()
+        assert delay > app.config["JOBS_BACKOFF_BASE"]  # Doubled
+
+        make_due(job_id)
+        assert run_job(claim_job("test-worker")) is True
+        job = get_job_collection().find_one({"_id": job_id})
+        assert job["status"] == JOB_DONE
+        assert job["result"] == {"calls": 3}
+        assert flaky_handler == [1, 2, 3]
+
+
+def test_job_fails_after_max_attempts(app, flaky_handler):
+    """A job failing every attempt ends up failed."""
+    with app.app_context():
+        job_id = enqueue("test_flaky", {"failures": 100})
+        for _ in range(app.config["JOBS_MAX_ATTEMPTS"] - 1):
+            make_due(job_id)
+            run_job(claim_job("test-worker"))
+
+        job = get_job_collection().find_one({"_id": job_id})
+        assert job["status"] == JOB_FAILED
+        assert job["attempts"] == app.config["JOBS_MAX_ATTEMPTS"]
+        assert claim_job("test-worker") is None
+
+
+def test_job_reclaimed_after_lease_expiry(app, flaky_handler):
+    """A job whose worker died is claimed again once its lease expires."""
+    with app.app_context():
+        now = utcnow()
+        job_id = (
+            get_job_collection()
+            .insert_one(
+                {
+                    "type": "test_flaky",
+                    "payload": {"failures": 0},
+                    "status": JOB_RUNNING,
+                    "attempts": 1,
+                    "run_at": now - timedelta(minutes=10),
+                    "lease_expires_at": now - timedelta(seconds=1),
+                }
+            )
+            .inserted_id
+        )
+
+        job = claim_job("test-worker")
+        assert job["_id"] == job_id
+        assert job["attempts"] == 2
+        assert run_job(job) is True
+
+
+def test_worker_thread_survives_run_errors(app, monkeypatch):
+    """An error escaping run_job (e.g. a network blip) does not kill the thread."""
+    from pymongo.errors import AutoReconnect
+    from src.jobs import runner
+
+    calls = []
+
+    def run_job_once_failing(job):
+        calls.append(job["_id"])
+        if len(calls) == 1:
+            raise AutoReconnect("primary stepped down")
+        return True
+
+    monkeypatch.setattr(runner, "run_job", run_job_once_failing)
+    monkeypatch.setitem(app.config, "JOBS_POLL_INTERVAL", 0.01)
+    monkeypatch.setitem(app.config, "JOBS_SWEEP_INTERVAL", 0)
+    job_ids = (
+        get_job_collection()
+        .insert_many(
+            [
+                {"type": "test_flaky", "status": JOB_QUEUED, "run_at": utcnow()}
+                for _ in range(2)
+            ]
+        )
+        .inserted_ids
+    )
+
+    worker = runner.JobWorker(app, threads=1).start()
+    try:
+        deadline = time.time() + 5
+        while len(calls) < 2 and time.time() < deadline:
+            time.sleep(0.01)
+    finally:
+        worker.stop(timeout=5)
+    assert sorted(calls[:2]) == sorted(job_ids)
+
+
+def test_periodic_jobs_enqueued_once_per_interval(app):
+    """Every worker polls the schedule, but a periodic job is enqueued once."""
+    with app.app_context():
+        enqueue_due_periodic_jobs()
+        enqueue_due_periodic_jobs()
+        assert get_job_collection().count_documents({"type": "sweep_uploads"}) == 1
+
+
+def test_sweep_uploads_removes_orphans(app):
+    """The sweeper removes old orphaned files and keeps everything referenced."""
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    old = time.time() - 7200
+
+    def write(path, age=old):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(b"%PDF-1.4\n")
+        os.utime(path, (age, age))
+        return path
+
+    with app.app_context():
+        partial = write(os.path.join(upload_folder, "a" * 32 + ".part"))
+        recent_partial = write(
+            os.path.join(upload_folder, "b" * 32 + ".part"), age=time.time()
+        )
+        orphan_legacy = write(os.path.join(upload_folder, "c" * 32 + "_old.pdf"))
+        kept_legacy = write(os.path.join(upload_folder, "d" * 32 + "_kept.pdf"))
+        orphan_blob = write(blob_path("e" * 64))
+        kept_blob = write(blob_path("f" * 64))
+        get_blob_collection().insert_one({"_id": "f" * 64, "refs": ["x_kept.pdf"]})
+        get_blob_collection().insert_one({"_id": "0" * 64, "refs": []})
+        # A reference whose task is gone (its release job was lost), and one
+        # taken a moment ago for a task not written yet
+        two_hours_ago = utcnow() - timedelta(hours=2)
+        get_blob_collection().insert_many(
+            [
+                {
+                    "_id": "1" * 64,
+                    "refs": ["gone_spec.pdf", "y_kept.pdf"],
+                    "refs_updated_at": two_hours_ago,
+                },
+                {
+                    "_id": "2" * 64,
+                    "refs": ["new_spec.pdf"],
+                    "refs_updated_at": utcnow(),
+                },
+            ]
+        )
+        get_task_collection().insert_many(
+            [
+                {
+                    "title": "Legacy attachment",
+                    "attached_documents": [
+                        {
+                            "stored_name": os.path.basename(kept_legacy),
+                            "filepath": kept_legacy,
+                        }
+                    ],
+                },
+                {
+                    "title": "Blob attachment",
+                    "attached_documents": [
+                        {"stored_name": "y_kept.pdf", "blob_key": "1" * 64}
+                    ],
+                },
+            ]
+        )
+
+        assert sweep_uploads(grace=3600) == {
+            "partial": 1,
+            "legacy": 1,
+            "refs": 1,
+            "blobs": 2,
+        }
+        assert get_blob_collection().find_one({"_id": "1" * 64})["refs"] == [
+            "y_kept.pdf"
+        ]
+        assert get_blob_collection().find_one({"_id": "2" * 64})["refs"] == [
+            "new_spec.pdf"
+        ]
+
+        assert not os.path.exists(partial)
+        assert not os.path.exists(orphan_legacy)
+        assert not os.path.exists(orphan_blob)
+        assert get_blob_collection().find_one({"_id": "0" * 64}) is None
+        for path in (recent_partial, kept_legacy, kept_blob):
+            assert os.path.exists(path)
+            os.remove(path)
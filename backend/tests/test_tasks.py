@@ -1,11 +1,23 @@
 import pytest
+import base64
 import json
 import os
 from flask import current_app
 from io import BytesIO
 from werkzeug.datastructures import FileStorage
 from src.tasks.models import get_task_collection
+from src.tasks.stats import (
+    check_task_stats,
+    get_task_stats_collection,
+    rebuild_task_stats,
+    record_task_changes,
+)
+from src.utils.blob_store import get_blob_collection
+from src.utils.date_utils import utcnow
+from src.utils.storage import blob_path
+from bson import json_util
 from bson.objectid import ObjectId  # <-- ADD THIS LINE
+from datetime import datetime, timedelta
 
 
 # Fixtures are auto-injected: client, get_auth_token_for, cleanup_db
@@ -45,7 +57,7 @@ def create_task_in_db(user_id, **kwargs):
         "description": "Default description",
         "status": "To Do",
         "priority": "Low",
-        "due_date": "2025-11-01",
+        "due_date": datetime(2025, 11, 1),
         "assigned_to": ObjectId(user_id),
         "created_by": ObjectId(user_id),
         "attached_documents": [],
@@ -105,6 +117,99 @@ def test_task_delete_success(client, admin_auth):
     assert get_task_collection().find_one({"_id": ObjectId(task_id)}) is None
 
 
+def test_task_writes_authorized_in_query(client, user_auth, get_auth_token_for):
+    """Writes on someone else's task get 403 (untouched), unknown tasks 404."""
+    other_token, other_user_id = get_auth_token_for("user", "other")
+    task_id = create_task_in_db(other_user_id)
+    headers = {"Authorization": user_auth[0]}
+
+    response = client.put(
+        f"/api/tasks/{task_id}", json={"status": "Completed"}, headers=headers
+    )
+    assert response.status_code == 403
+    response = client.delete(f"/api/tasks/{task_id}", headers=headers)
+    assert response.status_code == 403
+    response = client.get(f"/api/tasks/{task_id}/documents/x.pdf", headers=headers)
+    assert response.status_code == 403
+
+    task = get_task_collection().find_one({"_id": ObjectId(task_id)})
+    assert task["status"] == "To Do"
+
+    missing_id = str(ObjectId())
+    response = client.put(
+        f"/api/tasks/{missing_id}", json={"status": "Completed"}, headers=headers
+    )
+    assert response.status_code == 404
+    response = client.delete(f"/api/tasks/{missing_id}", headers=headers)
+    assert response.status_code == 404
+    response = client.delete("/api/tasks/not-an-id", headers=headers)
+    assert response.status_code == 400
+
+
+def test_task_version_etag_and_if_match(client, user_auth, task_data):
+    """Versions are ETags: 304 on If-None-Match, 412 on a stale If-Match."""
+    headers = {"Authorization": user_auth[0]}
+    response = client.post("/api/tasks", data=task_data, headers=headers)
+    task_id = response.get_json()["task_id"]
+
+    response = client.get(f"/api/tasks/{task_id}", headers=headers)
+    assert response.headers["ETag"] == '"1"'
+    assert response.get_json()["version"] == 1
+
+    response = client.get(
+        f"/api/tasks/{task_id}", headers={**headers, "If-None-Match": '"1"'}
+    )
+    assert response.status_code == 304
+    assert response.data == b""
+
+    # Two editors start from version 1; the second write is rejected
+    response = client.put(
+        f"/api/tasks/{task_id}",
+        json={"status": "In Progress"},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"2"'
+
+    response = client.put(
+        f"/api/tasks/{task_id}",
+        json={"status": "Completed"},
+        headers={**headers, "If-Match": '"1"'},
+    )
+    assert response.status_code == 412
+    task = get_task_collection().find_one({"_id": ObjectId(task_id)})
+    assert task["status"] == "In Progress"
+    assert task["version"] == 2
+
+    # Unconditional writes still bump the version
+    client.put(f"/api/tasks/{task_id}", json={"priority": "Low"}, headers=headers)
+    response = client.get(
+        f"/api/tasks/{task_id}", headers={**headers, "If-None-Match": '"2"'}
+    )
+    assert response.status_code == 200
+    assert response.headers["ETag"] == '"3"'
+
+    response = client.delete(
+        f"/api/tasks/{task_id}", headers={**headers, "If-Match": '"2"'}
+    )
+    assert response.status_code == 412
+    response = client.delete(
+        f"/api/tasks/{task_id}", headers={**headers, "If-Match": '"3"'}
+    )
+    assert response.status_code == 204
+
+    # Tasks written before versioning are at version 0
+    legacy_id = create_task_in_db(user_auth[1])
+    response = client.get(f"/api/tasks/{legacy_id}", headers=headers)
+    assert response.headers["ETag"] == '"0"'
+    response = client.put(
+        f"/api/tasks/{legacy_id}",
+        json={"status": "Completed"},
+        headers={**headers, "If-Match": '"0"'},
+    )
+    assert response.headers["ETag"] == '"1"'
+
+
 # --- 2. File Upload Tests ---
 
 
@@ -134,7 +239,11 @@ def test_task_create_with_file_success(client, user_auth, task_data, app):
     task = get_task_collection().find_one({"_id": ObjectId(task_id)})
     assert len(task["attached_documents"]) == 1
 
-    stored_path = task["attached_documents"][0]["filepath"]
+    # Stored in the content-addressed blob store, not under a per-task path
+    doc = task["attached_documents"][0]
+    assert "filepath" not in doc
+    with app.app_context():
+        stored_path = blob_path(doc["blob_key"])
     assert os.path.exists(stored_path)
 
     # Cleanup the test file
@@ -184,9 +293,277 @@ def test_task_download_document_success(client, user_auth, app):
     os.remove(mock_filepath)
 
 
+def test_task_upload_streaming_checks(client, user_auth, task_data, app):
+    """Uploads are sniffed and size-limited while streaming; rejects leave no files."""
+    import hashlib
+
+    headers = {"Authorization": user_auth[0]}
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    before = set(os.listdir(upload_folder))
+
+    def post(content, filename="doc.pdf"):
+        file = FileStorage(
+            stream=BytesIO(content), filename=filename, content_type="application/pdf"
+        )
+        return client.post(
+            "/api/tasks",
+            data={**task_data, "documents": [file]},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+
+    # Not a PDF, whatever the extension says
+    response = post(b"MZ\x90\x00 not a pdf")
+    assert response.status_code == 415
+    assert "not a valid PDF" in response.get_json()["msg"]
+
+    # Over the per-file limit
+    original_limit = app.config["MAX_UPLOAD_FILE_SIZE"]
+    app.config["MAX_UPLOAD_FILE_SIZE"] = 1024
+    try:
+        response = post(b"%PDF-1.4\n" + b"0" * 2048)
+        assert response.status_code == 413
+    finally:
+        app.config["MAX_UPLOAD_FILE_SIZE"] = original_limit
+
+    assert set(os.listdir(upload_folder)) == before
+    assert get_task_collection().count_documents({}) == 0
+
+    # Size and checksum are recorded from the same pass
+    content = b"%PDF-1.7\n" + os.urandom(300_000)
+    response = post(content)
+    assert response.status_code == 201
+    task = get_task_collection().find_one(
+        {"_id": ObjectId(response.get_json()["task_id"])}
+    )
+    doc = task["attached_documents"][0]
+    assert doc["size_bytes"] == len(content)
+    assert doc["blob_key"] == hashlib.sha256(content).hexdigest()
+    with app.app_context():
+        stored_path = blob_path(doc["blob_key"])
+    with open(stored_path, "rb") as f:
+        assert f.read() == content
+    os.remove(stored_path)
+
+
+def test_task_upload_failure_releases_earlier_files(client, user_auth, task_data, app):
+    """A file failing after others were stored releases the stored ones."""
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    before = set(os.listdir(upload_folder))
+    files = [
+        FileStorage(
+            stream=BytesIO(content), filename=name, content_type="application/pdf"
+        )
+        for name, content in [
+            ("valid.pdf", b"%PDF-1.4\nvalid " + os.urandom(16)),
+            ("short.pdf", b"%PD"),  # Rejected on commit, after valid.pdf
+        ]
+    ]
+    response = client.post(
+        "/api/tasks",
+        data={**task_data, "documents": files},
+        content_type="multipart/form-data",
+        headers={"Authorization": user_auth[0]},
+    )
+    assert response.status_code == 415
+    assert get_task_collection().count_documents({}) == 0
+    assert get_blob_collection().count_documents({}) == 0
+    assert set(os.listdir(upload_folder)) == before
+
+
+def test_task_attachments_deduplicated(client, user_auth, task_data, app):
+    """Identical uploads share one blob, unlinked with its last reference."""
+    headers = {"Authorization": user_auth[0]}
+    content = b"%PDF-1.4\nshared spec " + os.urandom(16)
+
+    task_ids = []
+    for _ in range(2):
+        file = FileStorage(
+            stream=BytesIO(content), filename="spec.pdf", content_type="application/pdf"
+        )
+        response = client.post(
+            "/api/tasks",
+            data={**task_data, "documents": [file]},
+            content_type="multipart/form-data",
+            headers=headers,
+        )
+        assert response.status_code == 201
+        task_ids.append(response.get_json()["task_id"])
+
+    docs = [
+        get_task_collection().find_one({"_id": ObjectId(task_id)})[
+            "attached_documents"
+        ][0]
+        for task_id in task_ids
+    ]
+    blob_key = docs[0]["blob_key"]
+    assert docs[1]["blob_key"] == blob_key
+    assert docs[0]["stored_name"] != docs[1]["stored_name"]
+    with app.app_context():
+        stored_path = blob_path(blob_key)
+        refs = get_blob_collection().find_one({"_id": blob_key})["refs"]
+        assert sorted(refs) == sorted(doc["stored_name"] for doc in docs)
+
+    client.delete(f"/api/tasks/{task_ids[0]}", headers=headers)
+    assert os.path.exists(stored_path)
+
+    response = client.get(
+        f"/api/tasks/{task_ids[1]}/documents/{docs[1]['stored_name']}", headers=headers
+    )
+    assert response.data == content
+    response.close()
+
+    client.delete(f"/api/tasks/{task_ids[1]}", headers=headers)
+    assert not os.path.exists(stored_path)
+    with app.app_context():
+        assert get_blob_collection().find_one({"_id": blob_key}) is None
+
+
 # --- 3. FSP Tests (List Tasks) ---
 
 
+def upload_task_document(client, headers, task_data, content):
+    """Creates a task with one PDF attachment; returns (task_id, doc metadata)."""
+    file = FileStorage(
+        stream=BytesIO(content), filename="spec.pdf", content_type="application/pdf"
+    )
+    response = client.post(
+        "/api/tasks",
+        data={**task_data, "documents": [file]},
+        content_type="multipart/form-data",
+        headers=headers,
+    )
+    assert response.status_code == 201
+    task_id = response.get_json()["task_id"]
+    task = get_task_collection().find_one({"_id": ObjectId(task_id)})
+    return task_id, task["attached_documents"][0]
+
+
+@pytest.mark.parametrize("storage", ["local", "gridfs"])
+def test_task_download_range_and_conditional(
+    client, user_auth, task_data, app, storage
+):
+    """Downloads support Range (206), strong ETags and 304 revalidation."""
+    headers = {"Authorization": user_auth[0]}
+    app.config["ATTACHMENT_STORAGE"] = storage
+    try:
+        content = b"%PDF-1.4\n" + os.urandom(5000)
+        task_id, doc = upload_task_document(client, headers, task_data, content)
+        url = f"/api/tasks/{task_id}/documents/{doc['stored_name']}"
+
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.data == content
+        assert response.headers["Accept-Ranges"] == "bytes"
+        etag = response.headers["ETag"]
+        assert etag == f'"{doc["blob_key"]}"'
+        last_modified = response.headers["Last-Modified"]
+        response.close()
+
+        response = client.get(url, headers={**headers, "Range": "bytes=100-199"})
+        assert response.status_code == 206
+        assert response.data == content[100:200]
+        assert response.headers["Content-Range"] == f"bytes 100-199/{len(content)}"
+        response.close()
+
+        for validator in (
+            {"If-None-Match": etag},
+            {"If-Modified-Since": last_modified},
+        ):
+            response = client.get(url, headers={**headers, **validator})
+            assert response.status_code == 304
+            assert response.data == b""
+            response.close()
+
+        client.delete(f"/api/tasks/{task_id}", headers=headers)
+        with app.app_context():
+            from src.utils.storage import get_storage
+
+            assert not get_storage().exists(doc["blob_key"])
+    finally:
+        app.config["ATTACHMENT_STORAGE"] = "local"
+
+
+def test_task_download_offloaded_to_web_server(
+    client, user_auth, task_data, app, get_auth_token_for
+):
+    """DOWNLOAD_OFFLOAD answers with an internal redirect instead of the bytes."""
+    headers = {"Authorization": user_auth[0]}
+    content = b"%PDF-1.4\n" + os.urandom(1000)
+    task_id, doc = upload_task_document(client, headers, task_data, content)
+    url = f"/api/tasks/{task_id}/documents/{doc['stored_name']}"
+    key = doc["blob_key"]
+
+    try:
+        app.config["DOWNLOAD_OFFLOAD"] = "x-accel"
+        response = client.get(url, headers=headers)
+        assert response.status_code == 200
+        assert response.data == b""
+        assert (
+            response.headers["X-Accel-Redirect"]
+            == f"/protected-uploads/blobs/{key[:2]}/{key[2:4]}/{key}"
+        )
+        assert response.headers["Content-Type"] == "application/pdf"
+        assert response.headers["Content-Disposition"].startswith(
+            "attachment; filename=spec.pdf"
+        )
+        assert "X-Sendfile" not in response.headers
+
+        app.config["DOWNLOAD_OFFLOAD"] = "x-sendfile"
+        response = client.get(url, headers=headers)
+        with app.app_context():
+            assert response.headers["X-Sendfile"] == blob_path(key)
+        assert response.data == b""
+
+        # The ownership check still runs first
+        other_auth = get_auth_token_for("user", "other")
+        response = client.get(url, headers={"Authorization": other_auth[0]})
+        assert response.status_code == 403
+        assert "X-Sendfile" not in response.headers
+
+        # Disabled (or not on local disk, e.g. GridFS): the bytes are sent directly
+        app.config["DOWNLOAD_OFFLOAD"] = None
+        response = client.get(url, headers=headers)
+        assert response.data == content
+        response.close()
+    finally:
+        app.config["DOWNLOAD_OFFLOAD"] = None
+        client.delete(f"/api/tasks/{task_id}", headers=headers)
+
+
+def test_task_migrate_attachments(app, user_auth):
+    """Legacy per-upload files move into the blob store."""
+    from src.tasks.commands import migrate_attachments
+
+    upload_folder = app.config["UPLOAD_FOLDER"]
+    legacy_path = os.path.join(upload_folder, "legacy_spec.pdf")
+    content = b"%PDF-1.4\nlegacy " + os.urandom(16)
+    with open(legacy_path, "wb") as f:
+        f.write(content)
+
+    doc_meta = {
+        "original_name": "spec.pdf",
+        "stored_name": "legacy_spec.pdf",
+        "filepath": legacy_path,
+        "mime_type": "application/pdf",
+        "size_bytes": len(content),
+    }
+    task_id = create_task_in_db(user_auth[1], attached_documents=[doc_meta])
+
+    with app.app_context():
+        assert migrate_attachments() == {"migrated": 1, "missing": 0}
+        doc = get_task_collection().find_one({"_id": ObjectId(task_id)})[
+            "attached_documents"
+        ][0]
+        assert "filepath" not in doc
+        stored_path = blob_path(doc["blob_key"])
+
+    assert not os.path.exists(legacy_path)
+    with open(stored_path, "rb") as f:
+        assert f.read() == content
+    os.remove(stored_path)
+
+
 def test_task_list_fsp(client, user_auth):
     """Tests filtering and pagination for task list."""
     # Create multiple tasks assigned to the test user
@@ -216,3 +593,554 @@ def test_task_list_fsp(client, user_auth):
     assert response_sort_filter.status_code == 200
     assert response_sort_filter.get_json()["pagination"]["total_tasks"] == 1
     assert response_sort_filter.get_json()["tasks"][0]["title"] == "Low Priority Task"
+
+
+def test_task_list_sort_rejects_unindexed_field(client, user_auth):
+    """Sorting is limited to indexed fields."""
+    create_task_in_db(user_auth[1])
+
+    response = client.get(
+        "/api/tasks?sort=description", headers={"Authorization": user_auth[0]}
+    )
+    assert response.status_code == 400
+    assert "Cannot sort by 'description'" in response.get_json()["msg"]
+
+    # Only combinations with an index of their own
+    for sort in ("priority,title", "status,due_date", "-due_date,status"):
+        response = client.get(
+            f"/api/tasks?sort={sort}", headers={"Authorization": user_auth[0]}
+        )
+        assert response.status_code == 400
+    for sort in ("status,-due_date", "-priority,due_date", "due_date", "-title"):
+        response = client.get(
+            f"/api/tasks?sort={sort}", headers={"Authorization": user_auth[0]}
+        )
+        assert response.status_code == 200
+
+
+def test_task_indexes_created(app):
+    """ensure_indexes declares the FSP indexes."""
+    with app.app_context():
+        index_names = get_task_collection().index_information().keys()
+
+    assert "assigned_due_date" in index_names
+    assert "created_by" in index_names
+    assert "title_description_text" in index_names
+
+
+def test_task_list_full_text_search(client, user_auth, get_auth_token_for):
+    """q= searches title/description within the visible tasks, by relevance."""
+    headers = {"Authorization": user_auth[0]}
+    _, other_user_id = get_auth_token_for("user", "other")
+    title_id = create_task_in_db(user_auth[1], title="Send invoice to ACME")
+    description_id = create_task_in_db(
+        user_auth[1],
+        title="Call ACME",
+        description="Ask about the unpaid invoice",
+        status="Completed",
+    )
+    create_task_in_db(user_auth[1], title="Groceries")
+    create_task_in_db(other_user_id, title="Invoice of another user")
+
+    response = client.get("/api/tasks?q=invoice&fields=title", headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [task["_id"] for task in data["tasks"]] == [title_id, description_id]
+    assert data["tasks"][0]["score"] > data["tasks"][1]["score"]
+    assert set(data["tasks"][0]) == {"_id", "title", "score"}
+    assert data["pagination"]["total_tasks"] == 2
+
+    # Combined with the filters, the other sorts and pagination
+    response = client.get("/api/tasks?q=invoice&status=Completed", headers=headers)
+    assert [task["_id"] for task in response.get_json()["tasks"]] == [description_id]
+    response = client.get("/api/tasks?q=acme&sort=title&limit=1", headers=headers)
+    data = response.get_json()
+    assert [task["_id"] for task in data["tasks"]] == [description_id]
+    assert data["pagination"]["has_more"] is True
+
+    # The score only exists for searches and cannot be a cursor key
+    response = client.get("/api/tasks?sort=-score", headers=headers)
+    assert response.status_code == 400
+    response = client.get("/api/tasks?q=invoice&cursor=", headers=headers)
+    assert response.status_code == 400
+    response = client.get("/api/tasks?q=invoice&sort=title&cursor=", headers=headers)
+    assert response.status_code == 200
+
+
+def test_task_list_cursor_pagination(client, user_auth):
+    """Cursor mode walks every task exactly once, forwards and backwards."""
+    headers = {"Authorization": user_auth[0]}
+    for i in range(5):
+        create_task_in_db(
+            user_auth[1],
+            title=f"Task {i}",
+            priority="High" if i % 2 else "Low",
+            due_date=datetime(2025, 11, i + 1),
+        )
+
+    seen = []
+    url = "/api/tasks?sort=priority,-due_date&limit=2&cursor="
+    while True:
+        data = client.get(url, headers=headers).get_json()
+        assert data["pagination"]["mode"] == "cursor"
+        seen.extend(task["title"] for task in data["tasks"])
+        next_cursor = data["pagination"]["next_cursor"]
+        if not next_cursor:
+            break
+        url = f"/api/tasks?sort=priority,-due_date&limit=2&cursor={next_cursor}"
+
+    assert seen == ["Task 3", "Task 1", "Task 4", "Task 2", "Task 0"]
+
+    # Walk back from the last page
+    prev_cursor = data["pagination"]["prev_cursor"]
+    response = client.get(
+        f"/api/tasks?sort=priority,-due_date&limit=2&cursor={prev_cursor}",
+        headers=headers,
+    )
+    assert [t["title"] for t in response.get_json()["tasks"]] == ["Task 4", "Task 2"]
+
+    # A cursor is bound to the sort it was issued for
+    response = client.get(
+        f"/api/tasks?sort=title&limit=2&cursor={prev_cursor}", headers=headers
+    )
+    assert response.status_code == 400
+
+    # Forged cursors cannot smuggle operators or regexes into the filter
+    def cursor_for(values):
+        payload = {"s": "priority:1,due_date:-1,_id:-1", "v": values, "d": "next"}
+        token = base64.urlsafe_b64encode(json_util.dumps(payload).encode()).decode()
+        return client.get(
+            f"/api/tasks?sort=priority,-due_date&limit=2&cursor={token}",
+            headers=headers,
+        )
+
+    assert cursor_for(["Low", None, ObjectId()]).status_code == 200
+    for values in (
+        [{"$ne": None}, None, ObjectId()],
+        [{"$regex": "(a+)+$"}, None, ObjectId()],
+        ["Low", None, {"$gt": ""}],
+        ["Low", None, "not-an-objectid"],
+    ):
+        assert cursor_for(values).status_code == 400
+
+
+def test_task_list_count_strategies(client, user_auth):
+    """Every count strategy reports the same total and names itself."""
+    headers = {"Authorization": user_auth[0]}
+    for i in range(3):
+        create_task_in_db(user_auth[1], title=f"Task {i}")
+
+    for strategy in ("exact", "facet", "estimated", "cached"):
+        response = client.get(f"/api/tasks?count={strategy}", headers=headers)
+        pagination = response.get_json()["pagination"]
+        assert pagination["total_tasks"] == 3
+        assert len(response.get_json()["tasks"]) == 3
+
+    # Non-admins always carry a filter, so "estimated" falls back to exact
+    assert pagination["count_strategy"] == "cached"
+    response = client.get("/api/tasks?count=estimated", headers=headers)
+    assert response.get_json()["pagination"]["count_strategy"] == "exact"
+
+    # count=none skips the total but still reports whether more pages exist
+    response = client.get("/api/tasks?count=none&limit=2", headers=headers)
+    pagination = response.get_json()["pagination"]
+    assert pagination["total_tasks"] is None
+    assert pagination["has_more"] is True
+
+
+def test_task_list_cached_count_invalidated_on_write(client, user_auth):
+    """A cached total is dropped when a task is written."""
+    headers = {"Authorization": user_auth[0]}
+    create_task_in_db(user_auth[1])
+
+    response = client.get("/api/tasks?count=cached", headers=headers)
+    assert response.get_json()["pagination"]["total_tasks"] == 1
+
+    client.post("/api/tasks", data={"title": "Another"}, headers=headers)
+
+    response = client.get("/api/tasks?count=cached", headers=headers)
+    assert response.get_json()["pagination"]["total_tasks"] == 2
+
+
+def test_task_sparse_fieldsets(client, user_auth):
+    """fields= projects list and detail reads; storage paths are never exposed."""
+    headers = {"Authorization": user_auth[0]}
+    doc_meta = {
+        "original_name": "spec.pdf",
+        "stored_name": "abc_spec.pdf",
+        "filepath": "/srv/uploads/abc_spec.pdf",
+        "mime_type": "application/pdf",
+        "size_bytes": 10,
+    }
+    task_id = create_task_in_db(user_auth[1], attached_documents=[doc_meta])
+
+    response = client.get(
+        "/api/tasks?fields=title,status,priority,due_date", headers=headers
+    )
+    task = response.get_json()["tasks"][0]
+    assert set(task) == {"_id", "title", "status", "priority", "due_date"}
+
+    response = client.get(f"/api/tasks/{task_id}", headers=headers)
+    task = response.get_json()
+    assert task["created_by"] == user_auth[1]
+    assert task["assigned_to"] == user_auth[1]
+    assert "filepath" not in task["attached_documents"][0]
+
+    response = client.get(f"/api/tasks/{task_id}?fields=password", headers=headers)
+    assert response.status_code == 400
+
+
+def test_task_due_date_stored_as_datetime(client, user_auth, task_data):
+    """Due dates are parsed on create/update and rejected when malformed."""
+    headers = {"Authorization": user_auth[0]}
+
+    response = client.post("/api/tasks", data=task_data, headers=headers)
+    task_id = response.get_json()["task_id"]
+    task = get_task_collection().find_one({"_id": ObjectId(task_id)})
+    assert task["due_date"] == datetime(2025, 10, 30)
+
+    response = client.put(
+        f"/api/tasks/{task_id}",
+        data=json.dumps({"due_date": "2025-12-01T09:30:00+02:00"}),
+        content_type="application/json",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    task = get_task_collection().find_one({"_id": ObjectId(task_id)})
+    assert task["due_date"] == datetime(2025, 12, 1, 7, 30)
+
+    response = client.get(f"/api/tasks/{task_id}", headers=headers)
+    assert response.get_json()["due_date"] == "2025-12-01T07:30:00Z"
+
+    response = client.post(
+        "/api/tasks", data={**task_data, "due_date": "next week"}, headers=headers
+    )
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "json"])
+def test_json_provider_serializes_documents(app, monkeypatch, encoder):
+    """ObjectIds, datetimes and Decimal128 serialize wherever they are nested."""
+    from bson.decimal128 import Decimal128
+    from src.utils import json_provider
+
+    if encoder == "json":
+        monkeypatch.setattr(json_provider, "orjson", None)
+    elif json_provider.orjson is None:
+        pytest.skip("orjson is not installed")
+
+    user_id = ObjectId()
+    document = {
+        "_id": user_id,
+        "due_date": datetime(2025, 12, 1, 7, 30),
+        "history": [{"by": user_id, "at": datetime(2025, 1, 1)}],
+        "budget": Decimal128("10.50"),
+    }
+    expected = {
+        "_id": str(user_id),
+        "due_date": "2025-12-01T07:30:00Z",
+        "history": [{"by": str(user_id), "at": "2025-01-01T00:00:00Z"}],
+        "budget": "10.50",
+    }
+    with app.test_request_context():
+        assert json.loads(app.json.dumps(document)) == expected
+        assert app.json.loads(app.json.response(document).data) == expected
+
+
+def test_task_list_due_date_range_filters(client, user_auth):
+    """due_date_min/due_date_max are inclusive; overdue skips completed tasks."""
+    headers = {"Authorization": user_auth[0]}
+    yesterday = datetime.utcnow() - timedelta(days=1)
+    create_task_in_db(user_auth[1], title="Late", due_date=yesterday)
+    create_task_in_db(
+        user_auth[1], title="Done", due_date=yesterday, status="Completed"
+    )
+    create_task_in_db(user_auth[1], title="Nov 1", due_date=datetime(2099, 11, 1, 18))
+    create_task_in_db(user_auth[1], title="Nov 2", due_date=datetime(2099, 11, 2))
+
+    response = client.get(
+        "/api/tasks?due_date_min=2099-11-01&due_date_max=2099-11-01", headers=headers
+    )
+    assert [t["title"] for t in response.get_json()["tasks"]] == ["Nov 1"]
+
+    response = client.get("/api/tasks?overdue=true", headers=headers)
+    assert [t["title"] for t in response.get_json()["tasks"]] == ["Late"]
+
+    response = client.get("/api/tasks?due_date_min=soon", headers=headers)
+    assert response.status_code == 400
+
+
+def test_task_migrate_due_dates(app, user_auth):
+    """The migration converts string due dates in place."""
+    from src.tasks.commands import migrate_due_dates
+
+    valid_id = create_task_in_db(user_auth[1], due_date="2025-11-01")
+    empty_id = create_task_in_db(user_auth[1], due_date="")
+    invalid_id = create_task_in_db(user_auth[1], due_date="someday")
+
+    with app.app_context():
+        summary = migrate_due_dates(batch_size=2)
+
+    assert summary == {"converted": 1, "cleared": 1, "invalid": 1}
+    tasks = get_task_collection()
+    assert tasks.find_one({"_id": ObjectId(valid_id)})["due_date"] == datetime(
+        2025, 11, 1
+    )
+    assert tasks.find_one({"_id": ObjectId(empty_id)})["due_date"] is None
+    assert tasks.find_one({"_id": ObjectId(invalid_id)})["due_date"] == "someday"
+
+    # The command rebuilds the statistics only when asked to
+    with app.app_context():
+        rebuild_task_stats()
+    create_task_in_db(user_auth[1], due_date="2025-11-02")
+    runner = app.test_cli_runner()
+    result = runner.invoke(args=["tasks", "migrate-due-dates"])
+    assert "rebuild-stats" in result.output
+    with app.app_context():
+        assert check_task_stats() != []
+
+    create_task_in_db(user_auth[1], due_date="2025-11-03")
+    result = runner.invoke(args=["tasks", "migrate-due-dates", "--rebuild-stats"])
+    assert "Rebuilt the task statistics." in result.output
+    with app.app_context():
+        assert check_task_stats() == []
+
+
+def test_task_bulk_operations(client, user_auth, get_auth_token_for, app):
+    """Bulk mutations are validated and authorized per operation."""
+    headers = {"Authorization": user_auth[0]}
+    _, other_user_id = get_auth_token_for("user", "other")
+    own_id = create_task_in_db(user_auth[1], title="Mine")
+    doomed_id = create_task_in_db(user_auth[1], title="Doomed")
+    foreign_id = create_task_in_db(other_user_id, title="Theirs")
+    with app.app_context():
+        rebuild_task_stats()  # Counts the tasks inserted directly
+
+    operations = [
+        {"op": "create", "data": {"title": "Bulk created", "priority": "High"}},
+        {"op": "update", "id": own_id, "data": {"status": "Completed"}},
+        {"op": "delete", "id": doomed_id},
+        {"op": "update", "id": foreign_id, "data": {"status": "Completed"}},
+        {"op": "update", "id": own_id, "data": {"status": "Someday"}},
+        {"op": "delete", "id": str(ObjectId())},
+        {"op": "archive", "id": own_id},
+    ]
+    response = client.post(
+        "/api/tasks/bulk",
+        data=json.dumps({"operations": operations}),
+        content_type="application/json",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [r["status"] for r in data["results"]] == [201, 200, 204, 403, 400, 404, 400]
+    assert data["succeeded"] == 3 and data["failed"] == 4
+
+    tasks = get_task_collection()
+    created_id = ObjectId(data["results"][0]["id"])
+    assert tasks.find_one({"_id": created_id})["assigned_to"] == ObjectId(user_auth[1])
+    assert tasks.find_one({"_id": ObjectId(own_id)})["status"] == "Completed"
+    assert tasks.find_one({"_id": ObjectId(doomed_id)}) is None
+    assert tasks.find_one({"_id": ObjectId(foreign_id)})["status"] == "To Do"
+    with app.app_context():
+        assert check_task_stats() == []
+
+
+def test_task_bulk_skips_tasks_changed_after_read(
+    client, user_auth, get_auth_token_for, app, monkeypatch
+):
+    """Tasks changed between the read and the bulk write are reported, not written."""
+    from src.tasks import controllers
+
+    headers = {"Authorization": user_auth[0]}
+    _, other_user_id = get_auth_token_for("user", "other")
+    kept_id = create_task_in_db(user_auth[1], title="Kept")
+    reassigned_id = create_task_in_db(user_auth[1], title="Reassigned")
+    completed_id = create_task_in_db(user_auth[1], title="Completed")
+    with app.app_context():
+        rebuild_task_stats()
+
+    class RacingCollection:
+        """Applies concurrent writes right before the bulk write."""
+
+        def __init__(self, collection):
+            self.collection = collection
+
+        def __getattr__(self, name):
+            return getattr(self.collection, name)
+
+        def bulk_write(self, requests, **kwargs):
+            concurrent = {
+                reassigned_id: {"assigned_to": ObjectId(other_user_id)},
+                completed_id: {"status": "Completed"},
+            }
+            for task_id, update in concurrent.items():
+                before = self.collection.find_one_and_update(
+                    {"_id": ObjectId(task_id)}, {"$set": update}
+                )
+                record_task_changes([(before, {**before, **update})])
+            return self.collection.bulk_write(requests, **kwargs)
+
+    get_collection = controllers.get_task_collection
+    monkeypatch.setattr(
+        controllers,
+        "get_task_collection",
+        lambda: RacingCollection(get_collection()),
+    )
+    operations = [
+        {
+            "op": "update",
+            "id": kept_id,
+            # Stored with millisecond precision
+            "data": {"priority": "High", "due_date": "2025-11-05T10:00:00.123456Z"},
+        },
+        {"op": "update", "id": reassigned_id, "data": {"priority": "High"}},
+        {"op": "delete", "id": completed_id},
+    ]
+    response = client.post(
+        "/api/tasks/bulk",
+        data=json.dumps({"operations": operations}),
+        content_type="application/json",
+        headers=headers,
+    )
+    data = response.get_json()
+    assert [r["status"] for r in data["results"]] == [200, 412, 412]
+    assert data["succeeded"] == 1 and data["failed"] == 2
+
+    tasks = get_task_collection()
+    assert tasks.find_one({"_id": ObjectId(kept_id)})["priority"] == "High"
+    assert tasks.find_one({"_id": ObjectId(reassigned_id)})["priority"] == "Low"
+    assert tasks.find_one({"_id": ObjectId(completed_id)}) is not None
+    with app.app_context():
+        assert check_task_stats() == []
+
+
+def test_task_export_streams_ndjson_and_csv(client, admin_auth, user_auth):
+    """Admins can stream filtered tasks as NDJSON or CSV."""
+    headers = {"Authorization": admin_auth[0]}
+    create_task_in_db(user_auth[1], title="Open", status="To Do")
+    create_task_in_db(user_auth[1], title="Closed", status="Completed")
+
+    response = client.get("/api/tasks/export?status=To Do", headers=headers)
+    assert response.status_code == 200
+    assert response.mimetype == "application/x-ndjson"
+    rows = [json.loads(line) for line in response.data.decode().splitlines()]
+    assert [row["title"] for row in rows] == ["Open"]
+    assert rows[0]["assigned_to"] == user_auth[1]
+    assert rows[0]["due_date"] == "2025-11-01T00:00:00Z"
+
+    response = client.get(
+        "/api/tasks/export?format=csv&fields=title,status&sort=title", headers=headers
+    )
+    assert response.mimetype == "text/csv"
+    lines = response.data.decode().splitlines()
+    assert lines[0] == "_id,title,status"
+    assert [line.split(",", 1)[1] for line in lines[1:]] == [
+        "Closed,Completed",
+        "Open,To Do",
+    ]
+
+    user_headers = {"Authorization": user_auth[0]}
+    assert client.get("/api/tasks/export", headers=user_headers).status_code == 403
+
+
+def test_task_import_ndjson_and_csv(client, admin_auth, user_auth, app):
+    """Imports insert valid rows in batches and report rejected ones."""
+    headers = {"Authorization": admin_auth[0]}
+    ndjson_body = "\n".join(
+        [
+            json.dumps({"title": "Imported 1", "assigned_to": user_auth[1]}),
+            json.dumps({"title": "Imported 2", "due_date": "2025-12-24"}),
+            "{not json",
+            json.dumps({"title": "Bad", "status": "Someday"}),
+            "",
+            json.dumps({"description": "no title"}),
+        ]
+    )
+    response = client.post(
+        "/api/tasks/import",
+        data=ndjson_body,
+        content_type="application/x-ndjson",
+        headers=headers,
+    )
+    assert response.status_code == 200
+    data = response.get_json()
+    assert data["inserted"] == 2
+    assert data["rejected"] == 3
+    assert [error["row"] for error in data["errors"]] == [3, 4, 6]
+
+    csv_body = b"title,priority,due_date\nCSV task,High,2025-10-01\nNo priority,,\n"
+    response = client.post(
+        "/api/tasks/import",
+        data={"file": (BytesIO(csv_body), "tasks.csv", "text/csv")},
+        content_type="multipart/form-data",
+        headers=headers,
+    )
+    assert response.get_json()["inserted"] == 2
+
+    task = get_task_collection().find_one({"title": "CSV task"})
+    assert task["priority"] == "High"
+    assert task["due_date"] == datetime(2025, 10, 1)
+    assert get_task_collection().count_documents({}) == 4
+    with app.app_context():
+        assert check_task_stats() == []
+
+    user_headers = {"Authorization": user_auth[0]}
+    response = client.post("/api/tasks/import", data=ndjson_body, headers=user_headers)
+    assert response.status_code == 403
+
+
+def test_task_stats_maintained_incrementally(client, user_auth, admin_auth, app):
+    """Stats follow creates, updates, reassignments and deletes without rescans."""
+    headers = {"Authorization": user_auth[0]}
+    admin_headers = {"Authorization": admin_auth[0]}
+    now = utcnow()
+
+    def create(**data):
+        response = client.post("/api/tasks", data=data, headers=headers)
+        return response.get_json()["task_id"]
+
+    overdue_id = create(title="Late", priority="High", due_date="2020-01-01")
+    create(title="Due earlier today", due_date=(now - timedelta(minutes=1)).isoformat())
+    create(title="Future", due_date=(now + timedelta(days=30)).isoformat())
+    done_id = create(title="Done", status="Completed", due_date="2020-01-01")
+
+    stats = client.get("/api/tasks/stats", headers=headers).get_json()
+    assert stats["total"] == 4
+    assert stats["status"] == {"To Do": 3, "In Progress": 0, "Completed": 1}
+    assert stats["priority"] == {"Low": 3, "Medium": 0, "High": 1}
+    assert stats["overdue"] == 2
+    assert [user["assigned_to"] for user in stats["by_user"]] == [user_auth[1]]
+
+    client.put(
+        f"/api/tasks/{overdue_id}", json={"status": "Completed"}, headers=headers
+    )
+    client.put(
+        f"/api/tasks/{done_id}", json={"assigned_to": admin_auth[1]}, headers=headers
+    )
+    stats = client.get("/api/tasks/stats", headers=headers).get_json()
+    assert stats["total"] == 3
+    assert stats["status"]["Completed"] == 1
+    assert stats["overdue"] == 1
+    # The emptied due day's counter is dropped, not kept at zero
+    stats_doc = get_task_stats_collection().find_one({"_id": ObjectId(user_auth[1])})
+    assert "open_due:2020-01-01" not in stats_doc["counts"]
+
+    # Admins see every assignee
+    stats = client.get("/api/tasks/stats", headers=admin_headers).get_json()
+    assert stats["total"] == 4
+    assert len(stats["by_user"]) == 2
+    stats = client.get(
+        f"/api/tasks/stats?assigned_to={admin_auth[1]}", headers=admin_headers
+    ).get_json()
+    assert stats["total"] == 1 and stats["status"]["Completed"] == 1
+
+    client.delete(f"/api/tasks/{done_id}", headers=admin_headers)
+    with app.app_context():
+        assert check_task_stats() == []
+
+        # Drift (e.g. writes by another tool) is reported and repaired
+        create_task_in_db(user_auth[1])
+        assert len(check_task_stats()) == 1
+        assert rebuild_task_stats() == 1
+        assert check_task_stats() == []
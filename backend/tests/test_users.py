@@ -49,8 +49,74 @@ def test_user_list_admin_success(client, get_auth_token_for, create_test_user):
     assert response.status_code == 200
     data = response.get_json()
     # Should see the 2 created users + the admin user (3 total)
-    assert len(data) >= 3
-    assert all("_id" in user for user in data)
+    assert len(data["users"]) >= 3
+    assert data["pagination"]["total_users"] == len(data["users"])
+    assert all("_id" in user for user in data["users"])
+    assert all("password" not in user for user in data["users"])
+
+
+def test_user_list_fsp(client, get_auth_token_for, create_test_user):
+    """Admins can filter by role and email prefix, sort, paginate and project."""
+    admin_token, _ = get_auth_token_for("admin")
+    headers = {"Authorization": admin_token}
+    for email in ("carol@test.com", "alice@test.com", "bob@test.com"):
+        create_test_user(email=email)
+    create_test_user(email="alan@other.com", role="admin")
+
+    response = client.get("/api/users?email=al&fields=email", headers=headers)
+    assert response.status_code == 200
+    data = response.get_json()
+    assert [user["email"] for user in data["users"]] == [
+        "alan@other.com",
+        "alice@test.com",
+    ]
+    assert set(data["users"][0]) == {"_id", "email"}
+
+    response = client.get("/api/users?role=user&sort=-email&limit=2", headers=headers)
+    data = response.get_json()
+    assert [user["email"] for user in data["users"]] == [
+        "carol@test.com",
+        "bob@test.com",
+    ]
+    assert data["pagination"]["total_users"] == 3
+    assert data["pagination"]["has_more"] is True
+
+    # Keyset pagination through the users in creation order
+    emails, cursor = [], ""
+    while cursor is not None:
+        response = client.get(
+            f"/api/users?role=user&limit=2&cursor={cursor}", headers=headers
+        )
+        data = response.get_json()
+        emails += [user["email"] for user in data["users"]]
+        cursor = data["pagination"]["next_cursor"]
+    assert emails == ["carol@test.com", "alice@test.com", "bob@test.com"]
+
+    for query in ("sort=password", "sort=role,email", "fields=password"):
+        response = client.get(f"/api/users?{query}", headers=headers)
+        assert response.status_code == 400
+
+
+def test_user_list_collation_only_for_email(
+    app, client, get_auth_token_for, monkeypatch
+):
+    """Only email filters and sorts use the email index's collation."""
+    from src.auth.models import EMAIL_COLLATION
+    from src.users import controllers
+
+    admin_token, _ = get_auth_token_for("admin")
+    headers = {"Authorization": admin_token}
+    collations = []
+
+    def fetch_counted_page(*args):
+        collations.append(args[-1])
+        return [], 0, "exact", False
+
+    monkeypatch.setattr(controllers, "fetch_counted_page", fetch_counted_page)
+    monkeypatch.setitem(app.config, "USER_EMAIL_CASE_INSENSITIVE", True)
+    for query in ("email=al", "sort=-email", "role=user", "sort=role", ""):
+        assert client.get(f"/api/users?{query}", headers=headers).status_code == 200
+    assert collations == [EMAIL_COLLATION, EMAIL_COLLATION, None, None, None]
 
 
 def test_user_read_admin_success(client, get_auth_token_for, create_test_user):
@@ -93,8 +159,244 @@ def test_user_delete_admin_success(client, get_auth_token_for, create_test_user)
     response = client.delete(
         f'/api/users/{target_user["id"]}', headers={"Authorization": admin_token}
     )
-    assert response.status_code == 204
+    assert response.status_code == 202
 
     # Verify deletion
     deleted_user = get_user_by_email(target_user["email"])
     assert deleted_user is None
+
+
+def test_user_delete_keeps_user_when_job_not_queued(
+    client, get_auth_token_for, create_test_user, monkeypatch
+):
+    """Nothing is deleted when the cascade job cannot be queued."""
+    from pymongo.errors import AutoReconnect
+    from src.users import controllers
+
+    def enqueue(job_type, payload=None, delay=0):
+        raise AutoReconnect("primary stepped down")
+
+    monkeypatch.setattr(controllers, "enqueue", enqueue)
+    admin_token, _ = get_auth_token_for("admin")
+    target_user = setup_target_user(create_test_user)
+
+    response = client.delete(
+        f'/api/users/{target_user["id"]}', headers={"Authorization": admin_token}
+    )
+    assert response.status_code == 503
+    assert get_user_by_email(target_user["email"]) is not None
+
+
+def test_user_delete_cascades_in_background(
+    app, client, get_auth_token_for, create_test_user
+):
+    """Deleting a user hands its tasks and their files to a cascade job."""
+    import os
+    from src.jobs.models import get_job_collection, JOB_DONE
+    from src.tasks.models import get_task_collection
+    from src.utils.blob_store import get_blob_collection
+    from src.utils.storage import blob_path
+
+    admin_token, admin_id = get_auth_token_for("admin")
+    target_user = setup_target_user(create_test_user)
+    target_id = ObjectId(target_user["id"])
+
+    blob_key = "ab" * 32
+    with app.app_context():
+        path = blob_path(blob_key)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+    get_blob_collection().insert_one({"_id": blob_key, "refs": ["x_spec.pdf"]})
+
+    attachment = {"stored_name": "x_spec.pdf", "blob_key": blob_key}
+    get_task_collection().insert_many(
+        [
+            {"title": "Created", "created_by": target_id, "assigned_to": target_id},
+            {
+                "title": "Assigned",
+                "created_by": ObjectId(admin_id),
+                "assigned_to": target_id,
+                "attached_documents": [attachment],
+            },
+            {"title": "Unrelated", "created_by": ObjectId(admin_id)},
+        ]
+    )
+
+    response = client.delete(
+        f'/api/users/{target_user["id"]}', headers={"Authorization": admin_token}
+    )
+    assert response.status_code == 202
+
+    # JOBS_EAGER: the cascade already ran through the job queue
+    job = get_job_collection().find_one({"type": "cascade_delete_user"})
+    assert job["status"] == JOB_DONE
+    assert job["result"] == {"tasks_deleted": 2}
+    assert [task["title"] for task in get_task_collection().find()] == ["Unrelated"]
+    assert get_blob_collection().find_one({"_id": blob_key}) is None
+    assert not os.path.exists(path)
+    response = client.get(
+        f"/api/jobs/{job['_id']}", headers={"Authorization": admin_token}
+    )
+    assert response.get_json()["result"] == {"tasks_deleted": 2}
+
+
+def test_user_delete_reassigns_tasks_in_batches(
+    app, client, get_auth_token_for, create_test_user
+):
+    """?reassign_to= hands the tasks to another user, batch by batch."""
+    from src.jobs.models import get_job_collection
+    from src.tasks.models import get_task_collection
+    from src.tasks.stats import check_task_stats, rebuild_task_stats
+
+    app.config["JOBS_CASCADE_BATCH_SIZE"] = 2
+    admin_token, admin_id = get_auth_token_for("admin")
+    target_user = setup_target_user(create_test_user)
+    target_id = ObjectId(target_user["id"])
+    get_task_collection().insert_many(
+        [
+            {"title": f"Task {i}", "created_by": target_id, "assigned_to": target_id}
+            for i in range(3)
+        ]
+        + [
+            {
+                "title": "Created",
+                "created_by": target_id,
+                "assigned_to": ObjectId(admin_id),
+                "version": 1,
+            }
+        ]
+    )
+    with app.app_context():
+        rebuild_task_stats()
+
+    response = client.delete(
+        f'/api/users/{target_user["id"]}?reassign_to={target_user["id"]}',
+        headers={"Authorization": admin_token},
+    )
+    assert response.status_code == 400
+
+    response = client.delete(
+        f'/api/users/{target_user["id"]}?reassign_to={admin_id}',
+        headers={"Authorization": admin_token},
+    )
+    assert response.status_code == 202
+    job = get_job_collection().find_one(
+        {"_id": ObjectId(response.get_json()["job_id"])}
+    )
+    assert response.headers["Location"] == f"/api/jobs/{job['_id']}"
+    # 3 tasks were assigned to the user, 4 created by them
+    assert job["result"] == {
+        "tasks_reassigned": {"assigned_to": 3, "created_by": 4},
+        "reassigned_to": admin_id,
+    }
+    assert job["progress"]["checkpoint"]["field"] == "created_by"
+
+    tasks = list(get_task_collection().find())
+    assert len(tasks) == 4
+    assert all(task["created_by"] == ObjectId(admin_id) for task in tasks)
+    assert all(task["assigned_to"] == ObjectId(admin_id) for task in tasks)
+    assert tasks[-1]["version"] == 2
+    with app.app_context():
+        assert check_task_stats() == []
+
+
+def test_user_cascade_counts_tasks_as_written(
+    app, client, get_auth_token_for, create_test_user, monkeypatch
+):
+    """A task reassigned while the cascade runs is skipped, stats stay exact."""
+    from src.jobs import handlers
+    from src.jobs.models import get_job_collection
+    from src.tasks.models import get_task_collection
+    from src.tasks.stats import (
+        check_task_stats,
+        rebuild_task_stats,
+        record_task_changes,
+    )
+
+    admin_token, admin_id = get_auth_token_for("admin")
+    target_user = setup_target_user(create_test_user)
+    target_id = ObjectId(target_user["id"])
+    doomed_id, moved_id = (
+        get_task_collection()
+        .insert_many(
+            [
+                {"title": "Doomed", "status": "To Do", "assigned_to": target_id},
+                {"title": "Moved", "status": "To Do", "assigned_to": target_id},
+            ]
+        )
+        .inserted_ids
+    )
+    with app.app_context():
+        rebuild_task_stats()
+
+    class RacingCollection:
+        """Reassigns "Moved" once the cascade has read its batch."""
+
+        def __init__(self, collection):
+            self.collection = collection
+
+        def __getattr__(self, name):
+            return getattr(self.collection, name)
+
+        def find_one_and_delete(self, *args, **kwargs):
+            update = {"assigned_to": ObjectId(admin_id), "status": "In Progress"}
+            before = self.collection.find_one_and_update(
+                {"_id": moved_id, "assigned_to": target_id}, {"$set": update}
+            )
+            if before is not None:
+                record_task_changes([(before, {**before, **update})])
+            return self.collection.find_one_and_delete(*args, **kwargs)
+
+    get_collection = handlers.get_task_collection
+    monkeypatch.setattr(
+        handlers, "get_task_collection", lambda: RacingCollection(get_collection())
+    )
+    response = client.delete(
+        f'/api/users/{target_user["id"]}', headers={"Authorization": admin_token}
+    )
+    job = get_job_collection().find_one(
+        {"_id": ObjectId(response.get_json()["job_id"])}
+    )
+    assert job["result"] == {"tasks_deleted": 1}
+    assert get_task_collection().find_one({"_id": doomed_id}) is None
+    assert get_task_collection().find_one({"_id": moved_id})["title"] == "Moved"
+    with app.app_context():
+        assert check_task_stats() == []
+
+
+def test_user_cascade_resumes_from_checkpoint(app):
+    """An interrupted cascade resumes after the last checkpointed task."""
+    from src.jobs.models import JOB_RUNNING, get_job_collection
+    from src.jobs.runner import run_job
+    from src.tasks.models import get_task_collection
+
+    user_id = ObjectId()
+    task_ids = (
+        get_task_collection()
+        .insert_many([{"title": f"Task {i}", "assigned_to": user_id} for i in range(4)])
+        .inserted_ids
+    )
+    created_id = get_task_collection().insert_one({"created_by": user_id}).inserted_id
+
+    # The first attempt died after the batch ending with task_ids[1]
+    job = {
+        "type": "cascade_delete_user",
+        "payload": {"user_id": str(user_id)},
+        "status": JOB_RUNNING,
+        "attempts": 1,
+        "progress": {
+            "tasks_deleted": 2,
+            "checkpoint": {"field": "assigned_to", "last_id": task_ids[1]},
+        },
+    }
+    job["_id"] = get_job_collection().insert_one(job).inserted_id
+
+    with app.app_context():
+        assert run_job(job) is True
+
+    remaining = [task["_id"] for task in get_task_collection().find()]
+    assert remaining == task_ids[:2]  # Left alone: before the checkpoint
+    assert created_id not in remaining
+    job = get_job_collection().find_one({"_id": job["_id"]})
+    assert job["result"] == {"tasks_deleted": 5}
@@ -85,7 +85,7 @@ const TaskDetailModal = ({ open, onClose, task }) => {
             <Typography variant="subtitle2" color="text.secondary">
               Due Date
             </Typography>
-            <Typography>{task.due_date}</Typography>
+            <Typography>{task.due_date?.slice(0, 10)}</Typography>
           </Grid>
           <Grid item xs={6}>
             <Typography variant="subtitle2" color="text.secondary">
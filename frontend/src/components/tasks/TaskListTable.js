@@ -89,7 +89,7 @@ const TaskListTable = ({ tasks, isLoading }) => {
                     size="small"
                   />
                 </TableCell>
-                <TableCell>{task.due_date}</TableCell>
+                <TableCell>{task.due_date?.slice(0, 10)}</TableCell>
                 <TableCell>
                   <Chip label={task.attached_documents.length} size="small" />
                 </TableCell>
@@ -49,7 +49,7 @@ export const downloadDocument = (taskId, storedName) =>
   );
 
 // --- User API Endpoints (Admin Only) ---
-export const fetchUsers = () => API.get("/users");
+export const fetchUsers = (params) => API.get("/users", { params }); // params handles FSP
 export const updateUser = (id, data) => API.put(`/users/${id}`, data);
 export const deleteUser = (id) => API.delete(`/users/${id}`);
 export const logoutUser = () => API.post("/auth/logout");
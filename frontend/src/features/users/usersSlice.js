@@ -3,6 +3,8 @@ import * as api from "../api";
 
 const initialState = {
   users: [],
+  pagination: {},
+  filters: { page: 1, limit: 50 },
   status: "idle",
   error: null,
 };
@@ -11,10 +13,10 @@ const initialState = {
 
 export const getUsers = createAsyncThunk(
   "users/getUsers",
-  async (_, { rejectWithValue }) => {
+  async (filters, { rejectWithValue }) => {
     try {
-      const response = await api.fetchUsers();
-      return response.data;
+      const response = await api.fetchUsers(filters);
+      return response.data; // Contains { users, pagination }
     } catch (error) {
       return rejectWithValue(
         error.response.data.msg || "Failed to fetch users."
@@ -60,7 +62,11 @@ export const removeUser = createAsyncThunk(
 const usersSlice = createSlice({
   name: "users",
   initialState,
-  reducers: {},
+  reducers: {
+    setUsersPage: (state, action) => {
+      state.filters.page = action.payload;
+    },
+  },
   extraReducers: (builder) => {
     builder
       // GET USERS
@@ -69,7 +75,8 @@ const usersSlice = createSlice({
       })
       .addCase(getUsers.fulfilled, (state, action) => {
         state.status = "succeeded";
-        state.users = action.payload;
+        state.users = action.payload.users;
+        state.pagination = action.payload.pagination;
         state.error = null;
       })
       .addCase(getUsers.rejected, (state, action) => {
@@ -103,4 +110,6 @@ const usersSlice = createSlice({
   },
 });
 
+export const { setUsersPage } = usersSlice.actions;
+
 export default usersSlice.reducer;
@@ -14,16 +14,24 @@ import {
   TableHead,
   TableRow,
   IconButton,
+  Pagination,
 } from "@mui/material";
 import DeleteIcon from "@mui/icons-material/Delete";
 import EditIcon from "@mui/icons-material/Edit";
-import { getUsers, removeUser, updateUser } from "../features/users/usersSlice";
+import {
+  getUsers,
+  removeUser,
+  updateUser,
+  setUsersPage,
+} from "../features/users/usersSlice";
 import MainHeader from "../components/MainHeader";
 import UserFormModal from "../components/users/UserFormModal";
 
 const UserManagementPage = () => {
   const dispatch = useDispatch();
-  const { users, status, error } = useSelector((state) => state.users);
+  const { users, pagination, filters, status, error } = useSelector(
+    (state) => state.users
+  );
   const isLoading = status === "loading";
 
   // [FIX START] State for Edit Modal
@@ -32,9 +40,14 @@ const UserManagementPage = () => {
   // [FIX END]
 
   useEffect(() => {
-    // Fetch all users when the component mounts (Admin only)
-    dispatch(getUsers());
-  }, [dispatch]);
+    // Fetch the current page of users (Admin only)
+    dispatch(getUsers(filters));
+  }, [dispatch, filters]);
+
+  const handlePageChange = (event, newPage) => {
+    // MUI Pagination is 1-based, matching our backend
+    dispatch(setUsersPage(newPage));
+  };
 
   const handleDelete = (userId) => {
     if (
@@ -65,7 +78,7 @@ const UserManagementPage = () => {
       .then(() => {
         handleCloseEdit();
         // Optional: Refetch users to ensure list consistency (though reducer should handle it)
-        dispatch(getUsers());
+        dispatch(getUsers(filters));
       })
       .catch((err) => {
         // Handle failure (e.g., display a global error notification)
@@ -142,6 +155,30 @@ const UserManagementPage = () => {
                 </TableBody>
               </Table>
             </TableContainer>
+            {pagination.total_pages > 1 && (
+              <Box
+                sx={{
+                  display: "flex",
+                  justifyContent: "flex-end",
+                  alignItems: "center",
+                  gap: 2,
+                  p: 1,
+                }}
+              >
+                <Typography variant="body2" color="text.secondary">
+                  Total Users: {pagination.total_users}
+                </Typography>
+                <Pagination
+                  count={pagination.total_pages}
+                  page={filters.page}
+                  onChange={handlePageChange}
+                  color="primary"
+                  showFirstButton
+                  showLastButton
+                  size="small"
+                />
+              </Box>
+            )}
           </Paper>
         )}
       </Container>